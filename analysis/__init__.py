@@ -0,0 +1,2 @@
+from .pitch_tracker import PitchTracker
+from .tonic import TonicEstimate, TonicEstimator
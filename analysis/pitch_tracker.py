@@ -0,0 +1,112 @@
+import numpy as np
+from music_elements import Note
+from typing import Iterator, Optional, Tuple
+
+class PitchTracker:
+    """
+    Represents a streaming pitch tracker that converts recorded audio into Note events.
+
+    Recordings are read in fixed-size blocks (with just enough overlap for the analysis frames at the block
+    boundaries), so memory use is constant regardless of the length of the recording.
+
+    Attributes:
+        sa_midi_note (float): The (possibly fractional) MIDI note number of the 'sa' sur, or None to estimate it.
+        fmin (float): The lowest tracked frequency in Hz.
+        fmax (float): The highest tracked frequency in Hz.
+        frame_length (int): The analysis frame length in samples.
+        hop_length (int): The hop between analysis frames in samples.
+        block_frames (int): The number of analysis frames per block.
+        min_confidence (float): The minimum voicing probability of a reported frame.
+        estimate_seconds (float): The length of audio used to estimate the 'sa' sur when it is not given.
+    """
+
+    def __init__(self, sa_midi_note: Optional[float] = None, fmin: float = 65.0, fmax: float = 1050.0, frame_length: int = 2048, hop_length: int = 512, block_frames: int = 1024, min_confidence: float = 0.5, estimate_seconds: float = 60.0):
+        """
+        Initializes a PitchTracker object.
+
+        Args:
+            sa_midi_note (float, optional): The MIDI note number of the 'sa' sur. Defaults to None (estimated from the recording).
+            fmin (float, optional): The lowest tracked frequency in Hz. Defaults to 65.0.
+            fmax (float, optional): The highest tracked frequency in Hz. Defaults to 1050.0.
+            frame_length (int, optional): The analysis frame length in samples. Defaults to 2048.
+            hop_length (int, optional): The hop between analysis frames in samples. Defaults to 512.
+            block_frames (int, optional): The number of analysis frames per block. Defaults to 1024.
+            min_confidence (float, optional): The minimum voicing probability of a reported frame. Defaults to 0.5.
+            estimate_seconds (float, optional): The length of audio used to estimate the 'sa' sur. Defaults to 60.0.
+        """
+        self.sa_midi_note = sa_midi_note
+        self.fmin = fmin
+        self.fmax = fmax
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self.block_frames = block_frames
+        self.min_confidence = min_confidence
+        self.estimate_seconds = estimate_seconds
+
+
+    def track_f0(self, filepath: str, max_seconds: Optional[float] = None, start_seconds: float = 0.0) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Tracks the fundamental frequency of a recording block by block.
+
+        Args:
+            filepath (str): The filepath of the recording (any format readable by soundfile, e.g. WAV).
+            max_seconds (float, optional): Stop after this many seconds of audio. Defaults to None (whole recording).
+            start_seconds (float, optional): Start this many seconds into the recording. Defaults to 0.0.
+
+        Returns:
+            Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]: (times, f0, voiced probabilities) arrays for every block,
+            where times are the centres of the frames in seconds and f0 is NaN for unvoiced frames.
+        """
+        import librosa
+        import soundfile
+
+        info = soundfile.info(filepath)
+        sample_rate = info.samplerate
+        start = int(start_seconds * sample_rate)
+        stop = None if max_seconds is None else start + int(max_seconds * sample_rate)
+        overlap = self.frame_length - self.hop_length
+        blocksize = self.block_frames * self.hop_length + overlap
+        for block in soundfile.blocks(filepath, blocksize=blocksize, overlap=overlap, start=start, stop=stop, dtype='float32', always_2d=True):
+            samples = block.mean(axis=1)
+            if len(samples) >= self.frame_length:
+                f0, _, voiced_probabilities = librosa.pyin(
+                    samples, fmin=self.fmin, fmax=self.fmax, sr=sample_rate,
+                    frame_length=self.frame_length, hop_length=self.hop_length, center=False,
+                )
+                times = (start + np.arange(len(f0)) * self.hop_length + self.frame_length / 2) / sample_rate
+                yield times, f0, voiced_probabilities
+            start += len(block) - overlap
+
+
+    def estimate_sa(self, filepath: str) -> float:
+        """
+        Estimates the 'sa' sur of a recording from `estimate_seconds` of audio in its middle (see `TonicEstimator`).
+
+        Args:
+            filepath (str): The filepath of the recording.
+
+        Returns:
+            float: The MIDI note number of the 'sa' sur.
+        """
+        from .tonic import TonicEstimator
+        return TonicEstimator(tracker=self, num_windows=1, window_seconds=self.estimate_seconds, cache_dir=None).estimate(filepath).sa_midi_note
+
+
+    def track(self, filepath: str, sa_midi_note: Optional[float] = None) -> Iterator[Tuple[float, Note, float]]:
+        """
+        Tracks the notes of a recording, yielding one event per confident voiced frame.
+
+        Args:
+            filepath (str): The filepath of the recording.
+            sa_midi_note (float, optional): The MIDI note number of the 'sa' sur. Defaults to None (`self.sa_midi_note`, or estimated).
+
+        Returns:
+            Iterator[Tuple[float, Note, float]]: (time in seconds, Note, confidence) events.
+        """
+        if sa_midi_note is None:
+            sa_midi_note = self.sa_midi_note if self.sa_midi_note is not None else self.estimate_sa(filepath)
+        for times, f0, voiced_probabilities in self.track_f0(filepath):
+            voiced = np.isfinite(f0) & (voiced_probabilities >= self.min_confidence)
+            note_values = np.round(12 * np.log2(f0[voiced] / 440.0) + 69 - sa_midi_note).astype(int)
+            for time, note_value, confidence in zip(times[voiced].tolist(), note_values.tolist(), voiced_probabilities[voiced].tolist()):
+                yield time, Note(note_value), confidence
@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import numpy as np
+from .pitch_tracker import PitchTracker
+from typing import NamedTuple, Optional
+
+class TonicEstimate(NamedTuple):
+    """
+    Represents the estimated tonic ('sa' sur) of a recording.
+
+    Attributes:
+        sa_midi_note (float): The MIDI note number of the 'sa' sur, with a resolution of 10 cents.
+        sa_hz (float): The frequency of the 'sa' sur in Hz.
+        confidence (float): How much the best tonic candidate stands out from the next best one, between 0 and 1.
+        num_frames (int): The number of voiced frames the estimate is based on.
+    """
+    sa_midi_note: float
+    sa_hz: float
+    confidence: float
+    num_frames: int
+
+
+class TonicEstimator:
+    """
+    Represents a tonic estimator based on the pitch histogram of a recording.
+
+    The voiced pitches are folded into a one-saptak histogram with 10 cent bins, and every bin is scored as a
+    tonic candidate by its own weight plus the weights of its pa and ma (the sur a drone and the melody lean on).
+    The saptak of the tonic is the one that places the most pitches in the range from mandra pa to taar pa.
+    Results are cached on disk, keyed by the content hash of the recording and the analysis settings.
+
+    Attributes:
+        tracker (PitchTracker): The pitch tracker used to analyse the recordings.
+        num_windows (int): The number of evenly spaced windows analysed in fast mode, or None to analyse the whole recording.
+        window_seconds (float): The length of every window in seconds.
+        cache_dir (str): The directory of the result cache, or None to disable caching.
+        bins_per_saptak (int): The number of histogram bins per saptak.
+        template (dict): The weights of the histogram bins relative to the tonic candidate, keyed by cents.
+    """
+
+    bins_per_saptak = 120
+    template = {0: 1.0, 700: 0.6, 500: 0.3}
+
+    def __init__(self, tracker: PitchTracker = None, num_windows: Optional[int] = None, window_seconds: float = 10.0, cache_dir: Optional[str] = os.path.join('~', '.cache', 'kirtan-net', 'tonic')):
+        """
+        Initializes a TonicEstimator object.
+
+        Args:
+            tracker (PitchTracker, optional): The pitch tracker. Defaults to None (a new PitchTracker).
+            num_windows (int, optional): The number of windows to analyse in fast mode. Defaults to None (whole recording).
+            window_seconds (float, optional): The length of every window in seconds. Defaults to 10.0.
+            cache_dir (str, optional): The directory of the result cache, or None to disable caching. Defaults to '~/.cache/kirtan-net/tonic'.
+        """
+        self.tracker = tracker if tracker is not None else PitchTracker()
+        self.num_windows = num_windows
+        self.window_seconds = window_seconds
+        self.cache_dir = None if cache_dir is None else os.path.expanduser(cache_dir)
+
+
+    def estimate(self, filepath: str) -> TonicEstimate:
+        """
+        Estimates the tonic of a recording, reusing a cached result for the same content and settings.
+
+        Args:
+            filepath (str): The filepath of the recording.
+
+        Raises:
+            ValueError: If the analysed audio has no confident voiced frames.
+
+        Returns:
+            TonicEstimate: The estimated tonic.
+        """
+        cache_path = None
+        if self.cache_dir is not None:
+            cache_path = os.path.join(self.cache_dir, f'{self.get_cache_key(filepath)}.json')
+            if os.path.exists(cache_path):
+                with open(cache_path) as file:
+                    return TonicEstimate(**json.load(file))
+
+        out = self.estimate_from_midi_notes(self.get_midi_notes(filepath))
+        if cache_path is not None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w') as file:
+                json.dump(out._asdict(), file)
+            os.replace(temp_path, cache_path)
+        return out
+
+
+    def get_cache_key(self, filepath: str) -> str:
+        """
+        Computes the cache key of a recording: the hash of its content and of the analysis settings.
+
+        Args:
+            filepath (str): The filepath of the recording.
+
+        Returns:
+            str: The sha256 hex digest.
+        """
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        tracker = self.tracker
+        settings = [self.num_windows, self.window_seconds, tracker.fmin, tracker.fmax, tracker.frame_length, tracker.hop_length, tracker.min_confidence, self.template]
+        digest.update(json.dumps(settings, sort_keys=True).encode())
+        return digest.hexdigest()
+
+
+    def get_midi_notes(self, filepath: str) -> np.ndarray:
+        """
+        Tracks the pitch of the whole recording, or of `num_windows` evenly spaced windows in fast mode.
+
+        Args:
+            filepath (str): The filepath of the recording.
+
+        Returns:
+            np.ndarray: The fractional MIDI note numbers of the confident voiced frames.
+        """
+        import soundfile
+
+        if self.num_windows is None:
+            windows = [(0.0, None)]
+        else:
+            duration = soundfile.info(filepath).duration
+            spacing = duration / self.num_windows
+            windows = [(max(0.0, min((k + 0.5) * spacing - self.window_seconds / 2, duration - self.window_seconds)), self.window_seconds) for k in range(self.num_windows)]
+
+        midi_notes = []
+        for start_seconds, max_seconds in windows:
+            for _, f0, voiced_probabilities in self.tracker.track_f0(filepath, max_seconds, start_seconds):
+                voiced = np.isfinite(f0) & (voiced_probabilities >= self.tracker.min_confidence)
+                midi_notes.append(12 * np.log2(f0[voiced] / 440.0) + 69)
+        return np.concatenate(midi_notes) if midi_notes else np.array([])
+
+
+    @classmethod
+    def estimate_from_midi_notes(cls, midi_notes: np.ndarray) -> TonicEstimate:
+        """
+        Estimates the tonic from the pitches of voiced frames.
+
+        Args:
+            midi_notes (np.ndarray): The fractional MIDI note numbers of the voiced frames.
+
+        Raises:
+            ValueError: If there are no pitches.
+
+        Returns:
+            TonicEstimate: The estimated tonic.
+        """
+        midi_notes = np.asarray(midi_notes, dtype=np.float64)
+        if not len(midi_notes):
+            raise ValueError('Cannot estimate the tonic: no confident voiced frames.')
+        bins = cls.bins_per_saptak
+        cents_per_bin = 1200 // bins
+        histogram = np.bincount(np.round(midi_notes * 100 / cents_per_bin).astype(np.int64) % bins, minlength=bins).astype(np.float64)
+        # circular smoothing over +-20 cents absorbs intonation spread
+        kernel = np.exp(-0.5 * (np.arange(-2, 3) / 1.0) ** 2)
+        histogram = sum(weight * np.roll(histogram, shift) for shift, weight in zip(range(-2, 3), kernel))
+
+        scores = sum(weight * np.roll(histogram, -cents // cents_per_bin) for cents, weight in cls.template.items())
+        best = int(np.argmax(scores))
+        distance = np.abs((np.arange(bins) - best + bins // 2) % bins - bins // 2)
+        runner_up = scores[distance > 100 // cents_per_bin].max()
+        confidence = float(1 - runner_up / scores[best]) if scores[best] > 0 else 0.0
+
+        pitch_class = best * cents_per_bin / 100
+        octaves = np.arange(np.floor((midi_notes.min() - pitch_class) / 12) - 1, np.ceil((midi_notes.max() - pitch_class) / 12) + 2)
+        candidates = pitch_class + 12 * octaves
+        counts = [np.count_nonzero((midi_notes >= sa - 5) & (midi_notes <= sa + 19)) for sa in candidates]
+        sa_midi_note = float(candidates[int(np.argmax(counts))])
+        return TonicEstimate(sa_midi_note, float(440.0 * 2 ** ((sa_midi_note - 69) / 12)), confidence, len(midi_notes))
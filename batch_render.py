@@ -0,0 +1,224 @@
+"""
+Renders a large corpus of labeled raag chord progressions across a process pool.
+
+Every progression is sampled with the 4 2+2 rule over the chord space of a raag (as in the Chord Dream notebook),
+seeded by (seed, progression index) so the corpus is reproducible regardless of the number of workers.
+Progressions are written in shards, each with its own manifest part, so an interrupted run resumes where it stopped.
+
+Usage:
+    python batch_render.py configuration/batch_render.yaml output/corpus --workers 8
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import os
+import random
+import numpy as np
+
+import utils
+from music_elements import OfflineInstrument, RaagRegistry
+from music_elements.progression import get_chords_in_raag, get_chord_space, sample_progression
+from music_elements.renderer import write_wav
+
+DEFAULT_SPEC = {
+    'raags': None,
+    'chord_types': ['major', 'minor'],
+    'num_progressions': 100,
+    'progressions_per_shard': 50,
+    'tempo_range': [180, 300],
+    'seed': 0,
+    'sample_rate': 22050,
+    'sa_midi_note': 61,
+    'format': 'npz',
+    'raag_config': 'configuration/raag_config.yaml',
+    'chord_config': 'configuration/chord_config.yaml',
+}
+
+# per-process caches, filled on first use in each worker
+_chord_spaces = {}
+
+
+def load_spec(filepath):
+    """
+    Loads a batch render spec, filling in defaults for missing keys.
+
+    Args:
+        filepath (str): The filepath of the spec YAML file.
+
+    Raises:
+        ValueError: If the spec contains unknown keys or an unsupported format.
+
+    Returns:
+        out (dict): The spec.
+    """
+    spec = dict(utils.load_yaml(filepath) or {})
+    unknown = set(spec) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ValueError(f'Unknown batch render spec keys: {sorted(unknown)}.')
+    out = {**DEFAULT_SPEC, **spec}
+    if out['format'] not in ('npz', 'wav'):
+        raise ValueError(f"Format must be 'npz' or 'wav', got '{out['format']}'.")
+    if out['raags'] is None:
+        out['raags'] = list(RaagRegistry(out['raag_config']))
+    return out
+
+
+def get_spec_hash(spec):
+    """
+    Computes the hash of a spec, used to refuse resuming a run with a different spec.
+
+    Args:
+        spec (dict): The spec.
+
+    Returns:
+        out (str): The sha256 hex digest of the spec.
+    """
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def get_raag_chord_space(spec, raag_name):
+    """
+    Gets the chord space of a raag for the chord types of a spec, cached per process.
+
+    Args:
+        spec (dict): The spec.
+        raag_name (str): The name of the raag.
+
+    Returns:
+        out (List[Chord]): The chord space.
+    """
+    key = (spec['raag_config'], spec['chord_config'], tuple(spec['chord_types']), raag_name)
+    if key not in _chord_spaces:
+        chord_config = utils.load_yaml(spec['chord_config'])
+        chord_types = {name: chord_config[name] for name in spec['chord_types']}
+        raag = RaagRegistry(spec['raag_config'])[raag_name]
+        _chord_spaces[key] = get_chord_space(get_chords_in_raag(raag, chord_types))
+    return _chord_spaces[key]
+
+
+def render_progression(spec, index):
+    """
+    Samples and renders one progression. The result only depends on the spec and the progression index.
+
+    Args:
+        spec (dict): The spec.
+        index (int): The index of the progression in the corpus.
+
+    Returns:
+        out (Tuple[np.ndarray, dict]): The float32 audio and the label record of the progression.
+    """
+    rng = random.Random(f"{spec['seed']}-{index}")
+    raag_name = rng.choice(spec['raags'])
+    tempo = rng.uniform(*spec['tempo_range'])
+    chords = sample_progression(get_raag_chord_space(spec, raag_name), rng)
+
+    instrument = OfflineInstrument(tempo=tempo, sa_midi_note=spec['sa_midi_note'], sample_rate=spec['sample_rate'])
+    for chord in chords:
+        instrument.play_chord(chord)
+    record = {
+        'index': index,
+        'raag': raag_name,
+        'chord_types': spec['chord_types'],
+        'tempo': tempo,
+        'sa_midi_note': spec['sa_midi_note'],
+        'chords': [[note.notation for note in chord] for chord in chords],
+    }
+    return instrument.render(), record
+
+
+def render_shard(spec, shard, out_dir):
+    """
+    Renders one shard of the corpus and writes its audio and manifest part atomically.
+    The manifest part is written last, so its existence marks the shard as done.
+
+    Args:
+        spec (dict): The spec.
+        shard (int): The index of the shard.
+        out_dir (str): The output directory.
+
+    Returns:
+        out (int): The index of the shard.
+    """
+    start = shard * spec['progressions_per_shard']
+    stop = min(start + spec['progressions_per_shard'], spec['num_progressions'])
+    shard_name = f'shard-{shard:05d}'
+    records, clips = [], []
+    for index in range(start, stop):
+        audio, record = render_progression(spec, index)
+        clips.append(audio)
+        records.append(record)
+
+    if spec['format'] == 'npz':
+        offsets = np.cumsum([0] + [len(clip) for clip in clips])
+        for record, offset, clip in zip(records, offsets, clips):
+            record.update({'file': f'{shard_name}.npz', 'offset': int(offset), 'num_samples': len(clip)})
+        temp_path = os.path.join(out_dir, f'{shard_name}.tmp.npz')
+        np.savez(temp_path, audio=np.concatenate(clips), offsets=offsets, indices=np.arange(start, stop), sample_rate=spec['sample_rate'])
+        os.replace(temp_path, os.path.join(out_dir, f'{shard_name}.npz'))
+    else:
+        os.makedirs(os.path.join(out_dir, shard_name), exist_ok=True)
+        for record, clip in zip(records, clips):
+            record.update({'file': os.path.join(shard_name, f"{record['index']:08d}.wav"), 'num_samples': len(clip)})
+            write_wav(os.path.join(out_dir, record['file']), clip, spec['sample_rate'])
+
+    temp_path = os.path.join(out_dir, f'{shard_name}.jsonl.tmp')
+    with open(temp_path, 'w') as file:
+        file.writelines(json.dumps(record) + '\n' for record in records)
+    os.replace(temp_path, os.path.join(out_dir, f'{shard_name}.jsonl'))
+    return shard
+
+
+def run(spec, out_dir, workers=None):
+    """
+    Renders the corpus of a spec, skipping shards that are already done, and writes the merged manifest.
+
+    Args:
+        spec (dict): The spec.
+        out_dir (str): The output directory.
+        workers (int, optional): The number of worker processes. Defaults to None (one per CPU).
+
+    Raises:
+        ValueError: If the output directory holds a run with a different spec.
+
+    Returns:
+        out (str): The filepath of the manifest.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    spec_path = os.path.join(out_dir, 'spec.json')
+    spec_hash = get_spec_hash(spec)
+    if os.path.exists(spec_path):
+        with open(spec_path) as file:
+            if json.load(file)['hash'] != spec_hash:
+                raise ValueError(f'{out_dir} holds a run with a different spec; use a new output directory.')
+    else:
+        with open(spec_path, 'w') as file:
+            json.dump({'hash': spec_hash, 'spec': spec}, file, indent=2)
+
+    num_shards = -(-spec['num_progressions'] // spec['progressions_per_shard'])
+    pending = [shard for shard in range(num_shards) if not os.path.exists(os.path.join(out_dir, f'shard-{shard:05d}.jsonl'))]
+    print(f'{num_shards - len(pending)}/{num_shards} shards already done')
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(render_shard, spec, shard, out_dir) for shard in pending]
+        for done, future in enumerate(concurrent.futures.as_completed(futures), start=num_shards - len(pending) + 1):
+            print(f'shard {future.result():05d} done ({done}/{num_shards})')
+
+    out = os.path.join(out_dir, 'manifest.jsonl')
+    with open(out, 'w') as manifest:
+        for shard in range(num_shards):
+            with open(os.path.join(out_dir, f'shard-{shard:05d}.jsonl')) as file:
+                manifest.write(file.read())
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render a corpus of labeled raag chord progressions.')
+    parser.add_argument('spec', help='filepath of the batch render spec YAML file')
+    parser.add_argument('out_dir', help='output directory (re-run with the same directory to resume)')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per CPU)')
+    args = parser.parse_args()
+    print(f'manifest written to {run(load_spec(args.spec), args.out_dir, args.workers)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark suite for the music_elements core, with JSON results and regression checks.
+
+Every case is timed as the best and median of several repeats of an automatically sized loop. Batch cases run
+once per scale factor, with inputs growing linearly with the scale. `compare` flags the cases whose best time
+grew by more than a threshold and exits with status 1 if there are any.
+
+Usage:
+    python benchmarks/bench_core.py run --output base.json
+    python benchmarks/bench_core.py run --scale 1 4 16 --filter chord --output head.json
+    python benchmarks/bench_core.py compare base.json head.json --threshold 0.1
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import timeit
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+from music_elements.note import Note
+from music_elements.chord import Chord
+from music_elements.chord_set import ChordSet
+from music_elements.raag_registry import RaagRegistry
+from music_elements.progression import get_chords_in_raag
+from utils import load_yaml
+
+RAAG_CONFIG = os.path.join(REPO_ROOT, 'configuration', 'raag_config.yaml')
+CHORD_CONFIG = os.path.join(REPO_ROOT, 'configuration', 'chord_config.yaml')
+
+
+def get_random_chords(size: int, seed: int = 0) -> List[Chord]:
+    """
+    Builds random chords of every configured chord type, root, inversion and saptak.
+
+    Args:
+        size (int): The number of chords.
+        seed (int, optional): The random seed. Defaults to 0.
+
+    Returns:
+        List[Chord]: The Chord objects.
+    """
+    rng = random.Random(seed)
+    chord_types = list(load_yaml(CHORD_CONFIG).values())
+    chords = []
+    for _ in range(size):
+        intervals = rng.choice(chord_types)
+        chord = Chord(Note(rng.randrange(-12, 12)), list(intervals))
+        chords.append(chord.invert(rng.randrange(len(intervals))))
+    return chords
+
+
+def get_cases() -> Dict[str, Callable[[int], Callable[[], object]]]:
+    """
+    Builds the benchmark cases. Every case maps a scale factor to the zero-argument callable that is timed.
+
+    Returns:
+        Dict[str, Callable[[int], Callable[[], object]]]: A dictionary mapping case names to case builders.
+    """
+    note = Note('g')
+    other = Note('d.+')
+    chord = Chord([Note('s'), Note('g'), Note('p'), Note('n.')])
+    notes = [Note(value) for value in range(-12, 12)]
+    chord_types = dict(load_yaml(CHORD_CONFIG))
+    raags = RaagRegistry(RAAG_CONFIG)
+    raag = raags['bilaval']
+
+    def raag_contains(scale: int) -> Callable[[], object]:
+        chords = get_random_chords(1000 * scale)
+        return lambda: [chord in raag for chord in chords]
+
+    def raag_contains_batch(scale: int) -> Callable[[], object]:
+        chord_sets = ChordSet.group_by_size(get_random_chords(1000 * scale)).values()
+        return lambda: [raag.contains_batch(chord_set) for chord_set in chord_sets]
+
+    def chords_in_all_raags(scale: int) -> Callable[[], object]:
+        # every scale step adds all chord types again under new names, so the enumeration grows linearly
+        scaled_types = {f'{name}-{copy}': intervals for copy in range(scale) for name, intervals in chord_types.items()}
+        return lambda: {name: get_chords_in_raag(raags[name], scaled_types) for name in raags}
+
+    return {
+        'note_from_int': lambda scale: lambda: Note(17),
+        'note_from_notation': lambda scale: lambda: Note('d.+'),
+        'note_add': lambda scale: lambda: note + 7,
+        'note_sub': lambda scale: lambda: note - 5,
+        'note_hash': lambda scale: lambda: hash(other),
+        'chord_construct': lambda scale: lambda: Chord(notes[7:11]),
+        'chord_invert': lambda scale: lambda: chord.invert(2),
+        'chord_get_all_inversions': lambda scale: lambda: chord.get_all_inversions(),
+        'chord_get_base_chord': lambda scale: lambda: chord.get_base_chord(),
+        'chord_shift_saptak': lambda scale: lambda: chord.shift_saptak(3),
+        'raag_contains': raag_contains,
+        'raag_contains_batch': raag_contains_batch,
+        'load_yaml_raag_config': lambda scale: lambda: load_yaml(RAAG_CONFIG),
+        'chords_in_all_raags': chords_in_all_raags,
+    }
+
+
+# cases whose inputs grow with the scale factor; the others run at scale 1 only
+SCALED_CASES = {'raag_contains', 'raag_contains_batch', 'chords_in_all_raags'}
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_seconds: float = 0.05) -> Dict[str, float]:
+    """
+    Measures the time per call of a function.
+
+    Args:
+        func (Callable[[], object]): The function to measure.
+        repeat (int, optional): The number of timed loops. Defaults to 5.
+        min_seconds (float, optional): The minimum duration of a timed loop. Defaults to 0.05.
+
+    Returns:
+        Dict[str, float]: The best ('min_s') and median ('median_s') seconds per call, and the calls per loop ('number').
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_seconds:
+        number *= 2
+    times = [time / number for time in timer.repeat(repeat, number)]
+    return {'min_s': min(times), 'median_s': statistics.median(times), 'number': number}
+
+
+def get_metadata() -> Dict[str, str]:
+    """
+    Describes the environment of a run.
+
+    Returns:
+        Dict[str, str]: The git revision, Python and NumPy versions, machine and time.
+    """
+    try:
+        revision = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = 'unknown'
+    return {
+        'revision': revision,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.platform(),
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def run(args: argparse.Namespace) -> None:
+    results = {}
+    for case, build in get_cases().items():
+        if args.filter and not re.search(args.filter, case):
+            continue
+        for scale in (args.scale if case in SCALED_CASES else [1]):
+            name = f'{case}[scale={scale}]'
+            results[name] = {'case': case, 'scale': scale, **measure(build(scale), args.repeat, args.min_seconds)}
+            print(f"{name:<40}{results[name]['min_s'] * 1e6:>14.3f} us{results[name]['median_s'] * 1e6:>14.3f} us")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'metadata': get_metadata(), 'results': results}, file, indent=2)
+
+
+def compare(args: argparse.Namespace) -> None:
+    with open(args.base) as file:
+        base = json.load(file)['results']
+    with open(args.head) as file:
+        head = json.load(file)['results']
+
+    regressions = []
+    print(f"{'case':<40}{'base us':>14}{'head us':>14}{'ratio':>10}")
+    for name in base:
+        if name not in head:
+            continue
+        ratio = head[name]['min_s'] / base[name]['min_s']
+        flag = ''
+        if ratio > 1 + args.threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif ratio < 1 / (1 + args.threshold):
+            flag = '  improved'
+        print(f"{name:<40}{base[name]['min_s'] * 1e6:>14.3f}{head[name]['min_s'] * 1e6:>14.3f}{ratio:>10.2f}{flag}")
+    if regressions:
+        print(f'{len(regressions)} regression(s) beyond {args.threshold:.0%}')
+        sys.exit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--scale', type=int, nargs='+', default=[1], help='scale factors of the batch cases')
+    run_parser.add_argument('--filter', default=None, help='regular expression selecting case names')
+    run_parser.add_argument('--repeat', type=int, default=5, help='timed loops per case')
+    run_parser.add_argument('--min-seconds', type=float, default=0.05, help='minimum duration of a timed loop')
+    run_parser.add_argument('--output', default=None, help='JSON file to save the results to')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser('compare', help='compare two JSON results')
+    compare_parser.add_argument('base', help='JSON results of the baseline')
+    compare_parser.add_argument('head', help='JSON results of the change')
+    compare_parser.add_argument('--threshold', type=float, default=0.1, help='relative slowdown flagged as a regression')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Import-time budget check for the music_elements and analysis packages.
+
+Imports each package in fresh interpreters, reports the median wall time, and fails (exit status 1) if the
+median exceeds the budget or if the import loaded a heavy audio backend (scamp, librosa, compiam) that should
+only load on first use.
+
+CI gates on the same check through `tests/test_import_budget.py`, which calls `check_budget` under pytest.
+
+Usage:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-ms 300 --runs 9
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('scamp', 'librosa', 'compiam')
+
+DEFAULT_PACKAGES = ['music_elements', 'analysis']
+
+DEFAULT_BUDGET_MS = 250.0
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {package}
+seconds = time.perf_counter() - start
+print(json.dumps({{'seconds': seconds, 'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(package: str, runs: int) -> dict:
+    """
+    Imports a package in fresh interpreters.
+
+    Args:
+        package (str): The name of the package.
+        runs (int): The number of interpreters.
+
+    Returns:
+        dict: The median import time in milliseconds ('median_ms') and the heavy modules loaded by the import ('heavy').
+    """
+    times, heavy = [], set()
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, '-c', PROBE.format(package=package, heavy=HEAVY_MODULES)], cwd=REPO_ROOT, text=True)
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result['seconds'] * 1e3)
+        heavy.update(result['heavy'])
+    return {'median_ms': statistics.median(times), 'heavy': sorted(heavy)}
+
+
+def check_budget(packages: List[str], budget_ms: float, runs: int) -> List[str]:
+    """
+    Measures the import time of packages and checks them against the budget.
+
+    Args:
+        packages (List[str]): The names of the packages.
+        budget_ms (float): The maximum median import time of each package in milliseconds.
+        runs (int): The number of interpreters per package.
+
+    Raises:
+        AssertionError: If a package exceeds the budget or loads a heavy audio backend, with the report as the message.
+
+    Returns:
+        List[str]: A report line of every package.
+    """
+    lines, failed = [], False
+    for package in packages:
+        result = measure(package, runs)
+        status = 'ok'
+        if result['heavy']:
+            status = f"FAIL: loaded {', '.join(result['heavy'])}"
+        elif result['median_ms'] > budget_ms:
+            status = f'FAIL: over the {budget_ms:.0f} ms budget'
+        failed |= status != 'ok'
+        lines.append(f"{package:<20}{result['median_ms']:>10.1f} ms  {status}")
+    assert not failed, '\n'.join(lines)
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--packages', nargs='+', default=DEFAULT_PACKAGES, help='packages to import')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help='maximum median import time of each package')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per package')
+    args = parser.parse_args()
+
+    try:
+        print('\n'.join(check_budget(args.packages, args.budget_ms, args.runs)))
+    except AssertionError as error:
+        print(error)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
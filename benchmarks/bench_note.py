@@ -0,0 +1,116 @@
+"""
+Micro-benchmark for Note construction, arithmetic, notation parsing and hashing.
+
+Reports the time per operation (ns/op) and the number of memory blocks retained per operation
+(blocks/op) for the working tree's Note and, optionally, for the Note of another git revision.
+
+`--against` takes any git revision that has `music_elements/note.py`, e.g. HEAD for uncommitted changes, or
+the root commit for the Note before interning.
+
+Usage:
+    python benchmarks/bench_note.py
+    python benchmarks/bench_note.py --against HEAD
+    python benchmarks/bench_note.py --against "$(git rev-list --max-parents=0 HEAD)"
+"""
+import argparse
+import os
+import subprocess
+import sys
+import timeit
+import types
+from typing import Callable, Dict
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+def load_note_class(revision: str = None) -> type:
+    """
+    Loads the Note class from the working tree or from a git revision.
+
+    Args:
+        revision (str, optional): The git revision to load `music_elements/note.py` from. Defaults to None (working tree).
+
+    Returns:
+        type: The Note class.
+    """
+    if revision is None:
+        from music_elements.note import Note
+        return Note
+    source = subprocess.check_output(['git', 'show', f'{revision}:music_elements/note.py'], cwd=REPO_ROOT, text=True)
+    module = types.ModuleType(f'note_{revision}')
+    exec(compile(source, f'{revision}:music_elements/note.py', 'exec'), module.__dict__)
+    return module.Note
+
+
+def get_cases(Note: type) -> Dict[str, Callable[[], object]]:
+    """
+    Builds the benchmark cases for a Note class.
+
+    Args:
+        Note (type): The Note class under test.
+
+    Returns:
+        Dict[str, Callable[[], object]]: A dictionary mapping case names to zero-argument callables.
+    """
+    note = Note('g')
+    other = Note('d.+')
+    return {
+        'construct_int': lambda: Note(17),
+        'parse_notation': lambda: Note('d.+'),
+        'add': lambda: note + 7,
+        'sub': lambda: note - 5,
+        'shift_saptak': lambda: note.shift_saptak(1),
+        'get_base_note': lambda: other.get_base_note(),
+        'hash': lambda: hash(note),
+        'set_lookup': lambda: {note, other},
+    }
+
+
+def measure(func: Callable[[], object], number: int) -> Dict[str, float]:
+    """
+    Measures the time per call and the memory blocks retained per call of a function.
+
+    Args:
+        func (Callable[[], object]): The function to measure.
+        number (int): The number of calls.
+
+    Returns:
+        Dict[str, float]: The nanoseconds per call ('ns_op') and memory blocks retained per call ('blocks_op').
+    """
+    ns_op = min(timeit.repeat(func, number=number, repeat=5)) / number * 1e9
+    results = [None] * number
+    before = sys.getallocatedblocks()
+    for i in range(number):
+        results[i] = func()
+    blocks_op = (sys.getallocatedblocks() - before) / number
+    del results
+    return {'ns_op': ns_op, 'blocks_op': blocks_op}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--against', default=None, help='git revision to compare the working tree against')
+    parser.add_argument('--number', type=int, default=100_000, help='calls per measurement')
+    args = parser.parse_args()
+
+    columns = {'current': load_note_class()}
+    if args.against is not None:
+        try:
+            columns = {args.against: load_note_class(args.against), **columns}
+        except subprocess.CalledProcessError:
+            parser.error(f'no music_elements/note.py at git revision {args.against!r}')
+    results = {name: {case: measure(func, args.number) for case, func in get_cases(Note).items()} for name, Note in columns.items()}
+
+    header = f"{'case':<16}" + ''.join(f'{name + " ns/op":>20}{name + " blocks/op":>24}' for name in columns)
+    print(header)
+    print('-' * len(header))
+    for case in get_cases(columns['current']):
+        row = f'{case:<16}'
+        for name in columns:
+            row += f"{results[name][case]['ns_op']:>20.1f}{results[name][case]['blocks_op']:>24.2f}"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
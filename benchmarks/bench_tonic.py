@@ -0,0 +1,81 @@
+"""
+Benchmark of tonic estimation accuracy versus time, for full analysis and for sampled windows.
+
+Synthetic recordings are rendered with OfflineInstrument: a random walk over the notes of a raag,
+leaning on sa and pa, at a random sa between MIDI notes 55 and 66. An estimate is counted as correct
+when it is within half a semitone of the true sa.
+
+Usage:
+    python benchmarks/bench_tonic.py [--recordings 6] [--seconds 60] [--windows 1 3]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from music_elements import OfflineInstrument, RaagRegistry
+from analysis import PitchTracker, TonicEstimator
+
+
+def render_recording(filepath: str, seconds: float, rng: random.Random) -> int:
+    """
+    Renders a synthetic melody in a random raag at a random sa.
+
+    Args:
+        filepath (str): The filepath of the WAV file.
+        seconds (float): The length of the recording in seconds.
+        rng (random.Random): The random number generator.
+
+    Returns:
+        int: The MIDI note number of the sa of the recording.
+    """
+    registry = RaagRegistry(os.path.join(REPO_ROOT, 'configuration', 'raag_config.yaml'))
+    raag = registry[rng.choice(list(registry))]
+    notes = list(raag.notes)
+    weights = [3.0 if note.base_value in (0, 7) else 1.0 for note in notes]
+    sa_midi_note = rng.randint(55, 66)
+    instrument = OfflineInstrument(tempo=120, sa_midi_note=sa_midi_note, sample_rate=16000)
+    while instrument.get_seconds(instrument.beat) < seconds:
+        note = rng.choices(notes, weights)[0]
+        instrument.play_note(note.shift_saptak(rng.choice([0, 0, 0, 1])), duration=rng.choice([0.5, 1.0, 2.0]))
+    instrument.write_wav(filepath)
+    return sa_midi_note
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--recordings', type=int, default=6, help='number of synthetic recordings')
+    parser.add_argument('--seconds', type=float, default=60.0, help='length of every recording in seconds')
+    parser.add_argument('--windows', type=int, nargs='+', default=[1, 3], help='numbers of windows for the sampled modes')
+    parser.add_argument('--window-seconds', type=float, default=5.0, help='length of every sampled window in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    modes = {'full': None, **{f'{num_windows} x {args.window_seconds:g}s': num_windows for num_windows in args.windows}}
+    results = {mode: {'errors': [], 'seconds': 0.0} for mode in modes}
+    with tempfile.TemporaryDirectory() as directory:
+        for k in range(args.recordings):
+            filepath = os.path.join(directory, f'{k}.wav')
+            sa_midi_note = render_recording(filepath, args.seconds, rng)
+            for mode, num_windows in modes.items():
+                estimator = TonicEstimator(PitchTracker(), num_windows=num_windows, window_seconds=args.window_seconds, cache_dir=None)
+                start = time.perf_counter()
+                estimate = estimator.estimate(filepath)
+                results[mode]['seconds'] += time.perf_counter() - start
+                results[mode]['errors'].append(estimate.sa_midi_note - sa_midi_note)
+
+    print(f"{'mode':<16}{'accuracy':>10}{'mean |error|':>14}{'s/recording':>14}")
+    for mode, result in results.items():
+        errors = np.abs(result['errors'])
+        print(f"{mode:<16}{np.mean(errors < 0.5):>10.2f}{errors.mean():>14.2f}{result['seconds'] / args.recordings:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,83 @@
+import importlib
+import sys
 from .note import Note
 from .chord import Chord
-from .raag import Raag
-from .instrument import Instrument
\ No newline at end of file
+
+# exports loaded on first access, so importing the package loads neither numpy, yaml and asyncio nor the heavy
+# audio backends (scamp) until an export that needs them is used
+_lazy_exports = {
+    'Raag': '.raag',
+    'ChordSet': '.chord_set',
+    'RaagRegistry': '.raag_registry',
+    'ChordIndex': '.chord_index',
+    'ChordIdentifier': '.chord_identifier',
+    'ChordName': '.chord_identifier',
+    'Tuning': '.tuning',
+    'RaagClassifier': '.raag_classifier',
+    'PhraseMatcher': '.phrase_matcher',
+    'PhraseMatch': '.phrase_matcher',
+    'Violation': '.phrase_matcher',
+    'BeamSearch': '.generator',
+    'MelodyGenerator': '.generator',
+    'ProgressionGenerator': '.generator',
+    'VoiceLeadingMatrix': '.voice_leading',
+    'Harmonizer': '.harmonizer',
+    'Event': '.event_store',
+    'EventStore': '.event_store',
+    'EventWriter': '.event_store',
+    'write_events': '.event_store',
+    'CorpusStats': '.corpus_stats',
+    'RecordingStats': '.corpus_stats',
+    'PhraseIndex': '.phrase_index',
+    'PhraseHit': '.phrase_index',
+    'HarmoniumVoice': '.renderer',
+    'OfflineInstrument': '.renderer',
+    'Drone': '.accompaniment',
+    'Theka': '.accompaniment',
+    'SampleBank': '.accompaniment',
+    'LiveAnalyzer': '.live_analysis',
+    'MidiEvent': '.live_analysis',
+    'ChordAnalysis': '.live_analysis',
+    'PlaybackScheduler': '.scheduler',
+    'ScheduledEvent': '.scheduler',
+    'ScampBackend': '.scheduler',
+    'NullBackend': '.scheduler',
+    'Instrument': '.instrument',
+}
+
+__all__ = ['Note', 'Chord', *_lazy_exports]
+
+
+def __getattr__(name: str):
+    """
+    Imports a lazy export on first access.
+
+    Args:
+        name (str): The name of the export.
+
+    Raises:
+        AttributeError: If the name is not an export of the package.
+
+    Returns:
+        Any: The exported object.
+    """
+    if name in _lazy_exports:
+        module = importlib.import_module(_lazy_exports[name], __name__)
+        # instrumentation enabled before the first access skipped the modules that were not imported yet
+        instrumentation = sys.modules.get(f'{__name__}.instrumentation')
+        if instrumentation is not None:
+            instrumentation.install_pending()
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    """
+    Lists the attributes of the package, including the lazy exports not loaded yet.
+
+    Returns:
+        List[str]: The names of the attributes.
+    """
+    return sorted(set(globals()) | set(_lazy_exports))
@@ -0,0 +1,510 @@
+import numpy as np
+from collections import OrderedDict
+from .note import Note
+from .raag import Raag
+from .renderer import HarmoniumVoice
+from .tuning import Tuning
+from typing import Callable, Hashable, Optional, Sequence, Tuple
+
+# the bols of one cycle of the theka of every taal, one bol per matra (beat)
+THEKAS = {
+    'teentaal': ('dha', 'dhin', 'dhin', 'dha', 'dha', 'dhin', 'dhin', 'dha', 'dha', 'tin', 'tin', 'ta', 'ta', 'dhin', 'dhin', 'dha'),
+    'keherwa': ('dha', 'ge', 'na', 'ti', 'na', 'ka', 'dhi', 'na'),
+    'dadra': ('dha', 'dhi', 'na', 'dha', 'ti', 'na'),
+}
+
+# the strokes of every bol on the dayan (the right drum, tuned to Sa) and the bayan (the left drum), None for no stroke
+BOLS = {
+    'dha': ('na', 'ge'),
+    'dhin': ('tin', 'ge'),
+    'dhi': ('tin', 'ge'),
+    'na': ('na', None),
+    'ta': ('na', None),
+    'tin': ('tin', None),
+    'ti': ('ti', None),
+    'ge': (None, 'ge'),
+    'ka': (None, 'ka'),
+    '-': (None, None),
+}
+
+class SampleBank:
+    """
+    Represents a least-recently-used cache of rendered sample buffers, bounded by their total size.
+
+    Buffers are keyed by everything they depend on (e.g. the instrument, Sa and the sample rate), rendered on the first
+    request and returned read-only, since every render that uses them shares the same copy.
+
+    Attributes:
+        max_bytes (int): The largest total size of the cached buffers in bytes.
+        nbytes (int): The total size of the cached buffers in bytes.
+        hits (int): The number of requests served from the cache.
+        misses (int): The number of requests that rendered a buffer.
+        buffers (OrderedDict): The cached buffers by key, from the least to the most recently used.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2 ** 20):
+        """
+        Initializes an empty SampleBank object.
+
+        Args:
+            max_bytes (int, optional): The largest total size of the cached buffers in bytes. Defaults to 256 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.buffers: OrderedDict = OrderedDict()
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of cached buffers.
+
+        Returns:
+            int: The number of cached buffers.
+        """
+        return len(self.buffers)
+
+
+    def get(self, key: Hashable, render: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Gets a buffer from the cache, rendering it and evicting the least recently used buffers if it is missing.
+
+        Args:
+            key (Hashable): The key of the buffer.
+            render (Callable[[], np.ndarray]): The function rendering the buffer.
+
+        Returns:
+            np.ndarray: The read-only buffer.
+        """
+        buffer = self.buffers.get(key)
+        if buffer is not None:
+            self.hits += 1
+            self.buffers.move_to_end(key)
+            return buffer
+        self.misses += 1
+        buffer = np.ascontiguousarray(render(), dtype=np.float32)
+        buffer.flags.writeable = False
+        self.buffers[key] = buffer
+        self.nbytes += buffer.nbytes
+        while self.nbytes > self.max_bytes and len(self.buffers) > 1:
+            _, evicted = self.buffers.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return buffer
+
+
+    def clear(self) -> None:
+        """
+        Removes all buffers from the cache.
+        """
+        self.buffers.clear()
+        self.nbytes = 0
+
+
+# the bank shared by every Drone and Theka without a bank of its own, one per process
+DEFAULT_BANK = SampleBank()
+
+
+def mix(buffer: np.ndarray, samples: np.ndarray, offset: int, gain: float = 1.0) -> None:
+    """
+    Adds samples to a buffer at a sample offset, dropping the samples outside the buffer.
+
+    Args:
+        buffer (np.ndarray): The float32 buffer, modified in place.
+        samples (np.ndarray): The samples.
+        offset (int): The sample offset of the first sample in the buffer (may be negative).
+        gain (float, optional): The gain applied to the samples. Defaults to 1.0.
+    """
+    start, end = max(offset, 0), min(offset + len(samples), len(buffer))
+    if start < end:
+        buffer[start:end] += samples[start - offset:end - offset] * np.float32(gain)
+
+
+def mix_periodic(buffer: np.ndarray, samples: np.ndarray, period: float, gain: float = 1.0) -> None:
+    """
+    Adds samples to a buffer repeatedly, every `period` samples from the start of the buffer. Offsets are rounded
+    from the exact multiples of the period, so loops with fractional periods do not drift from the rest of the mix.
+
+    Args:
+        buffer (np.ndarray): The float32 buffer, modified in place.
+        samples (np.ndarray): The samples of one period, possibly followed by a tail that rings into the next periods.
+        period (float): The period in samples.
+        gain (float, optional): The gain applied to the samples. Defaults to 1.0.
+    """
+    for offset in np.round(np.arange(0, len(buffer), period)).astype(np.int64).tolist():
+        mix(buffer, samples, offset, gain)
+
+
+class Drone:
+    """
+    Represents a drone accompaniment tied to Sa: a tanpura plucking its strings in a cycle, or a sustained shruti box.
+
+    One cycle of the drone is rendered once per (Sa, sample rate) into a SampleBank and looped with sample-accurate
+    offsets, so rendering many tracks in the same Sa costs a single synthesis.
+
+    Attributes:
+        kind (str): The kind of drone, 'tanpura' or 'shruti_box'.
+        notes (Tuple[Note, ...]): The notes of the drone (the strings of the tanpura, in plucking order).
+        saptak (int): The saptak shift of the drone relative to the main part.
+        volume (float): The volume of the drone between 0 and 1.
+        pluck_interval (float): The time between the plucks of the tanpura in seconds; a cycle has one extra interval of rest.
+        loop_seconds (float): The length of the loop of the shruti box in seconds.
+        tuning (Tuning): The tuning of the notes, or None for equal temperament.
+        bank (SampleBank): The cache of rendered cycles.
+    """
+
+    def __init__(self, kind: str = 'tanpura', notes: Optional[Sequence[Note]] = None, saptak: int = -1, volume: float = 0.5, pluck_interval: float = 0.6, loop_seconds: float = 4.0, tuning: Optional[Tuning] = None, bank: Optional[SampleBank] = None):
+        """
+        Initializes a Drone object.
+
+        Args:
+            kind (str, optional): The kind of drone, 'tanpura' or 'shruti_box'. Defaults to 'tanpura'.
+            notes (Sequence[Note], optional): The notes of the drone. Defaults to None (Pa of the lower saptak, Sa, Sa and lower Sa).
+            saptak (int, optional): The saptak shift of the drone relative to the main part. Defaults to -1.
+            volume (float, optional): The volume of the drone between 0 and 1. Defaults to 0.5.
+            pluck_interval (float, optional): The time between the plucks of the tanpura in seconds. Defaults to 0.6.
+            loop_seconds (float, optional): The length of the loop of the shruti box in seconds. Defaults to 4.0.
+            tuning (Tuning, optional): The tuning of the notes. Defaults to None (equal temperament).
+            bank (SampleBank, optional): The cache of rendered cycles. Defaults to None (DEFAULT_BANK).
+
+        Raises:
+            ValueError: If the kind of drone is unknown.
+        """
+        if kind not in ('tanpura', 'shruti_box'):
+            raise ValueError(f"Drone kind must be 'tanpura' or 'shruti_box', got '{kind}'.")
+        self.kind = kind
+        self.notes = tuple(notes) if notes is not None else (Note('p-'), Note('s'), Note('s'), Note('s-'))
+        self.saptak = saptak
+        self.volume = volume
+        self.pluck_interval = pluck_interval
+        self.loop_seconds = loop_seconds
+        self.tuning = tuning
+        self.bank = bank if bank is not None else DEFAULT_BANK
+
+
+    @classmethod
+    def for_raag(cls, raag: Raag, **kwargs) -> 'Drone':
+        """
+        Creates a drone on Sa and the first of Pa, shuddh Ma and shuddh Ni that is in a raag, as the first string
+        of a tanpura is tuned for raags without Pa.
+
+        Args:
+            raag (Raag): The raag.
+            **kwargs: The other arguments of the Drone.
+
+        Returns:
+            Drone: The resulting Drone object.
+        """
+        first = next((note for note in (Note('p'), Note('m'), Note('n')) if note in raag), Note('p'))
+        return cls(notes=(first - len(Note.notes), Note('s'), Note('s'), Note('s-')), **kwargs)
+
+
+    def get_frequencies(self, sa_midi_note: int) -> np.ndarray:
+        """
+        Gets the frequencies of the notes of the drone.
+
+        Args:
+            sa_midi_note (int): The MIDI note number of Sa of the main part.
+
+        Returns:
+            np.ndarray: The frequencies in Hz.
+        """
+        values = np.array([note.note_value for note in self.notes]) + self.saptak * len(Note.notes)
+        sa_hz = 440.0 * 2 ** ((sa_midi_note - 69) / 12)
+        if self.tuning is not None:
+            return np.atleast_1d(self.tuning.get_frequency(values, sa_hz))
+        return sa_hz * 2 ** (values / 12)
+
+
+    def get_cycle(self, sample_rate: int, sa_midi_note: int) -> Tuple[np.ndarray, float]:
+        """
+        Gets one cycle of the drone from the bank, rendering it if needed.
+
+        Args:
+            sample_rate (int): The sample rate in Hz.
+            sa_midi_note (int): The MIDI note number of Sa of the main part.
+
+        Returns:
+            Tuple[np.ndarray, float]: The read-only samples of the cycle (with the ringing tail of a tanpura cycle) and its period in samples.
+        """
+        frequencies = self.get_frequencies(sa_midi_note)
+        if self.kind == 'tanpura':
+            period = (len(self.notes) + 1) * self.pluck_interval * sample_rate
+            render = lambda: render_tanpura_cycle(frequencies, self.pluck_interval, sample_rate)
+            settings = (self.pluck_interval,)
+        else:
+            period = int(round(self.loop_seconds * sample_rate))
+            render = lambda: render_shruti_box_loop(frequencies, period, sample_rate)
+            settings = (period,)
+        key = ('drone', self.kind, tuple(np.round(frequencies, 6).tolist()), sample_rate) + settings
+        return self.bank.get(key, render), period
+
+
+    def mix(self, buffer: np.ndarray, sample_rate: int, tempo: float, sa_midi_note: int) -> None:
+        """
+        Adds the drone to a buffer, from its start to its end.
+
+        Args:
+            buffer (np.ndarray): The float32 buffer, modified in place.
+            sample_rate (int): The sample rate in Hz.
+            tempo (float): The tempo in beats per minute (unused; a drone does not follow the tempo).
+            sa_midi_note (int): The MIDI note number of Sa of the main part.
+        """
+        cycle, period = self.get_cycle(sample_rate, sa_midi_note)
+        if self.kind == 'tanpura':
+            mix_periodic(buffer, cycle, period, self.volume)
+            return
+        # fade the sustained reeds in and out instead of starting and stopping them abruptly
+        layer = np.zeros_like(buffer)
+        mix_periodic(layer, cycle, period, self.volume)
+        fade = min(int(0.5 * sample_rate), len(layer) // 2)
+        if fade:
+            layer[:fade] *= np.linspace(0, 1, fade, endpoint=False, dtype=np.float32)
+            layer[len(layer) - fade:] *= np.linspace(1, 0, fade, dtype=np.float32)
+        buffer += layer
+
+
+    def render(self, num_samples: int, sample_rate: int, tempo: float, sa_midi_note: int) -> np.ndarray:
+        """
+        Renders the drone alone.
+
+        Args:
+            num_samples (int): The number of samples.
+            sample_rate (int): The sample rate in Hz.
+            tempo (float): The tempo in beats per minute.
+            sa_midi_note (int): The MIDI note number of Sa of the main part.
+
+        Returns:
+            np.ndarray: The float32 samples.
+        """
+        buffer = np.zeros(num_samples, dtype=np.float32)
+        self.mix(buffer, sample_rate, tempo, sa_midi_note)
+        return buffer
+
+
+class Theka:
+    """
+    Represents a tabla accompaniment playing the theka of a taal in a loop, one bol per beat of the main part.
+
+    Every stroke is rendered once per (Sa, sample rate) for the dayan, which is tuned to Sa, and once per sample rate
+    for the bayan. Whole cycles are rendered from the strokes once per tempo. All of them are kept in a SampleBank
+    and mixed with sample-accurate offsets.
+
+    Attributes:
+        taal (str): The name of the taal.
+        bols (Tuple[str, ...]): The bols of one cycle (see BOLS).
+        volume (float): The volume of the tabla between 0 and 1.
+        bank (SampleBank): The cache of rendered strokes and cycles.
+    """
+
+    def __init__(self, taal: str = 'teentaal', volume: float = 0.3, bols: Optional[Sequence[str]] = None, bank: Optional[SampleBank] = None):
+        """
+        Initializes a Theka object.
+
+        Args:
+            taal (str, optional): The name of the taal, a key of THEKAS unless bols are given. Defaults to 'teentaal'.
+            volume (float, optional): The volume of the tabla between 0 and 1. Defaults to 0.3.
+            bols (Sequence[str], optional): The bols of one cycle. Defaults to None (the theka of the taal).
+            bank (SampleBank, optional): The cache of rendered strokes and cycles. Defaults to None (DEFAULT_BANK).
+
+        Raises:
+            ValueError: If the taal is unknown or a bol is not in BOLS.
+        """
+        if bols is None and taal not in THEKAS:
+            raise ValueError(f"Unknown taal '{taal}', expected one of {list(THEKAS)} or bols.")
+        self.taal = taal
+        self.bols = tuple(bols) if bols is not None else THEKAS[taal]
+        unknown = sorted(set(self.bols) - set(BOLS))
+        if unknown:
+            raise ValueError(f'Unknown bols {unknown}, expected bols of {list(BOLS)}.')
+        self.volume = volume
+        self.bank = bank if bank is not None else DEFAULT_BANK
+
+
+    def get_stroke(self, stroke: str, sample_rate: int, sa_midi_note: int) -> np.ndarray:
+        """
+        Gets the samples of a stroke from the bank, rendering them if needed.
+
+        Args:
+            stroke (str): The stroke, one of the dayan strokes 'na', 'tin' and 'ti' or the bayan strokes 'ge' and 'ka'.
+            sample_rate (int): The sample rate in Hz.
+            sa_midi_note (int): The MIDI note number of Sa, which the dayan is tuned to.
+
+        Returns:
+            np.ndarray: The read-only samples.
+        """
+        tuned = stroke in ('na', 'tin', 'ti')
+        key = ('stroke', stroke, sa_midi_note if tuned else None, sample_rate)
+        sa_hz = 440.0 * 2 ** ((sa_midi_note - 69) / 12)
+        return self.bank.get(key, lambda: render_stroke(stroke, sa_hz, sample_rate))
+
+
+    def get_cycle(self, sample_rate: int, tempo: float, sa_midi_note: int) -> Tuple[np.ndarray, float]:
+        """
+        Gets one cycle of the theka from the bank, rendering it from the strokes if needed.
+
+        Args:
+            sample_rate (int): The sample rate in Hz.
+            tempo (float): The tempo in beats per minute.
+            sa_midi_note (int): The MIDI note number of Sa.
+
+        Returns:
+            Tuple[np.ndarray, float]: The read-only samples of the cycle, with the tail of its last strokes, and its period in samples.
+        """
+        beat = 60.0 / tempo * sample_rate
+
+        def render() -> np.ndarray:
+            strokes = [
+                [self.get_stroke(stroke, sample_rate, sa_midi_note) for stroke in BOLS[bol] if stroke is not None]
+                for bol in self.bols
+            ]
+            offsets = np.round(np.arange(len(self.bols)) * beat).astype(np.int64).tolist()
+            out = np.zeros(max((offset + len(samples) for offset, row in zip(offsets, strokes) for samples in row), default=0), dtype=np.float32)
+            for offset, row in zip(offsets, strokes):
+                for samples in row:
+                    mix(out, samples, offset)
+            return out
+
+        return self.bank.get(('theka', self.bols, sa_midi_note, sample_rate, round(tempo, 6)), render), len(self.bols) * beat
+
+
+    def mix(self, buffer: np.ndarray, sample_rate: int, tempo: float, sa_midi_note: int) -> None:
+        """
+        Adds the theka to a buffer, starting on the sam (the first beat) at the start of the buffer.
+
+        Args:
+            buffer (np.ndarray): The float32 buffer, modified in place.
+            sample_rate (int): The sample rate in Hz.
+            tempo (float): The tempo in beats per minute.
+            sa_midi_note (int): The MIDI note number of Sa.
+        """
+        cycle, period = self.get_cycle(sample_rate, tempo, sa_midi_note)
+        mix_periodic(buffer, cycle, period, self.volume)
+
+
+    def render(self, num_samples: int, sample_rate: int, tempo: float, sa_midi_note: int) -> np.ndarray:
+        """
+        Renders the theka alone.
+
+        Args:
+            num_samples (int): The number of samples.
+            sample_rate (int): The sample rate in Hz.
+            tempo (float): The tempo in beats per minute.
+            sa_midi_note (int): The MIDI note number of Sa.
+
+        Returns:
+            np.ndarray: The float32 samples.
+        """
+        buffer = np.zeros(num_samples, dtype=np.float32)
+        self.mix(buffer, sample_rate, tempo, sa_midi_note)
+        return buffer
+
+
+def render_pluck(frequency: float, num_samples: int, sample_rate: int, decay: float = 1.5, num_harmonics: int = 16) -> np.ndarray:
+    """
+    Synthesizes a plucked tanpura string: bright harmonics (as the jawari bridge produces) that decay faster than the fundamental.
+
+    Args:
+        frequency (float): The frequency of the string in Hz.
+        num_samples (int): The number of samples.
+        sample_rate (int): The sample rate in Hz.
+        decay (float, optional): The decay time constant of the fundamental in seconds. Defaults to 1.5.
+        num_harmonics (int, optional): The number of harmonics. Defaults to 16.
+
+    Returns:
+        np.ndarray: The float32 samples, with a peak amplitude of 1.
+    """
+    harmonics = np.arange(1, num_harmonics + 1)
+    harmonics = harmonics[harmonics * frequency < sample_rate / 2]
+    t = np.arange(num_samples) / sample_rate
+    amplitudes = harmonics ** -0.7
+    decays = decay / (1 + 0.15 * (harmonics - 1))
+    out = (amplitudes[:, None] * np.exp(-t[None, :] / decays[:, None]) * np.sin(2 * np.pi * frequency * harmonics[:, None] * t[None, :])).sum(axis=0)
+    attack = min(int(0.005 * sample_rate), num_samples)
+    out[:attack] *= np.linspace(0, 1, attack, endpoint=False)
+    return (out / max(np.max(np.abs(out)), 1e-9)).astype(np.float32)
+
+
+def render_tanpura_cycle(frequencies: Sequence[float], pluck_interval: float, sample_rate: int, ring: float = 4.0) -> np.ndarray:
+    """
+    Synthesizes one cycle of a tanpura: every string plucked in turn, followed by one interval of rest.
+
+    Args:
+        frequencies (Sequence[float]): The frequencies of the strings in plucking order, in Hz.
+        pluck_interval (float): The time between plucks in seconds.
+        sample_rate (int): The sample rate in Hz.
+        ring (float, optional): The time every string rings in seconds. Defaults to 4.0.
+
+    Returns:
+        np.ndarray: The float32 samples of the cycle, including the ringing of its last strings into the next cycles.
+    """
+    num_samples = int(round(ring * sample_rate))
+    offsets = np.round(np.arange(len(frequencies)) * pluck_interval * sample_rate).astype(np.int64).tolist()
+    out = np.zeros(offsets[-1] + num_samples if offsets else 0, dtype=np.float32)
+    for offset, frequency in zip(offsets, frequencies):
+        out[offset:offset + num_samples] += render_pluck(frequency, num_samples, sample_rate)
+    return out * np.float32(0.3)
+
+
+def render_shruti_box_loop(frequencies: Sequence[float], num_samples: int, sample_rate: int, detune_cents: float = 3.0) -> np.ndarray:
+    """
+    Synthesizes a seamless loop of a shruti box sustaining the drone notes on two slightly detuned reeds. Every reed
+    is rounded to a whole number of periods per loop (at most half a cycle per loop off), so the loop repeats without clicks.
+
+    Args:
+        frequencies (Sequence[float]): The frequencies of the notes in Hz.
+        num_samples (int): The length of the loop in samples.
+        sample_rate (int): The sample rate in Hz.
+        detune_cents (float, optional): The detuning of the second reed in cents. Defaults to 3.0.
+
+    Returns:
+        np.ndarray: The float32 samples of the loop.
+    """
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    reeds = np.concatenate([frequencies, frequencies * 2 ** (detune_cents / 1200)])
+    cycles = np.maximum(np.round(reeds * num_samples / sample_rate), 1)
+    out = HarmoniumVoice(detune_cents=0.0, attack=0.0, release=0.0).synthesize(cycles * sample_rate / num_samples, num_samples, sample_rate)
+    return out * np.float32(0.3 / max(np.max(np.abs(out)), 1e-9))
+
+
+def render_stroke(stroke: str, sa_hz: float, sample_rate: int) -> np.ndarray:
+    """
+    Synthesizes a tabla stroke from decaying modes and noise: the open ringing 'na', the damped 'tin' (which sounds
+    the second mode more than the fundamental) and the closed 'ti' of the dayan, tuned to Sa, and the resonant 'ge',
+    which slides down in pitch, and the flat 'ka' of the bayan.
+
+    Args:
+        stroke (str): The stroke, one of 'na', 'tin', 'ti', 'ge' and 'ka'.
+        sa_hz (float): The frequency of Sa in Hz.
+        sample_rate (int): The sample rate in Hz.
+
+    Raises:
+        ValueError: If the stroke is unknown.
+
+    Returns:
+        np.ndarray: The float32 samples.
+    """
+    # (length, fundamental, mode ratios, mode amplitudes, decay of the fundamental, noise amplitude, noise decay, gain)
+    strokes = {
+        'na': (1.0, sa_hz, (1, 2, 3, 4, 5), (1.0, 0.6, 0.4, 0.25, 0.15), 0.35, 0.3, 0.004, 0.5),
+        'tin': (0.8, sa_hz, (1, 2, 3, 4, 5), (0.2, 1.0, 0.5, 0.3, 0.15), 0.25, 0.2, 0.004, 0.4),
+        'ti': (0.15, sa_hz, (1, 2, 3), (1.0, 0.5, 0.3), 0.03, 0.6, 0.01, 0.35),
+        'ge': (1.2, 90.0, (1, 2), (1.0, 0.3), 0.45, 0.1, 0.005, 0.6),
+        'ka': (0.12, 120.0, (1,), (0.3,), 0.02, 1.0, 0.02, 0.35),
+    }
+    if stroke not in strokes:
+        raise ValueError(f'Unknown stroke {stroke}, expected one of {list(strokes)}.')
+    length, fundamental, ratios, amplitudes, decay, noise_amplitude, noise_decay, gain = strokes[stroke]
+    t = np.arange(int(round(length * sample_rate))) / sample_rate
+    ratios, amplitudes = np.asarray(ratios, dtype=np.float64), np.asarray(amplitudes)
+    if stroke == 'ge':
+        # the pitch of the bayan starts high and slides down to the fundamental
+        phase = 2 * np.pi * fundamental * (t + 0.3 * 0.05 * (1 - np.exp(-t / 0.05)))
+    else:
+        phase = 2 * np.pi * fundamental * t
+    decays = decay / ratios ** 0.5
+    out = (amplitudes[:, None] * np.exp(-t[None, :] / decays[:, None]) * np.sin(ratios[:, None] * phase[None, :])).sum(axis=0)
+    # the noise of the hand hitting the skin, the same for every render
+    noise = np.random.default_rng(0).standard_normal(len(t))
+    out += noise_amplitude * noise * np.exp(-t / noise_decay)
+    return (out / max(np.max(np.abs(out)), 1e-9) * gain).astype(np.float32)
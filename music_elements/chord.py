@@ -9,6 +9,7 @@ class Chord:
         notes (List[Note]): The list of Note objects that make up the chord.
         root_note (Note): The root Note object of the chord.
         intervals (List[int]): The list of intervals that make up the chord.
+        mask (int): The pitch-class bitmask of the chord, i.e. the union of the bitmasks of its notes.
     """
     
     def __init__(self, notes: Union[List[Note], Note], intervals: List[int] = None):
@@ -29,6 +30,20 @@ class Chord:
             self.intervals = intervals
 
 
+    @property
+    def mask(self) -> int:
+        """
+        Returns the pitch-class bitmask of the chord.
+
+        Returns:
+            int: The union of the pitch-class bitmasks of the notes in the chord.
+        """
+        mask = 0
+        for note in self.notes:
+            mask |= note.mask
+        return mask
+
+
     def __repr__(self) -> str:
         """
         Returns a string representation of the Chord object.
@@ -0,0 +1,138 @@
+import numpy as np
+from .note import Note
+from .chord import Chord
+from .chord_set import ChordSet
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+class ChordName(NamedTuple):
+    """
+    Represents a name of a chord.
+
+    Attributes:
+        chord_type (str): The name of the chord type, e.g. 'major'.
+        root (Note): The root of the chord type in root position (saptak 0), e.g. s for [g, p, s+].
+        inversion (int): The index of the voicing shape in `Chord(bass, intervals).get_all_inversions()`, where
+            bass is the lowest note of the chord and intervals are those of the chord type.
+    """
+    chord_type: str
+    root: Note
+    inversion: int
+
+
+class ChordIdentifier:
+    """
+    Represents a lookup table from (lowest pitch class, pitch-class set) to chord names.
+
+    The table has one slot for each of the 12 * 4096 combinations of lowest pitch class and pitch-class set, so
+    naming a chord is a single table read whatever its voicing, and naming many chords is a single gather.
+    Doubled notes and open voicings name the same as the close voicing with the same lowest note.
+
+    Attributes:
+        chord_type_names (List[str]): The names of the chord types.
+        offsets (np.ndarray): The start of the candidates of every slot in the candidate arrays, plus the end.
+        candidate_types (np.ndarray): The chord type index of every candidate, ordered by slot.
+        candidate_roots (np.ndarray): The root pitch class of every candidate.
+        candidate_inversions (np.ndarray): The inversion of every candidate.
+        counts (np.ndarray): The number of candidates of every slot.
+        first_types (np.ndarray): The chord type index of the first candidate of every slot, or -1.
+        first_roots (np.ndarray): The root pitch class of the first candidate of every slot, or -1.
+        first_inversions (np.ndarray): The inversion of the first candidate of every slot, or -1.
+    """
+
+    def __init__(self, chord_types: Dict[str, List[int]]):
+        """
+        Initializes a ChordIdentifier object and builds its table.
+
+        Args:
+            chord_types (Dict[str, List[int]]): A dictionary mapping chord type names to chord intervals, e.g. the chord configuration.
+        """
+        self.chord_type_names = list(chord_types)
+        num_notes = len(Note.notes)
+        records = set()
+        for type_index, intervals in enumerate(chord_types.values()):
+            intervals = list(intervals)
+            shapes = [intervals]
+            for _ in range(len(intervals) - 1):
+                shapes.append(Chord.invert_intervals(shapes[-1]))
+            # Chord.get_all_inversions sorts unique chords on the same lowest note, i.e. by their reversed intervals
+            order = sorted(set(map(tuple, shapes)), key=lambda shape: shape[::-1])
+            for n, shape in enumerate(shapes):
+                inversion = order.index(tuple(shape))
+                for bass in range(num_notes):
+                    mask = 0
+                    for interval in shape:
+                        mask |= 1 << (bass + interval) % num_notes
+                    root = (bass - intervals[n]) % num_notes
+                    records.add((bass << num_notes | mask, type_index, root, inversion))
+
+        records = np.array(sorted(records), dtype=np.int64).reshape(-1, 4)
+        self.offsets = np.searchsorted(records[:, 0], np.arange(num_notes << num_notes | 1)).astype(np.int32)
+        self.candidate_types = records[:, 1].astype(np.int16)
+        self.candidate_roots = records[:, 2].astype(np.int8)
+        self.candidate_inversions = records[:, 3].astype(np.int8)
+
+        # the first candidate of every slot, so batches are a gather
+        self.counts = np.diff(self.offsets).astype(np.int16)
+        first = np.where(self.counts > 0, self.offsets[:-1], len(records))
+        self.first_types = np.append(self.candidate_types, -1)[first].astype(np.int16)
+        self.first_roots = np.append(self.candidate_roots, -1)[first].astype(np.int8)
+        self.first_inversions = np.append(self.candidate_inversions, -1)[first].astype(np.int8)
+
+
+    @staticmethod
+    def get_key(chord: Chord) -> int:
+        """
+        Gets the table slot of a chord.
+
+        Args:
+            chord (Chord): The Chord object.
+
+        Returns:
+            int: The lowest pitch class shifted above the pitch-class bitmask.
+        """
+        return chord.notes[0].base_value << len(Note.notes) | chord.mask
+
+
+    def identify(self, chord: Chord) -> List[ChordName]:
+        """
+        Names a chord.
+
+        Args:
+            chord (Chord): The Chord object.
+
+        Returns:
+            List[ChordName]: The candidate names, in chord type order, or an empty list if the chord is not of a known type.
+        """
+        key = self.get_key(chord)
+        candidates = slice(self.offsets[key], self.offsets[key + 1])
+        return [
+            ChordName(self.chord_type_names[chord_type], Note(root), inversion)
+            for chord_type, root, inversion in zip(self.candidate_types[candidates].tolist(), self.candidate_roots[candidates].tolist(), self.candidate_inversions[candidates].tolist())
+        ]
+
+
+    def identify_batch(self, chords: Union[ChordSet, np.ndarray], basses: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Names many chords at once with their first candidate.
+
+        Args:
+            chords (Union[ChordSet, np.ndarray]): A ChordSet, or an array of pitch-class bitmasks (e.g. one per frame).
+            basses (np.ndarray, optional): The lowest pitch class of every bitmask. Required with bitmasks, ignored with a ChordSet.
+
+        Raises:
+            ValueError: If bitmasks are given without their lowest pitch classes.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: The chord type index, root pitch class and inversion
+            of the first candidate of every chord (-1 where unknown), and the number of candidates.
+        """
+        if isinstance(chords, ChordSet):
+            masks = chords.masks.astype(np.int64)
+            basses = chords.values[:, 0].astype(np.int64) % len(Note.notes)
+        elif basses is None:
+            raise ValueError('The lowest pitch classes are required with pitch-class bitmasks')
+        else:
+            masks = np.asarray(chords, dtype=np.int64)
+            basses = np.asarray(basses, dtype=np.int64)
+        keys = basses << len(Note.notes) | masks
+        return self.first_types[keys], self.first_roots[keys], self.first_inversions[keys], self.counts[keys]
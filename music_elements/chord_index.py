@@ -0,0 +1,267 @@
+import os
+import numpy as np
+from .note import Note
+from .chord import Chord
+from .chord_set import ChordSet
+from .raag import Raag
+from typing import Dict, List, Tuple, Union
+
+class ChordIndex:
+    """
+    Represents an inverted index from pitch-class sets to the chord types, inversions and raags they belong to.
+
+    Every chord type is built on all 12 roots and inverted in every way (see `Chord.invert`). Each distinct
+    pitch-class set becomes one row of the index, so lookups by chord are a single table read.
+
+    Attributes:
+        raag_names (List[str]): The names of the indexed raags, in column order.
+        chord_type_names (List[str]): The names of the indexed chord types.
+        fingerprint (str): The content hash of the raag configuration and chord types the index was built from.
+        masks (np.ndarray): The uint16 pitch-class bitmask of every row, in ascending order.
+        in_notes (np.ndarray): A boolean (rows, raags) matrix, True where the row is in the notes of the raag.
+        in_aroh (np.ndarray): A boolean (rows, raags) matrix, True where the row is in the aroh of the raag.
+        in_avroh (np.ndarray): A boolean (rows, raags) matrix, True where the row is in the avroh of the raag.
+        entry_rows (np.ndarray): The row of every (chord type, root, inversion) entry, in ascending order.
+        entry_types (np.ndarray): The chord type index of every entry.
+        entry_roots (np.ndarray): The root pitch class (0-11) of every entry, i.e. the root of the chord type in root
+            position as in `ChordIdentifier`, not the lowest note of the inversion.
+        entry_inversions (np.ndarray): The number of times the chord type is inverted (see `Chord.invert`) in every entry.
+    """
+
+    version = 2
+
+    def __init__(self, raag_names: List[str], chord_type_names: List[str], fingerprint: str, arrays: Dict[str, np.ndarray]):
+        """
+        Initializes a ChordIndex object from its arrays. Use `ChordIndex.build` or `ChordIndex.load` instead.
+
+        Args:
+            raag_names (List[str]): The names of the indexed raags.
+            chord_type_names (List[str]): The names of the indexed chord types.
+            fingerprint (str): The content hash the index was built from.
+            arrays (Dict[str, np.ndarray]): The index arrays (see the class attributes).
+        """
+        self.raag_names = list(raag_names)
+        self.chord_type_names = list(chord_type_names)
+        self.fingerprint = fingerprint
+        self.masks = arrays['masks']
+        self.in_notes = arrays['in_notes']
+        self.in_aroh = arrays['in_aroh']
+        self.in_avroh = arrays['in_avroh']
+        self.entry_rows = arrays['entry_rows']
+        self.entry_types = arrays['entry_types']
+        self.entry_roots = arrays['entry_roots']
+        self.entry_inversions = arrays['entry_inversions']
+        self.raag_columns = {name: column for column, name in enumerate(self.raag_names)}
+        self.rows = np.full(1 << len(Note.notes), -1, dtype=np.int32)
+        self.rows[self.masks] = np.arange(len(self.masks), dtype=np.int32)
+        self.entry_starts = np.searchsorted(self.entry_rows, np.arange(len(self.masks) + 1))
+
+
+    @classmethod
+    def build(cls, raags: Dict[str, Raag], chord_types: Dict[str, List[int]], fingerprint: str = '') -> 'ChordIndex':
+        """
+        Builds the index for a set of raags and chord types.
+
+        Args:
+            raags (Dict[str, Raag]): A dictionary mapping raag names to Raag objects.
+            chord_types (Dict[str, List[int]]): A dictionary mapping chord type names to chord intervals.
+            fingerprint (str, optional): The content hash of the inputs, stored with the index. Defaults to ''.
+
+        Returns:
+            ChordIndex: The resulting ChordIndex object.
+        """
+        entry_masks, entry_types, entry_roots, entry_inversions = [], [], [], []
+        for type_index, intervals in enumerate(chord_types.values()):
+            chord_set = ChordSet.from_roots(range(len(Note.notes)), intervals)
+            for n in range(len(intervals)):
+                entry_masks.append(chord_set.invert(n).masks)
+                entry_types.append(np.full(len(chord_set), type_index))
+                # Chord.invert keeps the lowest note, so the root of the chord type is the n-th interval below it
+                entry_roots.append((np.arange(len(chord_set)) - intervals[n]) % len(Note.notes))
+                entry_inversions.append(np.full(len(chord_set), n))
+        entries = np.stack([np.concatenate(column) for column in (entry_masks, entry_types, entry_roots, entry_inversions)], axis=1)
+
+        # keep the first inversion of every (pitch-class set, chord type, root), e.g. augmented chords repeat themselves
+        _, first = np.unique(entries[:, :3], axis=0, return_index=True)
+        entries = entries[np.sort(first)]
+        entries = entries[np.lexsort((entries[:, 3], entries[:, 2], entries[:, 1], entries[:, 0]))]
+        masks, entry_rows = np.unique(entries[:, 0].astype(np.uint16), return_inverse=True)
+
+        arrays = {
+            'masks': masks,
+            'entry_rows': entry_rows.astype(np.int32),
+            'entry_types': entries[:, 1].astype(np.int16),
+            'entry_roots': entries[:, 2].astype(np.int8),
+            'entry_inversions': entries[:, 3].astype(np.int8),
+        }
+        for scale in ('notes', 'aroh', 'avroh'):
+            columns = [raag.contains_batch(masks, scale) for raag in raags.values()]
+            arrays[f'in_{scale}'] = np.stack(columns, axis=1) if columns else np.zeros((len(masks), 0), dtype=bool)
+        return cls(list(raags), list(chord_types), fingerprint, arrays)
+
+
+    def save(self, filepath: str) -> None:
+        """
+        Saves the index to a compressed NumPy archive. The archive is written to a temporary file and moved into
+        place, so readers never see a partially written archive, even when several processes save at once.
+
+        Args:
+            filepath (str): The filepath of the archive.
+        """
+        temp_path = f'{filepath}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                np.savez_compressed(
+                    file,
+                    version=np.array(self.version),
+                    raag_names=np.array(self.raag_names, dtype=str),
+                    chord_type_names=np.array(self.chord_type_names, dtype=str),
+                    fingerprint=np.array(self.fingerprint),
+                    masks=self.masks,
+                    in_notes=self.in_notes,
+                    in_aroh=self.in_aroh,
+                    in_avroh=self.in_avroh,
+                    entry_rows=self.entry_rows,
+                    entry_types=self.entry_types,
+                    entry_roots=self.entry_roots,
+                    entry_inversions=self.entry_inversions,
+                )
+            os.replace(temp_path, filepath)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+    @classmethod
+    def load(cls, filepath: str) -> 'ChordIndex':
+        """
+        Loads an index saved with `ChordIndex.save`.
+
+        Args:
+            filepath (str): The filepath of the archive.
+
+        Raises:
+            ValueError: If the archive was written by a different version of the index.
+
+        Returns:
+            ChordIndex: The loaded ChordIndex object.
+        """
+        with np.load(filepath, allow_pickle=False) as archive:
+            if int(archive['version']) != cls.version:
+                raise ValueError(f'Chord index version {int(archive["version"])} is not supported (expected {cls.version}).')
+            arrays = {key: archive[key] for key in archive.files}
+        return cls(arrays['raag_names'].tolist(), arrays['chord_type_names'].tolist(), str(arrays['fingerprint']), arrays)
+
+
+    def get_row(self, chord: Union[Chord, int]) -> int:
+        """
+        Gets the index row of a chord or pitch-class bitmask.
+
+        Args:
+            chord (Union[Chord, int]): The Chord object or pitch-class bitmask.
+
+        Returns:
+            int: The row, or -1 if the pitch-class set is not an indexed chord.
+        """
+        return int(self.rows[chord.mask if isinstance(chord, Chord) else chord])
+
+
+    def get_entries(self, chord: Union[Chord, int]) -> List[Tuple[str, Note, int]]:
+        """
+        Gets the chord types, roots (in root position, as in `ChordIdentifier`) and inversions that produce the
+        pitch-class set of a chord.
+
+        Args:
+            chord (Union[Chord, int]): The Chord object or pitch-class bitmask.
+
+        Returns:
+            List[Tuple[str, Note, int]]: A list of (chord type, root note, inversion) tuples.
+        """
+        row = self.get_row(chord)
+        if row < 0:
+            return []
+        entries = slice(self.entry_starts[row], self.entry_starts[row + 1])
+        return [
+            (self.chord_type_names[chord_type], Note(root), inversion)
+            for chord_type, root, inversion in zip(self.entry_types[entries].tolist(), self.entry_roots[entries].tolist(), self.entry_inversions[entries].tolist())
+        ]
+
+
+    def raags_containing(self, chord: Union[Chord, int], scale: str = 'notes') -> List[str]:
+        """
+        Gets the names of the raags that contain a chord.
+
+        Args:
+            chord (Union[Chord, int]): The Chord object or pitch-class bitmask.
+            scale (str, optional): The scale of the raags to check against, one of 'notes', 'aroh' or 'avroh'. Defaults to 'notes'.
+
+        Returns:
+            List[str]: The names of the raags that contain the chord.
+        """
+        row = self.get_row(chord)
+        if row < 0:
+            return []
+        return [self.raag_names[column] for column in np.flatnonzero(self.get_matrix(scale)[row])]
+
+
+    def chords_in_raag(self, raag: str, scale: str = 'notes') -> List[Chord]:
+        """
+        Gets the base chords of all indexed chord types and inversions that are in a raag.
+
+        Args:
+            raag (str): The name of the raag.
+            scale (str, optional): The scale of the raag to check against, one of 'notes', 'aroh' or 'avroh'. Defaults to 'notes'.
+
+        Returns:
+            List[Chord]: A sorted list of base Chord objects.
+        """
+        return self.get_chords(self.get_matrix(scale)[:, self.raag_columns[raag]])
+
+
+    def shared_chords(self, raag_a: str, raag_b: str, scale: str = 'notes') -> List[Chord]:
+        """
+        Gets the base chords that are in both of two raags.
+
+        Args:
+            raag_a (str): The name of the first raag.
+            raag_b (str): The name of the second raag.
+            scale (str, optional): The scale of the raags to check against, one of 'notes', 'aroh' or 'avroh'. Defaults to 'notes'.
+
+        Returns:
+            List[Chord]: A sorted list of base Chord objects.
+        """
+        matrix = self.get_matrix(scale)
+        return self.get_chords(matrix[:, self.raag_columns[raag_a]] & matrix[:, self.raag_columns[raag_b]])
+
+
+    def get_matrix(self, scale: str) -> np.ndarray:
+        """
+        Gets the raag membership matrix of a scale.
+
+        Args:
+            scale (str): The scale, one of 'notes', 'aroh' or 'avroh'.
+
+        Raises:
+            ValueError: If the scale is not one of 'notes', 'aroh' or 'avroh'.
+
+        Returns:
+            np.ndarray: The boolean (rows, raags) membership matrix.
+        """
+        if scale not in ('notes', 'aroh', 'avroh'):
+            raise ValueError(f"Scale must be one of 'notes', 'aroh' or 'avroh', got '{scale}'.")
+        return getattr(self, f'in_{scale}')
+
+
+    def get_chords(self, rows: np.ndarray) -> List[Chord]:
+        """
+        Converts selected index rows to sorted base chords.
+
+        Args:
+            rows (np.ndarray): A boolean array selecting rows.
+
+        Returns:
+            List[Chord]: A sorted list of base Chord objects.
+        """
+        chords = [Chord([Note(value) for value in range(len(Note.notes)) if mask >> value & 1]) for mask in self.masks[rows].tolist()]
+        return sorted(chords)
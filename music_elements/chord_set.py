@@ -0,0 +1,280 @@
+import numpy as np
+from .note import Note
+from .chord import Chord
+from typing import Dict, Iterator, List, Union
+
+class ChordSet:
+    """
+    Represents a batch of chords of the same size, stored as a matrix of note values.
+
+    Each row holds the note values of one chord in ascending order (the same order as `Chord.notes`),
+    so the bulk operations below reproduce the per-object `Chord` methods on the whole batch at once.
+
+    Attributes:
+        values (np.ndarray): An int16 matrix of shape (number of chords, chord size) holding the note values.
+    """
+
+    dtype = np.int16
+
+    def __init__(self, values: Union[np.ndarray, List[List[int]]]):
+        """
+        Initializes a ChordSet object from a matrix of note values.
+
+        Args:
+            values (Union[np.ndarray, List[List[int]]]): The note values of the chords, one chord per row.
+
+        Raises:
+            ValueError: If the values are not a two dimensional matrix.
+        """
+        values = np.asarray(values, dtype=self.dtype)
+        if values.ndim != 2:
+            raise ValueError('ChordSet values must be a two dimensional matrix.')
+        self.values = np.sort(values, axis=1)
+
+
+    @classmethod
+    def from_chords(cls, chords: List[Chord]) -> 'ChordSet':
+        """
+        Creates a ChordSet object from a list of Chord objects of the same size.
+
+        Args:
+            chords (List[Chord]): The list of Chord objects.
+
+        Raises:
+            ValueError: If the chords do not all have the same size.
+
+        Returns:
+            ChordSet: The resulting ChordSet object.
+        """
+        sizes = {len(chord) for chord in chords}
+        if len(sizes) > 1:
+            raise ValueError(f'All chords in a ChordSet must have the same size, got sizes {sorted(sizes)}. Use ChordSet.group_by_size instead.')
+        size = sizes.pop() if sizes else 0
+        values = np.array([[note.note_value for note in chord] for chord in chords], dtype=cls.dtype).reshape(len(chords), size)
+        return cls(values)
+
+
+    @classmethod
+    def group_by_size(cls, chords: List[Chord]) -> Dict[int, 'ChordSet']:
+        """
+        Groups a list of Chord objects of mixed sizes into one ChordSet per chord size.
+
+        Args:
+            chords (List[Chord]): The list of Chord objects.
+
+        Returns:
+            Dict[int, ChordSet]: A dictionary mapping chord sizes to ChordSet objects.
+        """
+        groups: Dict[int, List[Chord]] = {}
+        for chord in chords:
+            groups.setdefault(len(chord), []).append(chord)
+        return {size: cls.from_chords(group) for size, group in sorted(groups.items())}
+
+
+    @classmethod
+    def from_roots(cls, roots: List[Union[str, int, Note]], intervals: List[int]) -> 'ChordSet':
+        """
+        Creates a ChordSet object with one chord of the given intervals on each root note.
+        This is the vectorized equivalent of `[Chord(root, intervals) for root in roots]`.
+
+        Args:
+            roots (List[Union[str, int, Note]]): The root notes as Note objects, str, or int.
+            intervals (List[int]): The list of chord intervals.
+
+        Returns:
+            ChordSet: The resulting ChordSet object.
+        """
+        root_values = np.array([(Note(root) if isinstance(root, (str, int)) else root).note_value for root in roots], dtype=cls.dtype)
+        return cls(root_values[:, None] + np.asarray(intervals, dtype=cls.dtype)[None, :])
+
+
+    @classmethod
+    def concatenate(cls, chord_sets: List['ChordSet']) -> 'ChordSet':
+        """
+        Concatenates ChordSet objects of the same chord size.
+
+        Args:
+            chord_sets (List[ChordSet]): The list of ChordSet objects.
+
+        Returns:
+            ChordSet: The concatenated ChordSet object.
+        """
+        return cls(np.concatenate([chord_set.values for chord_set in chord_sets], axis=0))
+
+
+    def to_chords(self) -> List[Chord]:
+        """
+        Converts the ChordSet object to a list of Chord objects.
+
+        Returns:
+            List[Chord]: The list of Chord objects.
+        """
+        return [Chord([Note(value) for value in row]) for row in self.values.tolist()]
+
+
+    @property
+    def chord_size(self) -> int:
+        """
+        Returns the number of notes in each chord.
+
+        Returns:
+            int: The number of notes in each chord.
+        """
+        return self.values.shape[1]
+
+
+    @property
+    def intervals(self) -> np.ndarray:
+        """
+        Returns the intervals of every chord relative to its root (lowest) note.
+
+        Returns:
+            np.ndarray: An int16 matrix of intervals with the same shape as `values`.
+        """
+        return self.values - self.values[:, :1]
+
+
+    @property
+    def masks(self) -> np.ndarray:
+        """
+        Returns the pitch-class bitmask of every chord (see `Chord.mask`).
+
+        Returns:
+            np.ndarray: A uint16 array with one bitmask per chord.
+        """
+        bits = np.left_shift(np.uint16(1), (self.values % len(Note.notes)).astype(np.uint16))
+        return np.bitwise_or.reduce(bits, axis=1) if self.chord_size else np.zeros(len(self), dtype=np.uint16)
+
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the ChordSet object.
+
+        Returns:
+            str: The string representation of the ChordSet object.
+        """
+        return f"ChordSet({len(self)} chords of size {self.chord_size})"
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of chords in the ChordSet object.
+
+        Returns:
+            int: The number of chords.
+        """
+        return self.values.shape[0]
+
+
+    def __iter__(self) -> Iterator[Chord]:
+        """
+        Returns an iterator over the chords as Chord objects.
+
+        Returns:
+            Iterator[Chord]: An iterator of Chord objects.
+        """
+        return iter(self.to_chords())
+
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[Chord, 'ChordSet']:
+        """
+        Gets the Chord at an integer index, or a ChordSet for a slice, index array or boolean mask.
+
+        Args:
+            index (Union[int, slice, np.ndarray]): The index.
+
+        Returns:
+            Union[Chord, ChordSet]: The selected Chord object or ChordSet object.
+        """
+        if isinstance(index, (int, np.integer)):
+            return Chord([Note(value) for value in self.values[index].tolist()])
+        return ChordSet(self.values[index])
+
+
+    def invert(self, n: int = 1) -> 'ChordSet':
+        """
+        Inverts every chord by n times, keeping the root notes in place (see `Chord.invert`).
+
+        Args:
+            n (int, optional): The number of times to invert the chords. Defaults to 1.
+
+        Returns:
+            ChordSet: The inverted ChordSet object.
+        """
+        size = self.chord_size
+        positions = np.arange(size) + n
+        rotated = self.intervals[:, positions % size] + len(Note.notes) * (positions // size)
+        return ChordSet(self.values[:, :1] + rotated - rotated[:, :1])
+
+
+    def get_all_inversions(self) -> 'ChordSet':
+        """
+        Returns all possible inversions of all chords, without duplicates and sorted.
+        For a ChordSet of one chord this matches `Chord.get_all_inversions`.
+
+        Returns:
+            ChordSet: A sorted ChordSet of all possible inversions.
+        """
+        inversions = np.stack([self.invert(n).values for n in range(self.chord_size)], axis=1)
+        return ChordSet(inversions.reshape(-1, self.chord_size)).unique()
+
+
+    def get_base_chord(self) -> 'ChordSet':
+        """
+        Returns the base chord of every chord (see `Chord.get_base_chord`).
+
+        Returns:
+            ChordSet: The ChordSet of base chords.
+        """
+        return ChordSet(self.values % len(Note.notes))
+
+
+    def shift_saptak(self, n: Union[int, np.ndarray]) -> 'ChordSet':
+        """
+        Shifts the notes of every chord by saptaks one note at a time, n times (see `Chord.shift_saptak`).
+
+        Args:
+            n (Union[int, np.ndarray]): The number of times to shift the saptak, either for all chords or one per chord.
+
+        Returns:
+            ChordSet: The resulting ChordSet object.
+        """
+        size = self.chord_size
+        n = np.asarray(n)[..., None]
+        shifts = n // size + (n % size > np.arange(size))
+        return ChordSet(self.values + len(Note.notes) * shifts)
+
+
+    def argsort(self) -> np.ndarray:
+        """
+        Returns the indices that sort the chords in ascending order, using the same
+        reverse-lexicographic ordering as `Chord.__lt__`.
+
+        Returns:
+            np.ndarray: The sorting indices.
+        """
+        return np.lexsort(self.values.T)
+
+
+    def sort(self) -> 'ChordSet':
+        """
+        Returns the chords sorted in ascending order (see `Chord.__lt__`).
+
+        Returns:
+            ChordSet: The sorted ChordSet object.
+        """
+        return ChordSet(self.values[self.argsort()])
+
+
+    def unique(self) -> 'ChordSet':
+        """
+        Returns the chords sorted in ascending order with duplicates removed,
+        i.e. the equivalent of `sorted(set(chords))`.
+
+        Returns:
+            ChordSet: The sorted ChordSet object without duplicates.
+        """
+        values = self.values[self.argsort()]
+        keep = np.ones(len(values), dtype=bool)
+        keep[1:] = np.any(values[1:] != values[:-1], axis=1)
+        return ChordSet(values[keep])
@@ -0,0 +1,350 @@
+import concurrent.futures
+import hashlib
+import os
+import pickle
+import numpy as np
+from collections import Counter
+from .note import Note
+from .raag import Raag
+from .event_store import EventStore
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class RecordingStats:
+    """
+    Represents mergeable note statistics of one or more recordings, e.g. a single recording or all recordings of a raag.
+
+    Merging two partial aggregates gives the aggregate of their recordings, so statistics can be computed per file
+    in parallel and reduced in any order.
+
+    Attributes:
+        n (int): The length of the counted n-grams.
+        num_recordings (int): The number of recordings.
+        counts (np.ndarray): The number of notes of every pitch class.
+        durations (np.ndarray): The total duration of the notes of every pitch class, in seconds.
+        num_outside (int): The number of notes outside the notes of the raag of their recording.
+        ngrams (Counter): The number of every n-gram of pitch classes of the melody, keyed by its base-12 code.
+    """
+
+    def __init__(self, n: int = 3):
+        """
+        Initializes an empty RecordingStats object.
+
+        Args:
+            n (int, optional): The length of the counted n-grams. Defaults to 3.
+        """
+        num_notes = len(Note.notes)
+        self.n = n
+        self.num_recordings = 0
+        self.counts = np.zeros(num_notes, dtype=np.int64)
+        self.durations = np.zeros(num_notes, dtype=np.float64)
+        self.num_outside = 0
+        self.ngrams: Counter = Counter()
+
+
+    @classmethod
+    def from_store(cls, store: EventStore, raag: Optional[Raag] = None, n: int = 3) -> 'RecordingStats':
+        """
+        Computes the statistics of a recording from its event store, with vectorized scans of its columns.
+
+        Args:
+            store (EventStore): The event store of the recording.
+            raag (Raag, optional): The raag of the recording, to count the notes outside it. Defaults to None.
+            n (int, optional): The length of the counted n-grams. Defaults to 3.
+
+        Returns:
+            RecordingStats: The resulting RecordingStats object.
+        """
+        num_notes = len(Note.notes)
+        out = cls(n)
+        out.num_recordings = 1
+        note_values, _, durations = store.get_note_columns()
+        pitch_classes = np.asarray(note_values, dtype=np.int64) % num_notes
+        out.counts += np.bincount(pitch_classes, minlength=num_notes)
+        out.durations += np.bincount(pitch_classes, weights=durations, minlength=num_notes)
+        if raag is not None:
+            out.num_outside = int(np.count_nonzero((raag.notes_mask >> pitch_classes & 1) == 0))
+
+        # the melody is the sequence of single-note events, broken by chords and rests
+        events = np.flatnonzero(np.diff(store.offsets) == 1)
+        melody = np.asarray(store.note_values[store.offsets[events]], dtype=np.int64) % num_notes
+        if len(melody) >= n:
+            codes = np.zeros(len(melody) - n + 1, dtype=np.int64)
+            for k in range(n):
+                codes = codes * num_notes + melody[k:len(melody) - n + 1 + k]
+            # only count n-grams of consecutive events, i.e. within a run of single notes
+            codes = codes[events[n - 1:] - events[:len(events) - n + 1] == n - 1]
+            values, counts = np.unique(codes, return_counts=True)
+            out.ngrams.update(dict(zip(values.tolist(), counts.tolist())))
+        return out
+
+
+    def merge(self, other: 'RecordingStats') -> 'RecordingStats':
+        """
+        Adds the statistics of other recordings to these statistics.
+
+        Args:
+            other (RecordingStats): The statistics of the other recordings.
+
+        Raises:
+            ValueError: If the statistics count n-grams of different lengths.
+
+        Returns:
+            RecordingStats: The merged RecordingStats object (self).
+        """
+        if other.n != self.n:
+            raise ValueError(f'Cannot merge statistics of {other.n}-grams into statistics of {self.n}-grams')
+        self.num_recordings += other.num_recordings
+        self.counts += other.counts
+        self.durations += other.durations
+        self.num_outside += other.num_outside
+        self.ngrams.update(other.ngrams)
+        return self
+
+
+    @property
+    def distribution(self) -> np.ndarray:
+        """
+        Returns the duration-weighted pitch-class distribution.
+
+        Returns:
+            np.ndarray: The share of the total note duration of every pitch class.
+        """
+        total = self.durations.sum()
+        return self.durations / total if total > 0 else np.zeros_like(self.durations)
+
+
+    @property
+    def outside_rate(self) -> float:
+        """
+        Returns the rate of notes outside the raag of their recording.
+
+        Returns:
+            float: The number of notes outside the raag divided by the number of notes.
+        """
+        total = int(self.counts.sum())
+        return self.num_outside / total if total else 0.0
+
+
+    def get_prominence(self, note: Note) -> float:
+        """
+        Gets the prominence of a note, e.g. the vadi or samvadi, as its share of the note duration relative to the
+        largest share of any pitch class.
+
+        Args:
+            note (Note): The note.
+
+        Returns:
+            float: The prominence, 1.0 for the most prominent pitch class.
+        """
+        distribution = self.distribution
+        return float(distribution[note.base_value] / distribution.max()) if distribution.max() > 0 else 0.0
+
+
+    def top_ngrams(self, k: int = 10) -> List[Tuple[Tuple[Note, ...], int]]:
+        """
+        Gets the most frequent n-grams.
+
+        Args:
+            k (int, optional): The number of n-grams. Defaults to 10.
+
+        Returns:
+            List[Tuple[Tuple[Note, ...], int]]: (notes, count) tuples, from most to least frequent.
+        """
+        num_notes = len(Note.notes)
+        out = []
+        for code, count in self.ngrams.most_common(k):
+            values = []
+            for _ in range(self.n):
+                code, value = divmod(code, num_notes)
+                values.append(Note(value))
+            out.append((tuple(reversed(values)), count))
+        return out
+
+
+    def summary(self, raag: Optional[Raag] = None) -> Dict[str, object]:
+        """
+        Summarizes the statistics.
+
+        Args:
+            raag (Raag, optional): The raag whose vadi and samvadi prominence is reported. Defaults to None.
+
+        Returns:
+            Dict[str, object]: The number of recordings and notes, the pitch-class distribution by notation, the
+            outside rate, the most frequent n-grams and, with a raag, the vadi and samvadi prominence.
+        """
+        out = {
+            'recordings': self.num_recordings,
+            'notes': int(self.counts.sum()),
+            'distribution': {Note(value).notation: round(float(share), 4) for value, share in enumerate(self.distribution)},
+            'outside_rate': self.outside_rate,
+            'top_ngrams': [(' '.join(note.notation for note in notes), count) for notes, count in self.top_ngrams()],
+        }
+        if raag is not None and raag.vadi is not None:
+            out['vadi_prominence'] = self.get_prominence(raag.vadi)
+        if raag is not None and raag.samvadi is not None:
+            out['samvadi_prominence'] = self.get_prominence(raag.samvadi)
+        return out
+
+
+def compute_file_stats(path: str, raags: Dict[str, Raag], n: int, cache_path: Optional[str]) -> Tuple[Optional[str], RecordingStats]:
+    """
+    Computes the statistics of an event store, caching them on disk. Runs in worker processes.
+
+    Args:
+        path (str): The directory of the event store.
+        raags (Dict[str, Raag]): A dictionary mapping raag names to Raag objects.
+        n (int): The length of the counted n-grams.
+        cache_path (str): The filepath of the cached statistics, or None to disable caching.
+
+    Returns:
+        Tuple[Optional[str], RecordingStats]: The raag of the recording (from its metadata) and its statistics.
+    """
+    if cache_path is not None and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+    store = EventStore(path)
+    raag_name = store.metadata.get('raag')
+    out = (raag_name, RecordingStats.from_store(store, raags.get(raag_name), n))
+    if cache_path is not None:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as file:
+            pickle.dump(out, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    return out
+
+
+class CorpusStats:
+    """
+    Represents the statistics of a corpus of transcribed recordings, stored as event stores, per recording and per raag.
+
+    `update` maps new or changed recordings to per-file partial aggregates in a process pool, caching each partial
+    on disk under the path, modification time and settings of its file, so recordings are only processed once. Per-raag
+    statistics are reduced from the partials, which are small.
+
+    Attributes:
+        raags (Dict[str, Raag]): A dictionary (or RaagRegistry) mapping raag names to Raag objects.
+        n (int): The length of the counted n-grams.
+        cache_dir (str): The directory of the cached partials, or None to disable caching.
+        workers (int): The number of worker processes (None for one per core).
+        recordings (Dict[str, Tuple[str, Optional[str], RecordingStats]]): The (fingerprint, raag, statistics) of every recording, keyed by path.
+    """
+
+    version = 2
+
+    def __init__(self, raags: Dict[str, Raag], n: int = 3, cache_dir: Optional[str] = os.path.join('~', '.cache', 'kirtan-net', 'corpus_stats'), workers: Optional[int] = None):
+        """
+        Initializes an empty CorpusStats object.
+
+        Args:
+            raags (Dict[str, Raag]): A dictionary (or RaagRegistry) mapping raag names to Raag objects.
+            n (int, optional): The length of the counted n-grams. Defaults to 3.
+            cache_dir (str, optional): The directory of the cached partials, or None to disable caching. Defaults to '~/.cache/kirtan-net/corpus_stats'.
+            workers (int, optional): The number of worker processes. Defaults to None (one per core).
+        """
+        self.raags = dict(raags)
+        self.n = n
+        self.cache_dir = None if cache_dir is None else os.path.expanduser(cache_dir)
+        self.workers = workers
+        self.recordings: Dict[str, Tuple[str, Optional[str], RecordingStats]] = {}
+
+
+    def get_fingerprint(self, path: str) -> str:
+        """
+        Gets the fingerprint of an event store, which changes when the store is rewritten or the settings change.
+
+        Args:
+            path (str): The directory of the event store.
+
+        Returns:
+            str: The hash of the path, the modification time and size of its metadata and note values, and the settings.
+        """
+        digest = hashlib.sha256(os.path.abspath(path).encode())
+        for name in ('metadata.json', 'note_values.npy'):
+            stat = os.stat(os.path.join(path, name))
+            digest.update(f'{stat.st_mtime_ns}-{stat.st_size}'.encode())
+        digest.update(f'{self.n}-{self.version}-{sorted((name, raag.notes_mask) for name, raag in self.raags.items())}'.encode())
+        return digest.hexdigest()
+
+
+    def update(self, paths: Iterable[str]) -> List[str]:
+        """
+        Adds new recordings and recomputes changed ones, in parallel.
+
+        Args:
+            paths (Iterable[str]): The directories of the event stores of the recordings.
+
+        Returns:
+            List[str]: The paths of the recordings that were added or recomputed.
+        """
+        pending = {}
+        for path in paths:
+            fingerprint = self.get_fingerprint(path)
+            if path not in self.recordings or self.recordings[path][0] != fingerprint:
+                pending[path] = fingerprint
+        if not pending:
+            return []
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(compute_file_stats, path, self.raags, self.n, None if self.cache_dir is None else os.path.join(self.cache_dir, f'{fingerprint}.pickle')): path
+                for path, fingerprint in pending.items()
+            }
+            for future in concurrent.futures.as_completed(futures):
+                path = futures[future]
+                raag_name, stats = future.result()
+                self.recordings[path] = (pending[path], raag_name, stats)
+        return list(pending)
+
+
+    def remove(self, paths: Iterable[str]) -> None:
+        """
+        Removes recordings.
+
+        Args:
+            paths (Iterable[str]): The directories of the event stores of the recordings.
+        """
+        for path in paths:
+            self.recordings.pop(path, None)
+
+
+    def get_recording(self, path: str) -> RecordingStats:
+        """
+        Gets the statistics of a recording.
+
+        Args:
+            path (str): The directory of the event store of the recording.
+
+        Returns:
+            RecordingStats: The statistics.
+        """
+        return self.recordings[path][2]
+
+
+    def by_raag(self) -> Dict[Optional[str], RecordingStats]:
+        """
+        Reduces the statistics of the recordings per raag.
+
+        Returns:
+            Dict[Optional[str], RecordingStats]: The statistics of the recordings of every raag, keyed by raag name (None for recordings without a raag).
+        """
+        out: Dict[Optional[str], RecordingStats] = {}
+        for _, raag_name, stats in self.recordings.values():
+            out.setdefault(raag_name, RecordingStats(self.n)).merge(stats)
+        return out
+
+
+    def total(self) -> RecordingStats:
+        """
+        Reduces the statistics of all recordings.
+
+        Returns:
+            RecordingStats: The statistics of the corpus.
+        """
+        out = RecordingStats(self.n)
+        for _, _, stats in self.recordings.values():
+            out.merge(stats)
+        return out
@@ -0,0 +1,304 @@
+import json
+import os
+import shutil
+import numpy as np
+from array import array
+from .note import Note
+from .chord import Chord
+from typing import Any, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+class Event(NamedTuple):
+    """
+    Represents a timestamped note, chord or rest of a transcription.
+
+    Attributes:
+        onset (float): The onset in seconds.
+        duration (float): The duration in seconds.
+        item (Union[Note, Chord, None]): The Note or Chord object, or None for a rest.
+    """
+    onset: float
+    duration: float
+    item: Union[Note, Chord, None]
+
+
+class EventWriter:
+    """
+    Represents a writer of an event store, buffering events in compact arrays until it is closed.
+
+    Attributes:
+        path (str): The directory of the event store.
+        metadata (Dict[str, Any]): The metadata of the store (e.g. sa_midi_note, raag and source).
+        block_size (int): The number of events per entry of the time index.
+    """
+
+    def __init__(self, path: str, metadata: Optional[Dict[str, Any]] = None, block_size: int = 1024):
+        """
+        Initializes an EventWriter object.
+
+        Args:
+            path (str): The directory of the event store.
+            metadata (Dict[str, Any], optional): The JSON-serializable metadata of the store. Defaults to None.
+            block_size (int, optional): The number of events per entry of the time index. Defaults to 1024.
+        """
+        self.path = path
+        self.metadata = dict(metadata or {})
+        self.block_size = block_size
+        self.onsets = array('f')
+        self.durations = array('f')
+        self.masks = array('H')
+        self.offsets = array('i', [0])
+        self.note_values = array('h')
+        self.last_onset = float('-inf')
+
+
+    def __enter__(self) -> 'EventWriter':
+        """
+        Returns the writer for use in a with statement.
+
+        Returns:
+            EventWriter: The EventWriter object (self).
+        """
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """
+        Writes the store at the end of a with statement, unless it raised an exception.
+        """
+        if exc_type is None:
+            self.close()
+
+
+    def append(self, item: Union[Note, Chord, None], onset: float, duration: float) -> None:
+        """
+        Appends an event. Events must be appended in order of onset.
+
+        Args:
+            item (Union[Note, Chord, None]): The Note or Chord object, or None for a rest.
+            onset (float): The onset in seconds.
+            duration (float): The duration in seconds.
+
+        Raises:
+            ValueError: If the onset is earlier than the onset of the previous event.
+        """
+        if onset < self.last_onset:
+            raise ValueError(f'Events must be appended in order of onset, got {onset} after {self.last_onset}')
+        self.last_onset = onset
+        notes = () if item is None else (item,) if isinstance(item, Note) else item.notes
+        mask = 0
+        for note in notes:
+            self.note_values.append(note.note_value)
+            mask |= note.mask
+        self.onsets.append(onset)
+        self.durations.append(duration)
+        self.masks.append(mask)
+        self.offsets.append(len(self.note_values))
+
+
+    def extend(self, events: Iterable[Tuple[Union[Note, Chord, None], float, float]]) -> None:
+        """
+        Appends events.
+
+        Args:
+            events (Iterable[Tuple[Union[Note, Chord, None], float, float]]): (item, onset, duration) tuples, in order of onset.
+        """
+        for item, onset, duration in events:
+            self.append(item, onset, duration)
+
+
+    def close(self) -> None:
+        """
+        Writes the store, replacing any store at the same path.
+        """
+        temp_path = f'{self.path}.{os.getpid()}.tmp'
+        os.makedirs(temp_path, exist_ok=True)
+        onsets = np.frombuffer(self.onsets, dtype=np.float32)
+        columns = {
+            'onsets': onsets,
+            'durations': np.frombuffer(self.durations, dtype=np.float32),
+            'masks': np.frombuffer(self.masks, dtype=np.uint16),
+            'offsets': np.frombuffer(self.offsets, dtype=np.int32),
+            'note_values': np.frombuffer(self.note_values, dtype=np.int16),
+            'index': onsets[::self.block_size].copy(),
+        }
+        for name, column in columns.items():
+            np.save(os.path.join(temp_path, f'{name}.npy'), column)
+        with open(os.path.join(temp_path, 'metadata.json'), 'w') as file:
+            json.dump({'version': EventStore.version, 'block_size': self.block_size, 'count': len(onsets), 'metadata': self.metadata}, file, indent=2)
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.replace(temp_path, self.path)
+
+
+class EventStore:
+    """
+    Represents a columnar store of the events of a transcription, memory-mapped from a directory of .npy files.
+
+    Every event has a float32 onset and duration, the uint16 pitch-class mask of its notes, and a range of int16 note
+    values given by the int32 offsets. Columns are read without copying, so scans run at disk bandwidth, and
+    Note/Chord objects are only built for the events that are accessed. A sparse index of every `block_size`-th
+    onset locates time ranges without touching the onsets of other blocks.
+
+    Attributes:
+        path (str): The directory of the event store.
+        metadata (Dict[str, Any]): The metadata of the store (e.g. sa_midi_note, raag and source).
+        block_size (int): The number of events per entry of the time index.
+        onsets (np.ndarray): The float32 onsets in seconds, in increasing order.
+        durations (np.ndarray): The float32 durations in seconds.
+        masks (np.ndarray): The uint16 pitch-class mask of every event.
+        offsets (np.ndarray): The int32 start of the notes of every event in note_values, plus the end.
+        note_values (np.ndarray): The int16 note values of all events.
+        index (np.ndarray): The onset of every block_size-th event.
+    """
+
+    version = 1
+
+    def __init__(self, path: str):
+        """
+        Opens an event store written by EventWriter.
+
+        Args:
+            path (str): The directory of the event store.
+
+        Raises:
+            ValueError: If the store was written by a different version.
+        """
+        self.path = path
+        with open(os.path.join(path, 'metadata.json')) as file:
+            header = json.load(file)
+        if header['version'] != self.version:
+            raise ValueError(f"Event store version {header['version']} is not supported (expected {self.version}).")
+        self.metadata = header['metadata']
+        self.block_size = header['block_size']
+        for name in ('onsets', 'durations', 'masks', 'offsets', 'note_values', 'index'):
+            setattr(self, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r'))
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of events.
+
+        Returns:
+            int: The number of events.
+        """
+        return len(self.onsets)
+
+
+    def __getitem__(self, index: int) -> Event:
+        """
+        Gets an event, building its Note or Chord object.
+
+        Args:
+            index (int): The index of the event.
+
+        Returns:
+            Event: The event.
+        """
+        if index < 0:
+            index += len(self)
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        notes = [Note(value) for value in self.note_values[start:end].tolist()]
+        item = None if not notes else notes[0] if len(notes) == 1 else Chord(notes)
+        return Event(float(self.onsets[index]), float(self.durations[index]), item)
+
+
+    def __iter__(self) -> Iterator[Event]:
+        """
+        Returns an iterator over all events.
+
+        Returns:
+            Iterator[Event]: An iterator over the events.
+        """
+        return self.iter_range(0, len(self))
+
+
+    def get_range(self, start_time: float, end_time: float) -> Tuple[int, int]:
+        """
+        Gets the events with an onset in a time range, through the sparse index.
+
+        Args:
+            start_time (float): The start of the range in seconds (inclusive).
+            end_time (float): The end of the range in seconds (exclusive).
+
+        Returns:
+            Tuple[int, int]: The indices of the first event in the range and after the last one.
+        """
+        return self.find(start_time), self.find(end_time)
+
+
+    def find(self, time: float) -> int:
+        """
+        Finds the first event with an onset at or after a time.
+
+        Args:
+            time (float): The time in seconds.
+
+        Returns:
+            int: The index of the event, or the number of events if there is none.
+        """
+        block = max(int(np.searchsorted(self.index, time, side='left')) - 1, 0)
+        start = block * self.block_size
+        end = min(start + 2 * self.block_size, len(self))
+        return start + int(np.searchsorted(self.onsets[start:end], time, side='left'))
+
+
+    def iter_range(self, start: int, end: int) -> Iterator[Event]:
+        """
+        Returns an iterator over a range of events, building their Note and Chord objects one at a time.
+
+        Args:
+            start (int): The index of the first event.
+            end (int): The index after the last event.
+
+        Returns:
+            Iterator[Event]: An iterator over the events.
+        """
+        return (self[index] for index in range(start, end))
+
+
+    def events_between(self, start_time: float, end_time: float) -> Iterator[Event]:
+        """
+        Returns an iterator over the events with an onset in a time range.
+
+        Args:
+            start_time (float): The start of the range in seconds (inclusive).
+            end_time (float): The end of the range in seconds (exclusive).
+
+        Returns:
+            Iterator[Event]: An iterator over the events.
+        """
+        return self.iter_range(*self.get_range(start_time, end_time))
+
+
+    def get_note_columns(self, start: int = 0, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gets the notes of a range of events as columns, with the onset and duration of their event.
+
+        Args:
+            start (int, optional): The index of the first event. Defaults to 0.
+            end (int, optional): The index after the last event. Defaults to None (all events).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The int16 note values and the float32 onsets and durations of every note.
+        """
+        end = len(self) if end is None else end
+        counts = np.diff(self.offsets[start:end + 1])
+        note_values = self.note_values[self.offsets[start]:self.offsets[end]]
+        return note_values, np.repeat(self.onsets[start:end], counts), np.repeat(self.durations[start:end], counts)
+
+
+def write_events(path: str, events: Iterable[Tuple[Union[Note, Chord, None], float, float]], **metadata) -> EventStore:
+    """
+    Writes events to an event store and opens it.
+
+    Args:
+        path (str): The directory of the event store.
+        events (Iterable[Tuple[Union[Note, Chord, None], float, float]]): (item, onset, duration) tuples, in order of onset.
+        **metadata: The metadata of the store (e.g. sa_midi_note, raag and source).
+
+    Returns:
+        EventStore: The written event store.
+    """
+    with EventWriter(path, metadata) as writer:
+        writer.extend(events)
+    return EventStore(path)
@@ -0,0 +1,303 @@
+import numpy as np
+from .note import Note
+from .chord import Chord
+from .raag import Raag
+from .voice_leading import VoiceLeadingMatrix
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+class BeamSearch:
+    """
+    Represents a beam search for low-cost state sequences, given per-state and per-transition costs.
+
+    Each step expands every hypothesis in the beam to every state at once as a (beam width, states) cost matrix,
+    so the search is linear in the sequence length. Infinite costs mark forbidden states and transitions.
+
+    Attributes:
+        start_costs (np.ndarray): The (states,) cost of starting in every state.
+        unary_costs (np.ndarray): The (states,) cost of visiting every state.
+        transition_costs (np.ndarray): The (states, states) cost of moving from one state to another.
+    """
+
+    def __init__(self, start_costs: np.ndarray, unary_costs: np.ndarray, transition_costs: np.ndarray):
+        """
+        Initializes a BeamSearch object.
+
+        Args:
+            start_costs (np.ndarray): The (states,) cost of starting in every state.
+            unary_costs (np.ndarray): The (states,) cost of visiting every state.
+            transition_costs (np.ndarray): The (states, states) cost of moving from one state to another.
+        """
+        self.start_costs = np.asarray(start_costs, dtype=np.float64)
+        self.unary_costs = np.asarray(unary_costs, dtype=np.float64)
+        self.transition_costs = np.asarray(transition_costs, dtype=np.float64)
+
+
+    def steps(self, length: int, beam_width: int, noise: float = 0.0, seed: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Runs the beam search one step at a time.
+
+        Args:
+            length (int): The length of the sequences.
+            beam_width (int): The number of hypotheses kept at every step.
+            noise (float, optional): The scale of Gumbel noise added to the costs, for varied results. Defaults to 0.0.
+            seed (int, optional): The seed of the noise. Defaults to None.
+
+        Raises:
+            ValueError: If no sequence satisfies the constraints.
+
+        Returns:
+            Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]: The (states, costs, back pointers) of the beam at every step,
+            sorted by cost plus the accumulated noise, where the costs are unperturbed and the back pointers index the
+            beam of the previous step.
+        """
+        rng = np.random.default_rng(seed)
+        num_states = len(self.unary_costs)
+        candidates = (self.start_costs + self.unary_costs)[None, :]
+        # the noise only ranks the hypotheses; it accumulates in the scores, never in the costs
+        scores = candidates
+        states = np.zeros(1, dtype=np.int64)
+        for _ in range(length):
+            if noise:
+                scores = scores + noise * rng.gumbel(size=scores.shape)
+            flat = scores.ravel()
+            width = min(beam_width, int(np.count_nonzero(np.isfinite(flat))))
+            if width == 0:
+                raise ValueError('No sequence satisfies the constraints.')
+            top = np.argpartition(flat, width - 1)[:width]
+            top = top[np.argsort(flat[top], kind='stable')]
+            back_pointers, states, costs = top // num_states, top % num_states, candidates.ravel()[top]
+            yield states, costs, back_pointers
+            steps = self.transition_costs[states] + self.unary_costs[None, :]
+            candidates = costs[:, None] + steps
+            scores = flat[top][:, None] + steps
+
+
+    def search(self, length: int, beam_width: int = 64, n_best: int = 1, noise: float = 0.0, seed: Optional[int] = None) -> List[Tuple[List[int], float]]:
+        """
+        Finds the n best state sequences.
+
+        Args:
+            length (int): The length of the sequences.
+            beam_width (int, optional): The number of hypotheses kept at every step. Defaults to 64.
+            n_best (int, optional): The number of sequences to return. Defaults to 1.
+            noise (float, optional): The scale of Gumbel noise added to the costs. Defaults to 0.0.
+            seed (int, optional): The seed of the noise. Defaults to None.
+
+        Returns:
+            List[Tuple[List[int], float]]: (states, cost) tuples, from lowest to highest cost.
+        """
+        history = list(self.steps(length, max(beam_width, n_best), noise, seed))
+        if not history:
+            return []
+        out = []
+        for beam in range(min(n_best, len(history[-1][0]))):
+            sequence, cost = [], float(history[-1][1][beam])
+            for states, _, back_pointers in reversed(history):
+                sequence.append(int(states[beam]))
+                beam = back_pointers[beam]
+            out.append((sequence[::-1], cost))
+        # with noise the beam is ranked by perturbed scores, so order the sequences by their actual costs
+        out.sort(key=lambda item: item[1])
+        return out
+
+
+    def stream(self, length: int, beam_width: int = 64, noise: float = 0.0, seed: Optional[int] = None) -> Iterator[int]:
+        """
+        Finds the best state sequence, yielding every state as soon as all hypotheses in the beam agree on it,
+        so only the undecided tail of the sequence is kept in memory.
+
+        Args:
+            length (int): The length of the sequence.
+            beam_width (int, optional): The number of hypotheses kept at every step. Defaults to 64.
+            noise (float, optional): The scale of Gumbel noise added to the costs. Defaults to 0.0.
+            seed (int, optional): The seed of the noise. Defaults to None.
+
+        Returns:
+            Iterator[int]: The states of the best sequence, in order.
+        """
+        pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        for states, _, back_pointers in self.steps(length, beam_width, noise, seed):
+            pending.append((states, back_pointers))
+            beams = np.arange(len(states))
+            for step in range(len(pending) - 1, 0, -1):
+                beams = np.unique(pending[step][1][beams])
+                if len(beams) == 1:
+                    # every hypothesis descends from one beam of the previous step, so the steps up to it are decided
+                    beam, decided = int(beams[0]), []
+                    for back_step in range(step - 1, -1, -1):
+                        decided.append(int(pending[back_step][0][beam]))
+                        beam = int(pending[back_step][1][beam])
+                    yield from reversed(decided)
+                    pending = pending[step:]
+                    break
+        beam = 0
+        tail = []
+        for states, back_pointers in reversed(pending):
+            tail.append(int(states[beam]))
+            beam = int(back_pointers[beam])
+        yield from reversed(tail)
+
+
+class MelodyGenerator:
+    """
+    Represents a generator of melodies that follow the rules of a raag.
+
+    The states are the notes of the raag across the given saptaks. Moves are forbidden when they leap further than
+    `max_leap` semitones (see `Note.get_distance`), ascend into a note missing from the aroh or descend into a note
+    missing from the avroh. Otherwise they cost their distance, repeated notes cost `repeat_cost`, and the vadi and
+    samvadi are rewarded. The cost tables are computed once per generator.
+
+    Attributes:
+        raag (Raag): The raag.
+        notes (List[Note]): The notes the melody can use.
+        search (BeamSearch): The beam search over the notes.
+    """
+
+    def __init__(self, raag: Raag, saptaks: Sequence[int] = (-1, 0, 1), max_leap: int = 7, repeat_cost: float = 2.0, vadi_weight: float = 1.5, samvadi_weight: float = 1.0, start: Optional[Note] = None):
+        """
+        Initializes a MelodyGenerator object.
+
+        Args:
+            raag (Raag): The raag.
+            saptaks (Sequence[int], optional): The saptaks the melody can use. Defaults to (-1, 0, 1).
+            max_leap (int, optional): The largest allowed move in semitones. Defaults to 7.
+            repeat_cost (float, optional): The cost of repeating a note. Defaults to 2.0.
+            vadi_weight (float, optional): The reward for visiting the vadi. Defaults to 1.5.
+            samvadi_weight (float, optional): The reward for visiting the samvadi. Defaults to 1.0.
+            start (Note, optional): The note the melody starts on. Defaults to None (any note).
+        """
+        self.raag = raag
+        base_values = sorted({note.base_value for note in raag.notes} | {note.base_value for note in (*raag.aroh, *raag.avroh)})
+        self.notes = [Note(value + saptak * len(Note.notes)) for saptak in sorted(saptaks) for value in base_values]
+        values = np.array([note.note_value for note in self.notes])
+        masks = np.array([note.mask for note in self.notes])
+
+        moves = values[None, :] - values[:, None]
+        transition_costs = np.abs(moves).astype(np.float64)
+        transition_costs[moves == 0] = repeat_cost
+        transition_costs[np.abs(moves) > max_leap] = np.inf
+        transition_costs[(moves > 0) & (masks[None, :] & raag.aroh_mask == 0)] = np.inf
+        transition_costs[(moves < 0) & (masks[None, :] & raag.avroh_mask == 0)] = np.inf
+
+        unary_costs = np.zeros(len(self.notes))
+        if raag.vadi is not None:
+            unary_costs[masks == raag.vadi.mask] -= vadi_weight
+        if raag.samvadi is not None:
+            unary_costs[masks == raag.samvadi.mask] -= samvadi_weight
+        start_costs = np.zeros(len(self.notes)) if start is None else np.where(values == start.note_value, 0.0, np.inf)
+        self.search = BeamSearch(start_costs, unary_costs, transition_costs)
+
+
+    def generate(self, length: int, n_best: int = 1, beam_width: int = 64, noise: float = 1.0, seed: Optional[int] = None) -> List[Tuple[List[Note], float]]:
+        """
+        Generates the n best melodies.
+
+        Args:
+            length (int): The number of notes of every melody.
+            n_best (int, optional): The number of melodies. Defaults to 1.
+            beam_width (int, optional): The number of hypotheses kept at every step. Defaults to 64.
+            noise (float, optional): The scale of the random perturbation of the costs. Defaults to 1.0.
+            seed (int, optional): The random seed. Defaults to None.
+
+        Returns:
+            List[Tuple[List[Note], float]]: (notes, cost) tuples, from lowest to highest cost.
+        """
+        return [([self.notes[state] for state in states], cost) for states, cost in self.search.search(length, beam_width, n_best, noise, seed)]
+
+
+    def stream(self, length: int, beam_width: int = 64, noise: float = 1.0, seed: Optional[int] = None) -> Iterator[Note]:
+        """
+        Generates one melody, yielding notes as soon as they are decided.
+
+        Args:
+            length (int): The number of notes of the melody.
+            beam_width (int, optional): The number of hypotheses kept at every step. Defaults to 64.
+            noise (float, optional): The scale of the random perturbation of the costs. Defaults to 1.0.
+            seed (int, optional): The random seed. Defaults to None.
+
+        Returns:
+            Iterator[Note]: The notes of the melody.
+        """
+        for state in self.search.stream(length, beam_width, noise, seed):
+            yield self.notes[state]
+
+
+class ProgressionGenerator:
+    """
+    Represents a generator of chord progressions over a chord space.
+
+    Chords outside the raag are excluded. Moving between chords costs their voice-leading distance (see
+    `VoiceLeadingMatrix`) over the voicings where no voice leaps further than `max_leap`, moves without such a voicing
+    are forbidden, repeated chords cost `repeat_cost`, and chords containing the vadi or samvadi are rewarded.
+
+    Attributes:
+        raag (Raag): The raag.
+        chords (List[Chord]): The chords the progression can use.
+        search (BeamSearch): The beam search over the chords.
+    """
+
+    def __init__(self, raag: Raag, chord_space: List[Chord], max_leap: int = 5, repeat_cost: float = 4.0, vadi_weight: float = 1.0, samvadi_weight: float = 0.5, max_shift: Optional[int] = None):
+        """
+        Initializes a ProgressionGenerator object.
+
+        Args:
+            raag (Raag): The raag.
+            chord_space (List[Chord]): The candidate chords (e.g. from `progression.get_chord_space`).
+            max_leap (int, optional): The largest allowed move of any voice in semitones. Defaults to 5.
+            repeat_cost (float, optional): The cost of repeating a chord. Defaults to 4.0.
+            vadi_weight (float, optional): The reward for a chord containing the vadi. Defaults to 1.0.
+            samvadi_weight (float, optional): The reward for a chord containing the samvadi. Defaults to 0.5.
+            max_shift (int, optional): The largest saptak shift of the voicings considered. Defaults to None (the largest number of voices).
+
+        Raises:
+            ValueError: If no chord of the chord space is in the raag.
+        """
+        self.raag = raag
+        self.chords = [chord for chord in dict.fromkeys(chord_space) if chord in raag]
+        if not self.chords:
+            raise ValueError(f'No chord of the chord space is in raag {raag.name}')
+        masks = np.array([chord.mask for chord in self.chords])
+
+        transition_costs = VoiceLeadingMatrix.get_costs(self.chords, max_shift, max_leap)
+        np.fill_diagonal(transition_costs, repeat_cost)
+
+        unary_costs = np.zeros(len(self.chords))
+        if raag.vadi is not None:
+            unary_costs[masks & raag.vadi.mask != 0] -= vadi_weight
+        if raag.samvadi is not None:
+            unary_costs[masks & raag.samvadi.mask != 0] -= samvadi_weight
+        self.search = BeamSearch(np.zeros(len(self.chords)), unary_costs, transition_costs)
+
+
+    def generate(self, length: int, n_best: int = 1, beam_width: int = 64, noise: float = 1.0, seed: Optional[int] = None) -> List[Tuple[List[Chord], float]]:
+        """
+        Generates the n best progressions.
+
+        Args:
+            length (int): The number of chords of every progression.
+            n_best (int, optional): The number of progressions. Defaults to 1.
+            beam_width (int, optional): The number of hypotheses kept at every step. Defaults to 64.
+            noise (float, optional): The scale of the random perturbation of the costs. Defaults to 1.0.
+            seed (int, optional): The random seed. Defaults to None.
+
+        Returns:
+            List[Tuple[List[Chord], float]]: (chords, cost) tuples, from lowest to highest cost.
+        """
+        return [([self.chords[state] for state in states], cost) for states, cost in self.search.search(length, beam_width, n_best, noise, seed)]
+
+
+    def stream(self, length: int, beam_width: int = 64, noise: float = 1.0, seed: Optional[int] = None) -> Iterator[Chord]:
+        """
+        Generates one progression, yielding chords as soon as they are decided.
+
+        Args:
+            length (int): The number of chords of the progression.
+            beam_width (int, optional): The number of hypotheses kept at every step. Defaults to 64.
+            noise (float, optional): The scale of the random perturbation of the costs. Defaults to 1.0.
+            seed (int, optional): The random seed. Defaults to None.
+
+        Returns:
+            Iterator[Chord]: The chords of the progression.
+        """
+        for state in self.search.stream(length, beam_width, noise, seed):
+            yield self.chords[state]
@@ -0,0 +1,158 @@
+import numpy as np
+from .note import Note
+from .chord import Chord
+from .raag import Raag
+from .progression import get_chords_in_raag, get_chord_space
+from .voice_leading import VoiceLeadingMatrix
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+class Harmonizer:
+    """
+    Represents a harmonizer that fits one chord of a raag to every note of a melody, e.g. the harmonium chord of every beat.
+
+    The candidates of a melody note are the chords of the chord space (every inversion of the chord types in the
+    raag, shifted by the given saptak shifts) that contain its pitch class. Moving between chords costs their
+    voice-leading distance (see `VoiceLeadingMatrix`) over the voicings where no voice leaps further than `max_leap`,
+    moves without such a voicing are forbidden, repeated chords cost `repeat_cost`, and chords containing the vadi or
+    samvadi are rewarded, as in ProgressionGenerator. The best sequence is found exactly with the Viterbi algorithm,
+    in time linear in the length of the melody: the candidates of every pitch class and the transition costs between
+    the candidates of every pair of pitch classes are tables computed once per harmonizer, so every step is a single
+    (previous, current) array operation.
+
+    Notes outside every chord (e.g. notes outside the raag) and rests (None) accept any chord.
+
+    Attributes:
+        raag (Raag): The raag.
+        chords (List[Chord]): The chord space.
+        unary_costs (np.ndarray): The (chords,) cost of every chord.
+        transition_costs (np.ndarray): The (chords, chords) cost of moving from one chord to another.
+        candidates (List[np.ndarray]): The chord indices of the candidates of every pitch class, plus all chords for rests.
+        blocks (List[List[np.ndarray]]): The transition costs from the candidates of every pitch class to the candidates of every pitch class, plus the unary costs of the latter.
+    """
+
+    def __init__(self, raag: Raag, chord_types: Dict[str, List[int]], shifts: Sequence[int] = (-1, 0, 1), max_leap: int = 5, repeat_cost: float = 1.0, vadi_weight: float = 1.0, samvadi_weight: float = 0.5, max_shift: Optional[int] = None):
+        """
+        Initializes a Harmonizer object, computing its candidate and transition tables.
+
+        Args:
+            raag (Raag): The raag.
+            chord_types (Dict[str, List[int]]): A dictionary mapping chord type names to chord intervals, e.g. the chord configuration.
+            shifts (Sequence[int], optional): The saptak shifts of the chord space (see `progression.get_chord_space`). Defaults to (-1, 0, 1).
+            max_leap (int, optional): The largest allowed move of any voice in semitones. Defaults to 5.
+            repeat_cost (float, optional): The cost of repeating a chord. Defaults to 1.0.
+            vadi_weight (float, optional): The reward for a chord containing the vadi. Defaults to 1.0.
+            samvadi_weight (float, optional): The reward for a chord containing the samvadi. Defaults to 0.5.
+            max_shift (int, optional): The largest saptak shift of the voicings considered. Defaults to None (the largest number of voices).
+
+        Raises:
+            ValueError: If no chord of the chord types is in the raag.
+        """
+        num_notes = len(Note.notes)
+        self.raag = raag
+        self.chords = list(dict.fromkeys(get_chord_space(get_chords_in_raag(raag, chord_types), shifts)))
+        if not self.chords:
+            raise ValueError(f'No chord of the chord types {list(chord_types)} is in raag {raag.name}')
+        masks = np.array([chord.mask for chord in self.chords])
+
+        self.transition_costs = VoiceLeadingMatrix.get_costs(self.chords, max_shift, max_leap)
+        np.fill_diagonal(self.transition_costs, repeat_cost)
+
+        self.unary_costs = np.zeros(len(self.chords))
+        if raag.vadi is not None:
+            self.unary_costs[masks & raag.vadi.mask != 0] -= vadi_weight
+        if raag.samvadi is not None:
+            self.unary_costs[masks & raag.samvadi.mask != 0] -= samvadi_weight
+
+        all_chords = np.arange(len(self.chords))
+        self.candidates = []
+        for value in range(num_notes):
+            candidates = np.flatnonzero(masks >> value & 1)
+            self.candidates.append(candidates if len(candidates) else all_chords)
+        self.candidates.append(all_chords)
+        # transition costs between the candidates of every (previous, current) pitch class, plus the unary costs of the current ones
+        self.blocks = [
+            [self.transition_costs[np.ix_(previous, current)] + self.unary_costs[current][None, :] for current in self.candidates]
+            for previous in self.candidates
+        ]
+
+
+    def get_pitch_classes(self, melody: Iterable[Optional[Note]]) -> np.ndarray:
+        """
+        Converts a melody to the rows of the candidate tables.
+
+        Args:
+            melody (Iterable[Optional[Note]]): The notes of the melody, with None for rests.
+
+        Returns:
+            np.ndarray: The pitch class (0-11) of every note, or 12 for rests.
+        """
+        return np.array([len(Note.notes) if note is None else note.base_value for note in melody], dtype=np.int64)
+
+
+    def search(self, pitch_classes: Sequence[int]) -> Tuple[np.ndarray, float]:
+        """
+        Finds the lowest-cost chord sequence for a sequence of pitch classes with the Viterbi algorithm.
+
+        Args:
+            pitch_classes (Sequence[int]): The pitch class (0-11) of every melody note, or 12 for rests.
+
+        Raises:
+            ValueError: If no sequence satisfies the constraints.
+
+        Returns:
+            Tuple[np.ndarray, float]: The chord index of every note and the total cost.
+        """
+        pitch_classes = np.asarray(pitch_classes, dtype=np.int64).tolist()
+        if not pitch_classes:
+            return np.zeros(0, dtype=np.int64), 0.0
+        costs = self.unary_costs[self.candidates[pitch_classes[0]]]
+        back_pointers = []
+        for previous, current in zip(pitch_classes, pitch_classes[1:]):
+            totals = costs[:, None] + self.blocks[previous][current]
+            best = totals.argmin(axis=0)
+            costs = totals.min(axis=0)
+            back_pointers.append(best)
+        if not np.isfinite(costs).any():
+            raise ValueError('No sequence satisfies the constraints.')
+
+        position = int(costs.argmin())
+        cost = float(costs[position])
+        positions = [position]
+        for best in reversed(back_pointers):
+            position = int(best[position])
+            positions.append(position)
+        positions.reverse()
+        return np.array([self.candidates[value][position] for value, position in zip(pitch_classes, positions)], dtype=np.int64), cost
+
+
+    def harmonize(self, melody: Iterable[Optional[Note]]) -> Tuple[List[Chord], float]:
+        """
+        Harmonizes a melody with one chord per note.
+
+        Args:
+            melody (Iterable[Optional[Note]]): The notes of the melody (e.g. one per beat), with None for rests.
+
+        Raises:
+            ValueError: If no sequence satisfies the constraints.
+
+        Returns:
+            Tuple[List[Chord], float]: The chord of every note and the total cost.
+        """
+        indices, cost = self.search(self.get_pitch_classes(melody))
+        return [self.chords[index] for index in indices.tolist()], cost
+
+
+    def harmonize_many(self, melodies: Iterable[Iterable[Optional[Note]]]) -> List[Tuple[List[Chord], float]]:
+        """
+        Harmonizes several melodies in the raag, e.g. a catalog of shabads, reusing the tables of the harmonizer.
+
+        Args:
+            melodies (Iterable[Iterable[Optional[Note]]]): The melodies.
+
+        Raises:
+            ValueError: If no sequence satisfies the constraints for a melody.
+
+        Returns:
+            List[Tuple[List[Chord], float]]: The chords and total cost of every melody.
+        """
+        return [self.harmonize(melody) for melody in melodies]
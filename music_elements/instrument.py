@@ -1,11 +1,14 @@
 from .note import Note
 from .chord import Chord
 
-# imports scamp annd mutes warnings
+# imports scamp and mutes its warnings about missing optional backends, restoring the caller's logging level
 import logging
+_level = logging.getLogger().level
 logging.getLogger().setLevel(logging.ERROR)
-from scamp import Session
-logging.getLogger().setLevel(logging.WARNING)
+try:
+    from scamp import Session
+finally:
+    logging.getLogger().setLevel(_level)
 
 class Instrument:
     """
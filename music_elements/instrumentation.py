@@ -0,0 +1,420 @@
+import bisect
+import collections
+import contextlib
+import functools
+import io
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, TextIO, Tuple
+
+class Histogram:
+    """
+    Represents a call counter with a cumulative timing histogram, as exported to Prometheus.
+
+    Attributes:
+        bounds (List[float]): The upper bounds of the buckets in seconds, doubling from 1 µs to about 8 s.
+        buckets (List[int]): The number of observations in every bucket, plus one for the overflow.
+        count (int): The number of observations.
+        total (float): The sum of the observations in seconds.
+    """
+
+    bounds: List[float] = [1e-6 * 2 ** i for i in range(24)]
+
+    def __init__(self):
+        """
+        Initializes an empty Histogram object.
+        """
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+
+    def observe(self, seconds: float) -> None:
+        """
+        Records an observation.
+
+        Args:
+            seconds (float): The observed duration in seconds.
+        """
+        self.buckets[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket it falls in.
+
+        Args:
+            q (float): The quantile, between 0 and 1.
+
+        Returns:
+            float: The estimated quantile in seconds, or infinity if it falls in the overflow bucket.
+        """
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return float('inf')
+
+
+class Registry:
+    """
+    Represents an in-process registry of the histograms of instrumented functions.
+
+    Attributes:
+        histograms (Dict[str, Histogram]): The histograms, keyed by the qualified name of the function.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty Registry object.
+        """
+        self.histograms: Dict[str, Histogram] = collections.defaultdict(Histogram)
+
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records a call of a function.
+
+        Args:
+            name (str): The qualified name of the function.
+            seconds (float): The duration of the call in seconds.
+        """
+        self.histograms[name].observe(seconds)
+
+
+    def reset(self) -> None:
+        """
+        Removes all observations.
+        """
+        self.histograms.clear()
+
+
+    def to_prometheus(self, prefix: str = 'music_elements') -> str:
+        """
+        Dumps the registry in the Prometheus text exposition format.
+
+        Args:
+            prefix (str, optional): The prefix of the metric names. Defaults to 'music_elements'.
+
+        Returns:
+            str: A `<prefix>_calls_total` counter and a `<prefix>_call_seconds` histogram, labelled by function.
+        """
+        lines = [f'# HELP {prefix}_calls_total Calls of instrumented functions.', f'# TYPE {prefix}_calls_total counter']
+        for name, histogram in sorted(self.histograms.items()):
+            lines.append(f'{prefix}_calls_total{{function="{name}"}} {histogram.count}')
+        lines += [f'# HELP {prefix}_call_seconds Durations of calls of instrumented functions.', f'# TYPE {prefix}_call_seconds histogram']
+        for name, histogram in sorted(self.histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_call_seconds_bucket{{function="{name}",le="{bound:.6g}"}} {cumulative}')
+            lines.append(f'{prefix}_call_seconds_bucket{{function="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_call_seconds_sum{{function="{name}"}} {histogram.total:.9g}')
+            lines.append(f'{prefix}_call_seconds_count{{function="{name}"}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+    def report(self) -> str:
+        """
+        Formats a per-function report, sorted by total time.
+
+        Returns:
+            str: A table of calls, total, mean, p50 and p99 times of every instrumented function.
+        """
+        lines = [f"{'function':<32}{'calls':>10}{'total ms':>12}{'mean us':>12}{'p50 us':>10}{'p99 us':>10}"]
+        for name, histogram in sorted(self.histograms.items(), key=lambda item: -item[1].total):
+            lines.append(
+                f'{name:<32}{histogram.count:>10}{histogram.total * 1e3:>12.3f}{histogram.total / histogram.count * 1e6:>12.3f}'
+                f'{histogram.quantile(0.5) * 1e6:>10.0f}{histogram.quantile(0.99) * 1e6:>10.0f}'
+            )
+        return '\n'.join(lines)
+
+
+class SamplingProfiler:
+    """
+    Represents a statistical profiler that samples the stack of a thread from a background thread.
+
+    Attributes:
+        interval (float): The time between samples in seconds.
+        thread_id (int): The identifier of the sampled thread.
+        samples (collections.Counter): The number of samples of every stack, as tuples of 'file:line function' frames from the outermost.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: Optional[int] = None):
+        """
+        Initializes a SamplingProfiler object.
+
+        Args:
+            interval (float, optional): The time between samples in seconds. Defaults to 0.005.
+            thread_id (int, optional): The identifier of the sampled thread. Defaults to None (the calling thread).
+        """
+        self.interval = interval
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.samples: collections.Counter = collections.Counter()
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+
+    def start(self) -> None:
+        """
+        Starts sampling.
+        """
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.sample, name='sampling-profiler', daemon=True)
+        self.thread.start()
+
+
+    def stop(self) -> None:
+        """
+        Stops sampling.
+        """
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+    def sample(self) -> None:
+        """
+        Records the stack of the sampled thread every interval until stopped.
+        """
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f'{frame.f_code.co_filename}:{frame.f_lineno} {frame.f_code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+
+    def report(self, top: int = 20) -> str:
+        """
+        Formats the functions most often on top of the sampled stacks.
+
+        Args:
+            top (int, optional): The number of functions. Defaults to 20.
+
+        Returns:
+            str: A table of the share of samples of every function.
+        """
+        total = sum(self.samples.values())
+        leaves: collections.Counter = collections.Counter()
+        for stack, count in self.samples.items():
+            leaves[stack[-1]] += count
+        lines = [f"{'samples':>8}{'share':>8}  frame"]
+        for frame, count in leaves.most_common(top):
+            lines.append(f'{count:>8}{count / total:>8.1%}  {frame}')
+        return '\n'.join(lines)
+
+
+    def collapsed(self) -> str:
+        """
+        Formats the samples as collapsed stacks, the input format of flame graph tools.
+
+        Returns:
+            str: One 'frame;frame;... count' line per distinct stack.
+        """
+        return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in self.samples.items())
+
+
+# (module, class or None, attribute) of every instrumented entry point
+TARGETS: List[Tuple[str, Optional[str], str]] = [
+    ('music_elements.note', 'Note', '__new__'),
+    ('music_elements.note', 'Note', '__add__'),
+    ('music_elements.note', 'Note', '__sub__'),
+    ('music_elements.note', 'Note', 'shift_saptak'),
+    ('music_elements.note', 'Note', 'get_base_note'),
+    ('music_elements.note', 'Note', 'parse_notation'),
+    ('music_elements.chord', 'Chord', '__init__'),
+    ('music_elements.chord', 'Chord', 'invert'),
+    ('music_elements.chord', 'Chord', 'get_all_inversions'),
+    ('music_elements.chord', 'Chord', 'get_base_chord'),
+    ('music_elements.chord', 'Chord', 'shift_saptak'),
+    ('music_elements.raag', 'Raag', '__contains__'),
+    ('music_elements.raag', 'Raag', 'aroh_contains'),
+    ('music_elements.raag', 'Raag', 'avroh_contains'),
+    ('music_elements.raag', 'Raag', 'contains_batch'),
+    ('music_elements.raag', 'Raag', 'filter'),
+    ('music_elements.instrument', 'Instrument', 'play_note'),
+    ('music_elements.instrument', 'Instrument', 'play_chord'),
+    ('utils', None, 'load_yaml'),
+]
+
+registry = Registry()
+_originals: Dict[Tuple[str, Optional[str], str], Tuple[object, object]] = {}
+# the registries recording the calls of every installed wrapper, with the number of times each was enabled
+_enabled: Dict[Tuple[str, Optional[str], str], Dict[Registry, int]] = {}
+# the observe methods of those registries, updated in place so installed wrappers see every change
+_observers: Dict[Tuple[str, Optional[str], str], List[Callable[[str, float], None]]] = {}
+# the registries of every enable() not undone yet, applied to entry points whose modules are imported later
+_active: Dict[Registry, int] = {}
+
+
+def wrap(function: Callable, name: str, observers: List[Callable[[str, float], None]]) -> Callable:
+    """
+    Wraps a function so that every call is timed into the registries of a list of observers.
+
+    Args:
+        function (Callable): The function.
+        name (str): The qualified name recorded in the registries.
+        observers (List[Callable[[str, float], None]]): The observe methods of the registries, read at every call.
+
+    Returns:
+        Callable: The wrapped function.
+    """
+    perf_counter = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = perf_counter() - start
+            for observe in observers:
+                observe(name, elapsed)
+    return wrapper
+
+
+def install(key: Tuple[str, Optional[str], str]) -> Optional[str]:
+    """
+    Replaces an entry point with a wrapper recording into no registry yet, unless it is installed already.
+
+    Args:
+        key (Tuple[str, Optional[str], str]): The (module, class or None, attribute) of the entry point.
+
+    Returns:
+        str: The qualified name of the function, or None if its module has not been imported.
+    """
+    module_name, class_name, attribute = key
+    module = sys.modules.get(module_name)
+    if module is None:
+        return None
+    name = attribute if class_name is None else f'{class_name}.{attribute}'
+    if key not in _originals:
+        owner = module if class_name is None else getattr(module, class_name)
+        raw = owner.__dict__[attribute] if class_name is not None else getattr(owner, attribute)
+        observers = _observers[key] = []
+        if isinstance(raw, (staticmethod, classmethod)):
+            wrapped = type(raw)(wrap(raw.__func__, name, observers))
+        else:
+            wrapped = wrap(raw, name, observers)
+        _originals[key] = (owner, raw)
+        _enabled[key] = {}
+        setattr(owner, attribute, wrapped)
+    return name
+
+
+def enable(target: Registry = registry) -> List[str]:
+    """
+    Instruments the entry points in TARGETS whose modules have already been imported, so enabling never loads
+    heavy backends such as scamp. Entry points of lazily loaded modules (e.g. `Raag` or `Instrument`) are instrumented by
+    `install_pending` when `music_elements` loads them on first access. Disabled, the instrumentation costs
+    nothing: the original functions are in place. Note that `from utils import load_yaml` binds the function at
+    import time, so such call sites are only instrumented if they were imported after enabling.
+
+    Enabling nests: entry points that are already instrumented also record their calls into the new registry, and
+    every `enable(target)` is undone by one `disable(target)`.
+
+    Args:
+        target (Registry, optional): The registry recording the calls. Defaults to the module registry.
+
+    Returns:
+        List[str]: The qualified names of the functions recording into the registry so far.
+    """
+    _active[target] = _active.get(target, 0) + 1
+    names = []
+    for key in TARGETS:
+        name = install(key)
+        if name is None:
+            continue
+        counts = _enabled[key]
+        counts[target] = counts.get(target, 0) + 1
+        _observers[key][:] = [registry.observe for registry in counts]
+        names.append(name)
+    return names
+
+
+def install_pending() -> List[str]:
+    """
+    Instruments the entry points whose modules were imported after the active `enable` calls, for all their registries.
+
+    Returns:
+        List[str]: The qualified names of the newly instrumented functions.
+    """
+    names = []
+    if not _active:
+        return names
+    for key in TARGETS:
+        if key in _originals:
+            continue
+        name = install(key)
+        if name is None:
+            continue
+        _enabled[key].update(_active)
+        _observers[key][:] = [registry.observe for registry in _active]
+        names.append(name)
+    return names
+
+
+def disable(target: Optional[Registry] = None) -> None:
+    """
+    Undoes one `enable(target)`, restoring the original functions that no registry records anymore.
+
+    Args:
+        target (Registry, optional): The registry to stop recording into. Defaults to None (all registries, restoring every original function).
+    """
+    for counts in [_active, *_enabled.values()]:
+        if target is None:
+            counts.clear()
+        elif target in counts:
+            counts[target] -= 1
+            if not counts[target]:
+                del counts[target]
+    for key in list(_originals):
+        counts = _enabled[key]
+        _observers[key][:] = [registry.observe for registry in counts]
+        if not counts:
+            owner, raw = _originals.pop(key)
+            setattr(owner, key[2], raw)
+            del _enabled[key], _observers[key]
+
+
+@contextlib.contextmanager
+def instrumented(target: Optional[Registry] = None, sample: bool = False, interval: float = 0.005, file: TextIO = sys.stdout) -> Iterator[Registry]:
+    """
+    Instruments the entry points for the duration of a block and prints a per-function report at its end.
+    Instrumentation enabled outside the block keeps recording into its own registry during and after the block.
+
+    Args:
+        target (Registry, optional): The registry recording the calls. Defaults to None (a new Registry).
+        sample (bool, optional): Whether to also run a SamplingProfiler on the calling thread. Defaults to False.
+        interval (float, optional): The time between samples in seconds. Defaults to 0.005.
+        file (TextIO, optional): The stream the report is printed to. Defaults to sys.stdout.
+
+    Yields:
+        Registry: The registry recording the calls.
+    """
+    target = Registry() if target is None else target
+    profiler = SamplingProfiler(interval) if sample else None
+    enable(target)
+    if profiler is not None:
+        profiler.start()
+    try:
+        yield target
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        disable(target)
+        report = io.StringIO()
+        print(target.report(), file=report)
+        if profiler is not None:
+            print(file=report)
+            print(profiler.report(), file=report)
+        file.write(report.getvalue())
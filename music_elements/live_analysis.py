@@ -0,0 +1,268 @@
+import asyncio
+import time
+import numpy as np
+from .note import Note
+from .chord import Chord
+from .raag import Raag
+from .raag_classifier import RaagClassifier
+from .renderer import read_midi
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+class MidiEvent(NamedTuple):
+    """
+    Represents an incoming MIDI note event.
+
+    Attributes:
+        time (float): The time of the event in the MIDI stream, in seconds.
+        midi_note (int): The MIDI note number.
+        velocity (int): The velocity, where 0 is a note off.
+        received (float): The `time.perf_counter()` timestamp at which the event entered the pipeline.
+    """
+    time: float
+    midi_note: int
+    velocity: int
+    received: float
+
+
+class ChordAnalysis(NamedTuple):
+    """
+    Represents the analysis of the sounding chord after a MIDI event.
+
+    Attributes:
+        time (float): The time of the event in the MIDI stream, in seconds.
+        chord (Chord): The sounding chord, or None if nothing is sounding.
+        raags (List[str]): The names of the raags that contain the sounding chord.
+        chord_names (List[Tuple[str, Note, int]]): The (chord type, root, inversion) names of the sounding chord, if a chord index is given.
+        likely_raag (str): The most likely raag given all notes played so far.
+        latency (float): The time from the event entering the pipeline to the analysis, in seconds.
+    """
+    time: float
+    chord: Optional[Chord]
+    raags: List[str]
+    chord_names: List[Tuple[str, Note, int]]
+    likely_raag: str
+    latency: float
+
+
+class LatencyStats:
+    """
+    Represents a record of the latest latencies, with percentile summaries.
+
+    Attributes:
+        latencies (np.ndarray): A ring buffer of the latest latencies in seconds.
+        count (int): The total number of recorded latencies.
+    """
+
+    def __init__(self, capacity: int = 100_000):
+        """
+        Initializes a LatencyStats object.
+
+        Args:
+            capacity (int, optional): The number of latest latencies kept. Defaults to 100000.
+        """
+        self.latencies = np.zeros(capacity)
+        self.count = 0
+
+
+    def record(self, latency: float) -> None:
+        """
+        Records a latency.
+
+        Args:
+            latency (float): The latency in seconds.
+        """
+        self.latencies[self.count % len(self.latencies)] = latency
+        self.count += 1
+
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarizes the kept latencies.
+
+        Returns:
+            Dict[str, float]: The count and the p50, p99 and maximum latency in milliseconds.
+        """
+        latencies = self.latencies[:min(self.count, len(self.latencies))] * 1e3
+        if not len(latencies):
+            return {'count': 0, 'p50_ms': float('nan'), 'p99_ms': float('nan'), 'max_ms': float('nan')}
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {'count': self.count, 'p50_ms': float(p50), 'p99_ms': float(p99), 'max_ms': float(latencies.max())}
+
+
+class LiveAnalyzer:
+    """
+    Represents a live analysis loop that tracks the sounding chord of a MIDI stream and analyses it after every event.
+
+    Events are consumed from a bounded asyncio queue. The pitch-class mask of the sounding chord is kept up to date
+    incrementally, raag membership is a single vectorized bitwise test against the masks of all raags, and every
+    note on also updates an incremental RaagClassifier.
+
+    Attributes:
+        raag_names (List[str]): The names of the raags.
+        raag_masks (np.ndarray): The pitch-class bitmasks of the notes of the raags.
+        sa_midi_note (int): The MIDI note number of the 'sa' sur.
+        chord_index (ChordIndex): The chord index used to name chords, or None.
+        classifier (RaagClassifier): The incremental raag classifier.
+        sounding (Dict[int, Note]): The sounding notes, keyed by MIDI note number.
+        pitch_class_counts (List[int]): The number of sounding notes of every pitch class.
+        latency (LatencyStats): The latencies from event to analysis.
+    """
+
+    def __init__(self, raags: Dict[str, Raag], sa_midi_note: int = 61, chord_index=None, classifier: RaagClassifier = None):
+        """
+        Initializes a LiveAnalyzer object.
+
+        Args:
+            raags (Dict[str, Raag]): A dictionary (or RaagRegistry) mapping raag names to Raag objects.
+            sa_midi_note (int, optional): The MIDI note number of the 'sa' sur. Defaults to 61.
+            chord_index (ChordIndex, optional): The chord index used to name chords. Defaults to None.
+            classifier (RaagClassifier, optional): The raag classifier. Defaults to None (a new RaagClassifier with decay 0.99).
+        """
+        self.raag_names = list(raags)
+        self.raag_masks = np.array([raag.notes_mask for raag in raags.values()], dtype=np.uint16)
+        self.sa_midi_note = sa_midi_note
+        self.chord_index = chord_index
+        self.classifier = classifier if classifier is not None else RaagClassifier(raags, decay=0.99)
+        self.sounding: Dict[int, Note] = {}
+        self.pitch_class_counts = [0] * len(Note.notes)
+        self.mask = 0
+        self.latency = LatencyStats()
+
+
+    def process(self, event: MidiEvent) -> ChordAnalysis:
+        """
+        Updates the sounding chord with an event and analyses it.
+
+        Args:
+            event (MidiEvent): The MIDI event.
+
+        Returns:
+            ChordAnalysis: The analysis of the sounding chord.
+        """
+        if event.velocity > 0 and event.midi_note not in self.sounding:
+            note = self.sounding[event.midi_note] = Note(event.midi_note - self.sa_midi_note)
+            self.pitch_class_counts[note.base_value] += 1
+            self.mask |= note.mask
+            self.classifier.update(note)
+        elif event.velocity == 0 and event.midi_note in self.sounding:
+            note = self.sounding.pop(event.midi_note)
+            self.pitch_class_counts[note.base_value] -= 1
+            if not self.pitch_class_counts[note.base_value]:
+                self.mask &= ~note.mask
+
+        chord, raags, chord_names = None, [], []
+        if self.sounding:
+            chord = Chord(list(self.sounding.values()))
+            raags = [self.raag_names[r] for r in np.flatnonzero(self.raag_masks & np.uint16(self.mask) == self.mask)]
+            if self.chord_index is not None:
+                chord_names = self.chord_index.get_entries(self.mask)
+        latency = time.perf_counter() - event.received
+        self.latency.record(latency)
+        return ChordAnalysis(event.time, chord, raags, chord_names, self.classifier.best(), latency)
+
+
+    async def run(self, events: asyncio.Queue, results: Optional[asyncio.Queue] = None, callback: Optional[Callable[[ChordAnalysis], None]] = None) -> None:
+        """
+        Consumes events until a None sentinel arrives, passing every analysis to a result queue and/or a callback.
+
+        Args:
+            events (asyncio.Queue): The bounded queue of MidiEvent objects, ended by None.
+            results (asyncio.Queue, optional): The bounded queue receiving the ChordAnalysis objects, ended by None. Defaults to None.
+            callback (Callable[[ChordAnalysis], None], optional): A function called with every analysis. Defaults to None.
+        """
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            analysis = self.process(event)
+            if callback is not None:
+                callback(analysis)
+            if results is not None:
+                await results.put(analysis)
+        if results is not None:
+            await results.put(None)
+
+
+async def replay_midi_file(filepath: str, events: asyncio.Queue, speed: Optional[float] = 1.0) -> None:
+    """
+    Replays the note events of a MIDI file into a queue with their original timing, ending with a None sentinel.
+
+    Args:
+        filepath (str): The filepath of the MIDI file.
+        events (asyncio.Queue): The bounded queue receiving the MidiEvent objects.
+        speed (float, optional): The playback speed factor, or None to replay without waiting. Defaults to 1.0.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for event_time, midi_note, velocity in read_midi(filepath):
+        if speed is not None:
+            delay = start + event_time / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await events.put(MidiEvent(event_time, midi_note, velocity, time.perf_counter()))
+    await events.put(None)
+
+
+async def read_midi_port(port_name: Optional[str], events: asyncio.Queue, stop: asyncio.Event, virtual: bool = False) -> int:
+    """
+    Reads note events from a MIDI input port into a queue until stopped, ending with a None sentinel.
+    Events that arrive while the queue is full are dropped rather than blocking the MIDI thread. Requires mido
+    with a backend such as python-rtmidi.
+
+    Args:
+        port_name (str): The name of the MIDI input port, or None for the default port.
+        events (asyncio.Queue): The bounded queue receiving the MidiEvent objects.
+        stop (asyncio.Event): The event that stops reading.
+        virtual (bool, optional): Whether to open a virtual port with the given name. Defaults to False.
+
+    Returns:
+        int: The number of dropped events.
+    """
+    import mido
+
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    dropped = 0
+
+    def put(event: MidiEvent) -> None:
+        nonlocal dropped
+        try:
+            events.put_nowait(event)
+        except asyncio.QueueFull:
+            dropped += 1
+
+    def receive(message) -> None:
+        if message.type in ('note_on', 'note_off'):
+            received = time.perf_counter()
+            velocity = message.velocity if message.type == 'note_on' else 0
+            loop.call_soon_threadsafe(put, MidiEvent(received - start, message.note, velocity, received))
+
+    with mido.open_input(port_name, virtual=virtual, callback=receive):
+        await stop.wait()
+    await events.put(None)
+    return dropped
+
+
+def analyze_midi_file(filepath: str, raags: Dict[str, Raag], speed: Optional[float] = 1.0, queue_size: int = 1024, **kwargs) -> Tuple[List[ChordAnalysis], LatencyStats]:
+    """
+    Replays a MIDI file through a LiveAnalyzer on an asyncio event loop, e.g. to test or benchmark the live loop offline.
+
+    Args:
+        filepath (str): The filepath of the MIDI file.
+        raags (Dict[str, Raag]): A dictionary (or RaagRegistry) mapping raag names to Raag objects.
+        speed (float, optional): The playback speed factor, or None to replay without waiting. Defaults to 1.0.
+        queue_size (int, optional): The capacity of the event queue. Defaults to 1024.
+        **kwargs: Additional arguments of LiveAnalyzer.
+
+    Returns:
+        Tuple[List[ChordAnalysis], LatencyStats]: The analyses and the latency statistics.
+    """
+    analyzer = LiveAnalyzer(raags, **kwargs)
+    analyses = []
+
+    async def main() -> None:
+        events = asyncio.Queue(maxsize=queue_size)
+        await asyncio.gather(replay_midi_file(filepath, events, speed), analyzer.run(events, callback=analyses.append))
+
+    asyncio.run(main())
+    return analyses, analyzer.latency
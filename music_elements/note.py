@@ -1,25 +1,36 @@
 from bidict import bidict
-from typing import List, Union, Set
+from numbers import Integral
+from typing import Dict, List, Tuple, Union, Set
 
 class Note:
     """
     Represents a musical note from indian classical music.
+    
+    Note objects are interned: every note value inside `saptak_range` maps to a single shared
+    instance, so arithmetic, saptak shifts and base-note lookups return cached objects instead of
+    building new ones. Notes are therefore immutable: setting an attribute raises AttributeError.
 
     Attributes:
         notes (bidict): A bidirectional dictionary mapping note values to note notations.
+        saptak_range (Tuple[int, int]): The inclusive range of saptaks whose notes are interned.
         note_value (int): The value of the note i.e. the distance of the note from the tonic note (Sa).
         base_value (int): The base note value obtained by taking the modulo of the note value with 12 (since there are 12 notes in the chromatic scale).
         saptak (int): The saptak (a.k.a. octave) value obtained by dividing the note value by the length of the notes dictionary.
         base_notation (str): The base notation of the note obtained from the notes dictionary using the base note value.
         notation (str): The complete notation of the note, including the base notation and any octave modifiers (+ or -).
+        mask (int): The pitch-class bitmask of the note, i.e. 1 shifted left by the base note value.
     """
     
+    __slots__ = ('note_value', 'base_value', 'saptak', 'base_notation', 'notation', 'mask', '__weakref__')
+    
     notes: bidict[int, str]
+    saptak_range: Tuple[int, int]
     note_value: int
     base_value: int
     saptak: int
     base_notation: str
     notation: str
+    mask: int
     
     notes: bidict = bidict({
         0 : 's' ,
@@ -36,50 +47,158 @@ class Note:
         11: 'n' ,
     })
     
-    def __init__(self, input: Union[int, str]) -> None:
+    saptak_range: Tuple[int, int] = (-4, 4)
+    
+    _cache: Dict[int, 'Note'] = {}
+    _notation_table: Dict[str, int] = {}
+    
+    def __new__(cls, input: Union[int, str]) -> 'Note':
         """
-        Initializes a Note object.
+        Returns the interned Note object for the input, creating it if it is not cached.
         
         Args:
             input (Union[int, str]): The input can be either an integer representing the note value or a string representing the note notation.
         
         Raises:
             ValueError: If the input is neither an integer nor a string.
+        
+        Returns:
+            Note: The Note object.
         """
         if isinstance(input, int):
-            self.init_from_value(input)
+            note_value = input
         elif isinstance(input, str):
-            self.init_from_notation(input)
+            note_value = cls._notation_table.get(input)
+            if note_value is None:
+                note_value = cls.parse_notation(input)
+        elif isinstance(input, Integral):
+            note_value = int(input)
         else:
             raise ValueError('Input must be an integer or a string.')
+        note = cls._cache.get(note_value)
+        if note is None:
+            note = cls._create(note_value)
+        return note
+    
+    
+    def __reduce__(self) -> Tuple[type, Tuple[int]]:
+        """
+        Pickles the Note object by value so that unpickling returns the interned instance.
+        
+        Returns:
+            Tuple[type, Tuple[int]]: The callable and arguments used to rebuild the Note object.
+        """
+        return (Note, (self.note_value,))
+    
+    
+    @classmethod
+    def parse_notation(cls, notation: str) -> int:
+        """
+        Parses a note notation into a note value without using the precomputed notation table.
+        
+        Args:
+            notation (str): The note notation.
+        
+        Raises:
+            KeyError: If the base notation is not a valid note.
+        
+        Returns:
+            int: The note value.
+        """
+        base_notation = notation.replace('+', '').replace('-', '')
+        saptak = notation.count('+') - notation.count('-')
+        return cls.notes.inverse[base_notation] + saptak * len(cls.notes)
+    
+    
+    @classmethod
+    def set_saptak_range(cls, low: int, high: int) -> None:
+        """
+        Sets the inclusive range of saptaks whose notes are interned and rebuilds the note cache and notation table.
+        
+        Args:
+            low (int): The lowest interned saptak.
+            high (int): The highest interned saptak.
+        """
+        cls.saptak_range = (low, high)
+        cls._cache.clear()
+        cls._notation_table.clear()
+        for note_value in range(low * len(cls.notes), (high + 1) * len(cls.notes)):
+            note = cls._create(note_value)
+            cls._cache[note_value] = note
+            cls._notation_table[note.notation] = note_value
+    
+    
+    @classmethod
+    def _create(cls, note_value: int) -> 'Note':
+        """
+        Builds a new Note object from a note value, bypassing the cache and the immutability of its attributes.
+        
+        Args:
+            note_value (int): The note value.
+        
+        Returns:
+            Note: The new Note object.
+        """
+        note = object.__new__(cls)
+        base_value = note_value % len(cls.notes)
+        saptak = note_value // len(cls.notes)
+        base_notation = cls.notes[base_value]
+        set_attribute = object.__setattr__
+        set_attribute(note, 'note_value', note_value)
+        set_attribute(note, 'base_value', base_value)
+        set_attribute(note, 'saptak', saptak)
+        set_attribute(note, 'base_notation', base_notation)
+        set_attribute(note, 'notation', base_notation + ('+' * saptak) if saptak > 0 else base_notation + ('-' * abs(saptak)))
+        set_attribute(note, 'mask', 1 << base_value)
+        return note
+    
+    
+    def __setattr__(self, name: str, value: object) -> None:
+        """
+        Prevents changing a Note object, since interned instances are shared by every user.
+        
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f"Note objects are immutable, cannot set '{name}'; use Note(value) to get another note.")
+    
+    
+    def __delattr__(self, name: str) -> None:
+        """
+        Prevents changing a Note object, since interned instances are shared by every user.
+        
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f"Note objects are immutable, cannot delete '{name}'.")
     
     
-    def init_from_value(self, note_value: int) -> None:
+    def init_from_value(self, note_value: int) -> 'Note':
         """
-        Initializes a Note object from a note value.
+        Gets the Note object of a note value. Notes are immutable, so this returns the (interned) note instead of
+        changing this one.
         
         Args:
             note_value (int): The note value.
+        
+        Returns:
+            Note: The Note object.
         """
-        self.note_value: int = note_value
-        self.base_value: int = self.note_value % len(self.notes)
-        self.saptak: int = self.note_value // len(self.notes)
-        self.base_notation: str = self.notes[self.base_value]
-        self.notation: str = self.base_notation + ('+' * self.saptak) if self.saptak > 0 else self.base_notation + ('-' * abs(self.saptak))
+        return Note(note_value)
 
 
-    def init_from_notation(self, notation: str) -> None:
+    def init_from_notation(self, notation: str) -> 'Note':
         """
-        Initializes a Note object from a note notation.
+        Gets the Note object of a note notation. Notes are immutable, so this returns the (interned) note instead of
+        changing this one.
         
         Args:
             notation (str): The note notation.
+        
+        Returns:
+            Note: The Note object.
         """
-        self.notation: str = notation
-        self.base_notation: str = self.notation.replace('+', '').replace('-', '')
-        self.saptak: int = self.notation.count('+') - self.notation.count('-')
-        self.base_value: int = self.notes.inverse[self.base_notation]
-        self.note_value: int = self.base_value + self.saptak * len(self.notes)
+        return Note(notation)
     
     
     def getattr(self, attr: str) -> Union[int, str]:
@@ -125,7 +244,8 @@ class Note:
         Returns:
             Note: The resulting Note object.
         """
-        return Note(self.note_value + other)
+        note_value = self.note_value + other
+        return self._cache.get(note_value) or Note(note_value)
     
     
     def __sub__(self, other: int) -> 'Note':
@@ -138,7 +258,8 @@ class Note:
         Returns:
             Note: The resulting Note object.
         """
-        return Note(self.note_value - other)
+        note_value = self.note_value - other
+        return self._cache.get(note_value) or Note(note_value)
     
     
     def __eq__(self, other: 'Note') -> bool:
@@ -239,7 +360,8 @@ class Note:
         Returns:
             Note: The resulting Note object.
         """
-        return Note(self.note_value + n * len(self.notes))
+        note_value = self.note_value + n * len(self.notes)
+        return self._cache.get(note_value) or Note(note_value)
     
     
     def get_distance(self, other: 'Note') -> int:
@@ -262,4 +384,7 @@ class Note:
         Returns:
             Note: The base note of the note.
         """
-        return Note(self.base_value)
\ No newline at end of file
+        return self._cache.get(self.base_value) or Note(self.base_value)
+
+
+Note.set_saptak_range(*Note.saptak_range)
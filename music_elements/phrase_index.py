@@ -0,0 +1,355 @@
+import json
+import os
+import numpy as np
+from collections import defaultdict
+from .note import Note
+from .event_store import EventStore
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple, Union
+
+class PhraseHit(NamedTuple):
+    """
+    Represents an occurrence of a phrase in a recording.
+
+    Attributes:
+        recording (str): The name of the recording.
+        start (int): The index of the first note of the occurrence in the melody of the recording.
+        end (int): The index after the last note of the occurrence.
+        distance (int): The edit distance between the intervals of the phrase and of the occurrence.
+    """
+    recording: str
+    start: int
+    end: int
+    distance: int
+
+
+class PhraseIndex:
+    """
+    Represents an inverted index of the interval n-grams of the melodies of recordings, stored on disk in append-only
+    segments that are memory-mapped.
+
+    Melodies are indexed as the signed intervals between consecutive notes, so transposed occurrences match. With
+    `fold_octaves` (the default) intervals are taken modulo 12, so notes shifted by whole saptaks (`Note.shift_saptak`)
+    match as well. A query looks up the n-grams of the phrase, votes for the alignments they imply, keeps the
+    alignments with enough votes to possibly be within the allowed edit distance (the q-gram lemma), and verifies them
+    with a banded edit-distance computation.
+
+    Attributes:
+        path (str): The directory of the index.
+        n (int): The number of intervals per indexed n-gram.
+        fold_octaves (bool): Whether intervals are taken modulo 12.
+        segments (List[Dict[str, object]]): The memory-mapped arrays and recording names of every segment.
+    """
+
+    version = 1
+    max_interval = 24
+
+    def __init__(self, path: str, n: int = 3, fold_octaves: bool = True):
+        """
+        Opens the index in a directory, creating it if it does not exist.
+
+        Args:
+            path (str): The directory of the index.
+            n (int, optional): The number of intervals per indexed n-gram, for a new index. Defaults to 3.
+            fold_octaves (bool, optional): Whether intervals are taken modulo 12, for a new index. Defaults to True.
+
+        Raises:
+            ValueError: If the index was written by a different version.
+        """
+        self.path = path
+        manifest_path = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+            if manifest['version'] != self.version:
+                raise ValueError(f"Phrase index version {manifest['version']} is not supported (expected {self.version}).")
+        else:
+            manifest = {'version': self.version, 'n': n, 'fold_octaves': fold_octaves, 'segments': []}
+            os.makedirs(path, exist_ok=True)
+            self.write_manifest(manifest)
+        self.n = manifest['n']
+        self.fold_octaves = manifest['fold_octaves']
+        self.segments = [self.load_segment(name) for name in manifest['segments']]
+
+
+    @property
+    def base(self) -> int:
+        """
+        Returns the number of distinct interval symbols.
+
+        Returns:
+            int: 12 with folded octaves, otherwise the number of intervals in [-max_interval, max_interval].
+        """
+        return len(Note.notes) if self.fold_octaves else 2 * self.max_interval + 1
+
+
+    def get_intervals(self, notes: Union[Sequence[Note], np.ndarray]) -> np.ndarray:
+        """
+        Encodes a melody as interval symbols.
+
+        Args:
+            notes (Union[Sequence[Note], np.ndarray]): The Note objects or note values.
+
+        Returns:
+            np.ndarray: The int8 symbol of every interval between consecutive notes.
+        """
+        if not isinstance(notes, np.ndarray):
+            notes = [note.note_value for note in notes]
+        intervals = np.diff(np.asarray(notes, dtype=np.int64))
+        if self.fold_octaves:
+            return (intervals % len(Note.notes)).astype(np.int8)
+        return (np.clip(intervals, -self.max_interval, self.max_interval) + self.max_interval).astype(np.int8)
+
+
+    def get_codes(self, intervals: np.ndarray) -> np.ndarray:
+        """
+        Encodes every n-gram of an interval sequence as an integer.
+
+        Args:
+            intervals (np.ndarray): The interval symbols.
+
+        Returns:
+            np.ndarray: The int64 code of the n-gram starting at every position with a full n-gram.
+        """
+        count = len(intervals) - self.n + 1
+        codes = np.zeros(max(count, 0), dtype=np.int64)
+        for k in range(self.n):
+            codes = codes * self.base + intervals[k:k + len(codes)]
+        return codes
+
+
+    def write_manifest(self, manifest: Dict[str, object]) -> None:
+        """
+        Writes the manifest of the index atomically.
+
+        Args:
+            manifest (Dict[str, object]): The version, settings and segment names of the index.
+        """
+        temp_path = os.path.join(self.path, f'manifest.json.{os.getpid()}.tmp')
+        with open(temp_path, 'w') as file:
+            json.dump(manifest, file, indent=2)
+        os.replace(temp_path, os.path.join(self.path, 'manifest.json'))
+
+
+    def load_segment(self, name: str) -> Dict[str, object]:
+        """
+        Memory-maps a segment.
+
+        Args:
+            name (str): The name of the segment directory.
+
+        Returns:
+            Dict[str, object]: The arrays and recording names of the segment.
+        """
+        directory = os.path.join(self.path, name)
+        segment = {key: np.load(os.path.join(directory, f'{key}.npy'), mmap_mode='r') for key in ('intervals', 'recording_offsets', 'codes', 'code_offsets', 'postings')}
+        with open(os.path.join(directory, 'recordings.json')) as file:
+            segment['recordings'] = json.load(file)
+        return segment
+
+
+    def append(self, recordings: Iterable[Tuple[str, Union[Sequence[Note], np.ndarray]]]) -> int:
+        """
+        Indexes recordings into a new segment. Existing segments are not rewritten.
+
+        Args:
+            recordings (Iterable[Tuple[str, Union[Sequence[Note], np.ndarray]]]): (name, melody) tuples, with melodies as Note objects or note values.
+
+        Returns:
+            int: The number of recordings indexed.
+        """
+        names, melodies = [], []
+        for name, notes in recordings:
+            names.append(name)
+            melodies.append(self.get_intervals(notes))
+        if not names:
+            return 0
+
+        recording_offsets = np.zeros(len(melodies) + 1, dtype=np.int64)
+        recording_offsets[1:] = np.cumsum([len(intervals) for intervals in melodies])
+        codes = np.concatenate([self.get_codes(intervals) for intervals in melodies])
+        positions = np.concatenate([np.arange(len(intervals) - self.n + 1 if len(intervals) >= self.n else 0) + start for intervals, start in zip(melodies, recording_offsets)])
+        order = np.argsort(codes, kind='stable')
+        unique_codes, code_starts = np.unique(codes[order], return_index=True)
+        arrays = {
+            'intervals': np.concatenate(melodies).astype(np.int8),
+            'recording_offsets': recording_offsets,
+            'codes': unique_codes,
+            'code_offsets': np.append(code_starts, len(codes)).astype(np.int64),
+            'postings': positions[order].astype(np.int64),
+        }
+
+        with open(os.path.join(self.path, 'manifest.json')) as file:
+            manifest = json.load(file)
+        segment_name = f'segment-{len(manifest["segments"]):05d}'
+        directory = os.path.join(self.path, segment_name)
+        os.makedirs(directory, exist_ok=True)
+        for key, array in arrays.items():
+            np.save(os.path.join(directory, f'{key}.npy'), array)
+        with open(os.path.join(directory, 'recordings.json'), 'w') as file:
+            json.dump(names, file)
+        manifest['segments'].append(segment_name)
+        self.write_manifest(manifest)
+        self.segments.append(self.load_segment(segment_name))
+        return len(names)
+
+
+    def append_stores(self, stores: Iterable[Tuple[str, EventStore]]) -> int:
+        """
+        Indexes the melodies (single-note events) of event stores into a new segment.
+
+        Args:
+            stores (Iterable[Tuple[str, EventStore]]): (name, event store) tuples.
+
+        Returns:
+            int: The number of recordings indexed.
+        """
+        def get_melodies():
+            for name, store in stores:
+                single = np.flatnonzero(np.diff(store.offsets) == 1)
+                yield name, np.asarray(store.note_values[store.offsets[single]], dtype=np.int64)
+        return self.append(get_melodies())
+
+
+    def search(self, phrase: Union[Sequence[Note], np.ndarray], max_distance: int = 0, limit: int = None) -> List[PhraseHit]:
+        """
+        Finds the occurrences of a phrase within an edit distance of its intervals, transposed to any Sa.
+
+        Args:
+            phrase (Union[Sequence[Note], np.ndarray]): The Note objects or note values of the phrase.
+            max_distance (int, optional): The maximum number of inserted, deleted or substituted intervals. Defaults to 0.
+            limit (int, optional): The maximum number of hits. Defaults to None (all hits).
+
+        Raises:
+            ValueError: If the phrase is too short for the edit distance to be found through the index.
+
+        Returns:
+            List[PhraseHit]: The hits, from closest to farthest and then in index order.
+        """
+        query = self.get_intervals(phrase)
+        query_codes = self.get_codes(query)
+        # an occurrence within max_distance edits shares at least this many n-grams with the phrase
+        min_votes = len(query_codes) - self.n * max_distance
+        if min_votes < 1:
+            raise ValueError(f'A phrase of {len(query) + 1} notes is too short to search with an edit distance of {max_distance} using {self.n}-grams')
+
+        # diagonals are keyed by (recording, diagonal), spaced so the pooling window never reaches another recording
+        pad = len(query) + max_distance + 1
+        hits = []
+        for segment in self.segments:
+            codes = segment['codes']
+            if not len(codes):
+                # every recording of the segment is shorter than one n-gram
+                continue
+            slots = np.searchsorted(codes, query_codes)
+            found = (slots < len(codes)) & (codes[np.minimum(slots, len(codes) - 1)] == query_codes)
+            postings, diagonals = [], []
+            for offset, slot in zip(np.flatnonzero(found), slots[found]):
+                positions = segment['postings'][segment['code_offsets'][slot]:segment['code_offsets'][slot + 1]]
+                postings.append(positions)
+                # the interval position where the phrase starts if this n-gram is aligned
+                diagonals.append(positions - offset)
+            if not diagonals:
+                continue
+            # the recording of a diagonal is the recording of the posting that voted for it, since the diagonal of a
+            # match with insertions at the start of a recording can fall before the recording
+            recordings = np.searchsorted(segment['recording_offsets'], np.concatenate(postings), side='right') - 1
+            span = len(segment['intervals']) + 2 * pad
+            keys, votes = np.unique(recordings * span + np.concatenate(diagonals) + pad, return_counts=True)
+            if max_distance:
+                # insertions and deletions shift the alignment of later n-grams, so pool the votes of nearby diagonals
+                cumulative = np.concatenate([[0], np.cumsum(votes)])
+                votes = cumulative[np.searchsorted(keys, keys + max_distance, side='right')] - cumulative[np.searchsorted(keys, keys - max_distance)]
+            recordings, diagonals = np.divmod(keys[votes >= min_votes], span)
+            hits.extend(self.verify(segment, query, recordings, diagonals - pad, max_distance))
+        hits.sort(key=lambda hit: hit.distance)
+        return hits[:limit]
+
+
+    def verify(self, segment: Dict[str, object], query: np.ndarray, recordings: np.ndarray, candidates: np.ndarray, max_distance: int) -> List[PhraseHit]:
+        """
+        Computes the banded edit distance of the phrase at every candidate alignment, keeping the best hit of overlapping alignments.
+
+        Args:
+            segment (Dict[str, object]): The segment.
+            query (np.ndarray): The interval symbols of the phrase.
+            recordings (np.ndarray): The recording of every candidate, in the order of the segment.
+            candidates (np.ndarray): The interval positions where the phrase may start, in increasing order within every recording.
+            max_distance (int): The maximum edit distance.
+
+        Returns:
+            List[PhraseHit]: The hits.
+        """
+        intervals, recording_offsets = segment['intervals'], segment['recording_offsets']
+        best: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+        query = query.tolist()
+        for recording, diagonal in zip(recordings.tolist(), candidates.tolist()):
+            first, last = recording_offsets[recording], recording_offsets[recording + 1]
+            start = max(first, diagonal - max_distance)
+            region = intervals[start:min(last, diagonal + len(query) + max_distance)].tolist()
+            match = get_best_match(query, region, max_distance, diagonal - start)
+            if match is None:
+                continue
+            distance, match_start, match_end = match
+            key = (recording, start + match_start)
+            if key not in best or distance < best[key][0]:
+                best[key] = (distance, start + match_start, start + match_end)
+
+        hits, covered = [], defaultdict(list)
+        for (recording, _), (distance, start, end) in sorted(best.items(), key=lambda item: (item[1][0], item[0])):
+            if any(start < other_end and other_start < end for other_start, other_end in covered[recording]):
+                continue
+            covered[recording].append((start, end))
+            # interval positions are relative to the segment, and the intervals [start, end) span the notes [start, end + 1)
+            first = int(recording_offsets[recording])
+            hits.append(PhraseHit(segment['recordings'][recording], int(start - first), int(end + 1 - first), distance))
+        return hits
+
+
+def get_best_match(query: List[int], region: List[int], max_distance: int, diagonal: int = 0):
+    """
+    Finds the substring of a region with the smallest edit distance to a query (semi-global alignment), within a
+    band around the region position where the query is expected to start.
+
+    An alignment with at most max_distance edits that starts within max_distance of the diagonal never leaves the
+    cells within 2 * max_distance of it, so only those are computed, and the computation stops as soon as every cell
+    of a row is farther than max_distance, since the distances never decrease from one row to the next.
+
+    Args:
+        query (List[int]): The query symbols.
+        region (List[int]): The region symbols.
+        max_distance (int): The maximum edit distance.
+        diagonal (int, optional): The region position where the query is expected to start. Defaults to 0.
+
+    Returns:
+        Tuple[int, int, int]: The distance and the start and end of the best substring, or None if it is farther than max_distance.
+    """
+    width = 2 * max_distance
+    # every distance over max_distance is capped, since they are all rejected alike
+    cap = max_distance + 1
+    size = len(region) + 1
+    # distances and start positions of the best alignments of the query prefix ending at every region position
+    low, high = max(0, diagonal - width), min(size, diagonal + width + 1)
+    distances = [0 if low <= j < high else cap for j in range(size)]
+    starts = list(range(size))
+    for i, symbol in enumerate(query, start=1):
+        previous_distances, previous_starts = distances, starts
+        distances, starts = [cap] * size, [0] * size
+        low, high = max(0, i + diagonal - width), min(size, i + diagonal + width + 1)
+        if low >= high:
+            return None
+        if low == 0:
+            distances[0], starts[0] = min(previous_distances[0] + 1, cap), previous_starts[0]
+        for j in range(max(low, 1), high):
+            other = region[j - 1]
+            distance, start = min(
+                (previous_distances[j - 1] + (symbol != other), previous_starts[j - 1]),
+                (previous_distances[j] + 1, previous_starts[j]),
+                (distances[j - 1] + 1, starts[j - 1]),
+            )
+            distances[j], starts[j] = min(distance, cap), start
+        if min(distances[low:high]) > max_distance:
+            return None
+    end = min(range(low, high), key=lambda j: (distances[j], -j))
+    if distances[end] > max_distance:
+        return None
+    return distances[end], starts[end], end
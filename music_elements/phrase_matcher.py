@@ -0,0 +1,219 @@
+import numpy as np
+from collections import deque
+from .note import Note
+from .raag import Raag
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+class PhraseMatch(NamedTuple):
+    """
+    Represents a phrase of a note sequence that follows the aroh or avroh of a raag.
+
+    Attributes:
+        raag (str): The name of the raag.
+        scale (str): The scale the phrase follows, 'aroh' or 'avroh'.
+        start (int): The index of the first note of the phrase.
+        end (int): The index after the last note of the phrase.
+    """
+    raag: str
+    scale: str
+    start: int
+    end: int
+
+
+class Violation(NamedTuple):
+    """
+    Represents a note of a note sequence that breaks the rules of a raag.
+
+    Attributes:
+        raag (str): The name of the raag.
+        index (int): The index of the offending note.
+        reason (str): 'outside' for a note outside the raag, 'aroh_varjit' for ascending into a note missing from
+            the aroh, or 'avroh_varjit' for descending into a note missing from the avroh.
+    """
+    raag: str
+    index: int
+    reason: str
+
+
+class PhraseMatcher:
+    """
+    Represents a matcher of aroh/avroh phrases and varjit rules of many raags over note sequences.
+
+    A note sequence is read as a sequence of moves (previous pitch class, pitch class, direction). Every fragment
+    of at least `min_length` notes of every aroh and avroh is compiled into one Aho–Corasick automaton over these
+    moves, so a single linear pass finds the phrases of all raags at once. Violations are read from a
+    precomputed (raags, moves) table.
+
+    Attributes:
+        raag_names (List[str]): The names of the raags.
+        min_length (int): The minimum number of notes of a matched phrase.
+        goto (List[List[int]]): The dense transition table of the automaton, indexed by state and move.
+        outputs (List[List[Tuple[int, str, int]]]): The (raag index, scale, length in notes) of the longest fragment of
+            every raag and scale ending in every state.
+        in_raag (np.ndarray): A boolean (raags, 12) table, True where the pitch class is in the raag.
+        varjit (np.ndarray): A boolean (raags, moves) table, True where the move breaks an aroh/avroh varjit rule.
+    """
+
+    num_directions = 3
+
+    def __init__(self, raags: Dict[str, Raag], min_length: int = 3):
+        """
+        Initializes a PhraseMatcher object and compiles its automaton.
+
+        Args:
+            raags (Dict[str, Raag]): A dictionary (or RaagRegistry) mapping raag names to Raag objects.
+            min_length (int, optional): The minimum number of notes of a matched phrase. Defaults to 3.
+        """
+        self.raag_names = list(raags)
+        self.min_length = min_length
+        num_notes = len(Note.notes)
+        num_moves = self.num_directions * num_notes * num_notes
+
+        self.in_raag = np.zeros((len(self.raag_names), num_notes), dtype=bool)
+        self.varjit = np.zeros((len(self.raag_names), self.num_directions, num_notes, num_notes), dtype=bool)
+        for r, raag in enumerate(raags.values()):
+            self.in_raag[r, [note.base_value for note in (*raag.notes, *raag.aroh, *raag.avroh)]] = True
+            for direction, mask, varjit in ((1, raag.aroh_mask, raag.aroh_varjit), (2, raag.avroh_mask, raag.avroh_varjit)):
+                outside = [value for value in range(num_notes) if not mask >> value & 1 or any(note.base_value == value for note in varjit)]
+                self.varjit[r, direction, :, outside] = True
+        self.varjit = self.varjit.reshape(len(self.raag_names), num_moves)
+
+        # trie of move sequences, with the (raag, scale, length) of every fragment ending at each node
+        children: List[Dict[int, int]] = [{}]
+        endings: List[Dict[Tuple[int, str], int]] = [{}]
+        for r, raag in enumerate(raags.values()):
+            for scale in ('aroh', 'avroh'):
+                moves = self.get_moves(getattr(raag, scale))
+                for start in range(len(moves)):
+                    state = 0
+                    for end in range(start, len(moves)):
+                        if moves[end] not in children[state]:
+                            children[state][moves[end]] = len(children)
+                            children.append({})
+                            endings.append({})
+                        state = children[state][moves[end]]
+                        length = end - start + 2
+                        if length >= min_length:
+                            endings[state][(r, scale)] = max(endings[state].get((r, scale), 0), length)
+
+        # breadth-first construction of the failure links and the dense transition table
+        self.goto = [[0] * num_moves for _ in children]
+        failure = [0] * len(children)
+        queue = deque()
+        for move, child in children[0].items():
+            self.goto[0][move] = child
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for key, length in endings[failure[state]].items():
+                endings[state][key] = max(endings[state].get(key, 0), length)
+            for move in range(num_moves):
+                child = children[state].get(move)
+                if child is None:
+                    self.goto[state][move] = self.goto[failure[state]][move]
+                else:
+                    failure[child] = self.goto[failure[state]][move]
+                    self.goto[state][move] = child
+                    queue.append(child)
+        self.outputs = [[(r, scale, length) for (r, scale), length in ending.items()] for ending in endings]
+
+
+    def get_moves(self, notes: Sequence[Note]) -> List[int]:
+        """
+        Encodes a note sequence as a sequence of moves.
+
+        Args:
+            notes (Sequence[Note]): The notes.
+
+        Returns:
+            List[int]: One move index per pair of consecutive notes.
+        """
+        num_notes = len(Note.notes)
+        moves = []
+        for a, b in zip(notes, notes[1:]):
+            direction = 0 if a.note_value == b.note_value else 1 if b.note_value > a.note_value else 2
+            moves.append((direction * num_notes + a.base_value) * num_notes + b.base_value)
+        return moves
+
+
+    def find_phrases(self, notes: Sequence[Note], maximal: bool = True) -> List[PhraseMatch]:
+        """
+        Finds the phrases of a note sequence that follow the aroh or avroh of any raag, in one pass.
+
+        Args:
+            notes (Sequence[Note]): The notes.
+            maximal (bool, optional): Whether to drop phrases contained in a longer phrase of the same raag and scale. Defaults to True.
+
+        Returns:
+            List[PhraseMatch]: The phrases, ordered by end and then start.
+        """
+        goto, outputs = self.goto, self.outputs
+        matches = []
+        state = 0
+        for end, move in enumerate(self.get_moves(notes), start=2):
+            state = goto[state][move]
+            for r, scale, length in outputs[state]:
+                matches.append(PhraseMatch(self.raag_names[r], scale, end - length, end))
+        if maximal:
+            reach: Dict[Tuple[str, str], int] = {}
+            kept = []
+            for match in sorted(matches, key=lambda match: (match.start, -match.end)):
+                key = (match.raag, match.scale)
+                if match.end > reach.get(key, -1):
+                    kept.append(match)
+                    reach[key] = match.end
+            matches = kept
+        return sorted(matches, key=lambda match: (match.end, match.start))
+
+
+    def find_violations(self, notes: Sequence[Note]) -> List[Violation]:
+        """
+        Finds the notes of a note sequence that break the rules of any raag.
+
+        Args:
+            notes (Sequence[Note]): The notes.
+
+        Returns:
+            List[Violation]: The violations, ordered by index.
+        """
+        violations = []
+        outside, varjit = self.get_violation_matrices(notes)
+        for r, index in zip(*np.nonzero(outside)):
+            violations.append(Violation(self.raag_names[r], int(index), 'outside'))
+        moves = np.array(self.get_moves(notes), dtype=np.int64)
+        for r, index in zip(*np.nonzero(varjit)):
+            reason = 'aroh_varjit' if moves[index] // len(Note.notes) ** 2 == 1 else 'avroh_varjit'
+            violations.append(Violation(self.raag_names[r], int(index) + 1, reason))
+        return sorted(violations, key=lambda violation: violation.index)
+
+
+    def get_violation_matrices(self, notes: Sequence[Note]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes which notes break the rules of every raag, vectorized over raags and notes.
+
+        Args:
+            notes (Sequence[Note]): The notes.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: A boolean (raags, notes) matrix of notes outside the raag, and a boolean
+            (raags, notes - 1) matrix of moves that break a varjit rule (column i is the move into note i + 1).
+        """
+        base_values = np.array([note.base_value for note in notes], dtype=np.int64)
+        moves = np.array(self.get_moves(notes), dtype=np.int64)
+        return ~self.in_raag[:, base_values], self.varjit[:, moves]
+
+
+    def conforms(self, notes: Sequence[Note], raag: str) -> bool:
+        """
+        Checks if a note sequence breaks none of the rules of a raag.
+
+        Args:
+            notes (Sequence[Note]): The notes.
+            raag (str): The name of the raag.
+
+        Returns:
+            bool: True if no note is outside the raag and no move breaks a varjit rule, False otherwise.
+        """
+        outside, varjit = self.get_violation_matrices(notes)
+        r = self.raag_names.index(raag)
+        return not (outside[r].any() or varjit[r].any())
@@ -0,0 +1,56 @@
+import random
+from .note import Note
+from .chord import Chord
+from .chord_set import ChordSet
+from .raag import Raag
+from typing import Dict, List, Sequence
+
+def get_chords_in_raag(raag: Raag, chord_types: Dict[str, List[int]]) -> List[Chord]:
+    """
+    Gets the base chords of all inversions of the given chord types that are in a raag.
+
+    Args:
+        raag (Raag): The raag.
+        chord_types (Dict[str, List[int]]): A dictionary mapping chord type names to chord intervals.
+
+    Returns:
+        List[Chord]: A sorted list of base Chord objects without duplicates.
+    """
+    chords = set()
+    for intervals in chord_types.values():
+        roots = ChordSet.from_roots(range(len(Note.notes)), intervals)
+        inversions = ChordSet.concatenate([roots.invert(n) for n in range(len(intervals))])
+        chords.update(raag.filter(inversions).get_base_chord().unique().to_chords())
+    return sorted(chords)
+
+
+def get_chord_space(chords: List[Chord], shifts: Sequence[int] = (-1, 0, 1)) -> List[Chord]:
+    """
+    Gets the chord space of a list of chords, i.e. the chords shifted by each of the given saptak shifts (see `Chord.shift_saptak`).
+
+    Args:
+        chords (List[Chord]): The list of Chord objects.
+        shifts (Sequence[int], optional): The saptak shifts to include. Defaults to (-1, 0, 1).
+
+    Returns:
+        List[Chord]: The list of shifted Chord objects, grouped by shift.
+    """
+    return [chord.shift_saptak(shift) if shift else chord for shift in shifts for chord in chords]
+
+
+def sample_progression(chord_space: List[Chord], rng: random.Random = random) -> List[Chord]:
+    """
+    Samples a random chord progression according to the 4 2+2 rule: four chords played twice,
+    followed by two of those chords and two new chords, shuffled and played twice.
+
+    Args:
+        chord_space (List[Chord]): The chords to sample from (at least 4).
+        rng (random.Random, optional): The random number generator. Defaults to the `random` module.
+
+    Returns:
+        List[Chord]: The 16 chords of the progression.
+    """
+    chords_1 = rng.sample(chord_space, k=4)
+    chords_2 = rng.sample(chords_1, k=2) + rng.sample(chord_space, k=2)
+    rng.shuffle(chords_2)
+    return chords_1 * 2 + chords_2 * 2
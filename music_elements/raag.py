@@ -1,5 +1,7 @@
+import numpy as np
 from .note import Note
 from .chord import Chord
+from .chord_set import ChordSet
 from typing import List, Union
 
 class Raag:
@@ -8,18 +10,110 @@ class Raag:
 
     Attributes:
         notes (Set['Note']): The set of Note objects that make up the raag.
+        aroh (List['Note']): The ascending scale of the raag.
+        avroh (List['Note']): The descending scale of the raag.
+        name (str): The name of the raag.
+        vadi (Note): The most prominent note of the raag.
+        samvadi (Note): The second most prominent note of the raag.
+        aroh_varjit (List['Note']): The notes omitted in the aroh of the raag.
+        avroh_varjit (List['Note']): The notes omitted in the avroh of the raag.
+        info (dict): Additional information about the raag (e.g. thaat and jati).
+        notes_mask (int): The pitch-class bitmask of the notes of the raag.
+        aroh_mask (int): The pitch-class bitmask of the aroh of the raag.
+        avroh_mask (int): The pitch-class bitmask of the avroh of the raag.
     """
     
-    def __init__(self, notes: List[Union[str, int, Note]], aroh: List[Union[str, int, Note]], avroh: List[Union[str, int, Note]]):
+    def __init__(
+        self,
+        notes: List[Union[str, int, Note]],
+        aroh: List[Union[str, int, Note]],
+        avroh: List[Union[str, int, Note]],
+        name: str = None,
+        vadi: Union[str, int, Note] = None,
+        samvadi: Union[str, int, Note] = None,
+        aroh_varjit: List[Union[str, int, Note]] = None,
+        avroh_varjit: List[Union[str, int, Note]] = None,
+        info: dict = None,
+    ):
         """
         Initializes a Raag object with a set of notes.
 
         Args:
             notes (List[Union[str, int, Note]]): The list of Note objects, str, or int that make up the raag.
+            aroh (List[Union[str, int, Note]]): The ascending scale of the raag.
+            avroh (List[Union[str, int, Note]]): The descending scale of the raag.
+            name (str, optional): The name of the raag. Defaults to None.
+            vadi (Union[str, int, Note], optional): The most prominent note of the raag. Defaults to None.
+            samvadi (Union[str, int, Note], optional): The second most prominent note of the raag. Defaults to None.
+            aroh_varjit (List[Union[str, int, Note]], optional): The notes omitted in the aroh. Defaults to None (no notes).
+            avroh_varjit (List[Union[str, int, Note]], optional): The notes omitted in the avroh. Defaults to None (no notes).
+            info (dict, optional): Additional information about the raag. Defaults to None.
         """
         self.notes = sorted([Note(note) if isinstance(note, (str, int)) else note for note in notes])
         self.aroh = [Note(note) if isinstance(note, (str, int)) else note for note in aroh]
         self.avroh = [Note(note) if isinstance(note, (str, int)) else note for note in avroh]
+        self.name = name
+        self.vadi = Note(vadi) if isinstance(vadi, (str, int)) else vadi
+        self.samvadi = Note(samvadi) if isinstance(samvadi, (str, int)) else samvadi
+        self.aroh_varjit = [Note(note) if isinstance(note, (str, int)) else note for note in aroh_varjit or []]
+        self.avroh_varjit = [Note(note) if isinstance(note, (str, int)) else note for note in avroh_varjit or []]
+        self.info = dict(info or {})
+        self.notes_mask = self.get_mask(self.notes)
+        self.aroh_mask = self.get_mask(self.aroh)
+        self.avroh_mask = self.get_mask(self.avroh)
+
+
+    def __setattr__(self, name: str, value) -> None:
+        """
+        Sets an attribute of the Raag object, unless the raag has been frozen.
+
+        Raises:
+            AttributeError: If the raag has been frozen.
+        """
+        if self.__dict__.get('frozen', False):
+            raise AttributeError(f"Cannot set '{name}' on a frozen Raag.")
+        super().__setattr__(name, value)
+
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the Raag object.
+
+        Returns:
+            str: The string representation of the Raag object.
+        """
+        return f"Raag({self.name or ''}{self.notes})"
+
+
+    def freeze(self) -> 'Raag':
+        """
+        Makes the raag immutable by converting its note lists to tuples and blocking attribute assignment.
+
+        Returns:
+            Raag: The frozen Raag object (self).
+        """
+        for attr in ('notes', 'aroh', 'avroh', 'aroh_varjit', 'avroh_varjit'):
+            setattr(self, attr, tuple(getattr(self, attr)))
+        self.frozen = True
+        return self
+
+
+    @staticmethod
+    def get_mask(notes: List[Note]) -> int:
+        """
+        Computes the pitch-class bitmask of the base notes (notes in the middle saptak) of a list of notes.
+
+        Args:
+            notes (List[Note]): The list of Note objects.
+
+        Returns:
+            int: The union of the pitch-class bitmasks of the base notes.
+        """
+        mask = 0
+        for note in notes:
+            if note.saptak == 0:
+                mask |= note.mask
+        return mask
 
 
     def __contains__(self, item: Union[Note, Chord]) -> bool:
@@ -32,10 +126,8 @@ class Raag:
         Returns:
             bool: True if the Note or Chord object is in the raag, False otherwise.
         """
-        if isinstance(item, Note):
-            return item.get_base_note() in self.notes
-        elif isinstance(item, Chord):
-            return all(note.get_base_note() in self.notes for note in item.notes)
+        if isinstance(item, (Note, Chord)):
+            return item.mask & ~self.notes_mask == 0
         else:
             return False
     
@@ -50,10 +142,8 @@ class Raag:
         Returns:
             bool: True if the Note or Chord object is in the aroh of the raag, False otherwise.
         """
-        if isinstance(item, Note):
-            return item.get_base_note() in self.aroh
-        elif isinstance(item, Chord):
-            return all(note.get_base_note() in self.aroh for note in item.notes)
+        if isinstance(item, (Note, Chord)):
+            return item.mask & ~self.aroh_mask == 0
         else:
             return False
     
@@ -68,9 +158,41 @@ class Raag:
         Returns:
             bool: True if the Note or Chord object is in the avroh of the raag, False otherwise.
         """
-        if isinstance(item, Note):
-            return item.get_base_note() in self.avroh
-        elif isinstance(item, Chord):
-            return all(note.get_base_note() in self.avroh for note in item.notes)
+        if isinstance(item, (Note, Chord)):
+            return item.mask & ~self.avroh_mask == 0
         else:
             return False
+    
+    
+    def contains_batch(self, items: Union[ChordSet, np.ndarray], scale: str = 'notes') -> np.ndarray:
+        """
+        Checks which chords of a ChordSet, or which pitch-class bitmasks of an array, are in the raag.
+
+        Args:
+            items (Union[ChordSet, np.ndarray]): The ChordSet object or array of pitch-class bitmasks to check.
+            scale (str, optional): The scale of the raag to check against, one of 'notes', 'aroh' or 'avroh'. Defaults to 'notes'.
+
+        Raises:
+            ValueError: If the scale is not one of 'notes', 'aroh' or 'avroh'.
+
+        Returns:
+            np.ndarray: A boolean array that is True for every chord or bitmask in the raag.
+        """
+        if scale not in ('notes', 'aroh', 'avroh'):
+            raise ValueError(f"Scale must be one of 'notes', 'aroh' or 'avroh', got '{scale}'.")
+        masks = items.masks if isinstance(items, ChordSet) else np.asarray(items, dtype=np.uint16)
+        return masks & np.uint16(~getattr(self, f'{scale}_mask') & 0xFFFF) == 0
+    
+    
+    def filter(self, chord_set: ChordSet, scale: str = 'notes') -> ChordSet:
+        """
+        Returns the chords of a ChordSet that are in the raag.
+
+        Args:
+            chord_set (ChordSet): The ChordSet object to filter.
+            scale (str, optional): The scale of the raag to check against, one of 'notes', 'aroh' or 'avroh'. Defaults to 'notes'.
+
+        Returns:
+            ChordSet: The chords of the ChordSet that are in the raag.
+        """
+        return chord_set[self.contains_batch(chord_set, scale)]
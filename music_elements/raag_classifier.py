@@ -0,0 +1,175 @@
+import numpy as np
+from .note import Note
+from .raag import Raag
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class RaagClassifier:
+    """
+    Represents an incremental raag classifier that scores a stream of notes against many raags at once.
+
+    Every raag gets a log-probability profile over the 12 pitch classes: the notes used in its notes, aroh and
+    avroh, with the vadi and samvadi emphasised and a small probability for notes outside the raag. Transitions
+    between consecutive notes add log-weights: steps that follow the aroh or avroh are rewarded, and ascending
+    into a note missing from the aroh (or descending into one missing from the avroh) is penalised. Both are
+    folded into one (direction, previous pitch class, pitch class, raag) table, so each note costs one vector addition.
+
+    Attributes:
+        raag_names (List[str]): The names of the raags, in score order.
+        profiles (np.ndarray): The (raags, 12) log-probability profiles.
+        table (np.ndarray): The (3, 12, 12, raags) score of a note given the direction of the move
+            (0: same note, 1: ascending, 2: descending), the previous pitch class and the pitch class.
+        first_scores (np.ndarray): The (12, raags) score of the first note of a stream.
+        decay (float): The factor applied to the scores before every update (1.0 keeps the whole history).
+        scores (np.ndarray): The current (raags,) log-likelihood scores.
+        previous (Note): The previous note of the stream, or None.
+    """
+
+    def __init__(
+        self,
+        raags: Dict[str, Raag],
+        vadi_weight: float = 2.0,
+        samvadi_weight: float = 1.5,
+        outside_weight: float = 0.02,
+        step_weight: float = 1.5,
+        varjit_weight: float = 0.2,
+        decay: float = 1.0,
+    ):
+        """
+        Initializes a RaagClassifier object.
+
+        Args:
+            raags (Dict[str, Raag]): A dictionary (or RaagRegistry) mapping raag names to Raag objects.
+            vadi_weight (float, optional): The relative weight of the vadi. Defaults to 2.0.
+            samvadi_weight (float, optional): The relative weight of the samvadi. Defaults to 1.5.
+            outside_weight (float, optional): The relative weight of a note outside the raag. Defaults to 0.02.
+            step_weight (float, optional): The likelihood ratio of a step that follows the aroh or avroh. Defaults to 1.5.
+            varjit_weight (float, optional): The likelihood ratio of moving into a note missing from the aroh or avroh. Defaults to 0.2.
+            decay (float, optional): The factor applied to the scores before every update. Defaults to 1.0.
+        """
+        self.raag_names = list(raags)
+        num_notes = len(Note.notes)
+        weights = np.full((len(self.raag_names), num_notes), outside_weight)
+        transitions = np.zeros((3, num_notes, num_notes, len(self.raag_names)))
+        for r, raag in enumerate(raags.values()):
+            weights[r, [note.base_value for note in (*raag.notes, *raag.aroh, *raag.avroh)]] = 1.0
+            if raag.samvadi is not None:
+                weights[r, raag.samvadi.base_value] = samvadi_weight
+            if raag.vadi is not None:
+                weights[r, raag.vadi.base_value] = vadi_weight
+            for direction, scale, mask in ((1, raag.aroh, raag.aroh_mask), (2, raag.avroh, raag.avroh_mask)):
+                outside = [value for value in range(num_notes) if not mask >> value & 1]
+                transitions[direction, :, outside, r] = np.log(varjit_weight)
+                for a, b in zip(scale, scale[1:]):
+                    if (b > a) == (direction == 1) and a != b:
+                        transitions[direction, a.base_value, b.base_value, r] = np.log(step_weight)
+        self.profiles = np.log(weights / weights.sum(axis=1, keepdims=True))
+        self.first_scores = np.ascontiguousarray(self.profiles.T)
+        self.table = transitions + self.first_scores[None, None, :, :]
+        self.decay = decay
+        self.reset()
+
+
+    def reset(self) -> None:
+        """
+        Resets the scores to the start of a new stream.
+        """
+        self.scores = np.zeros(len(self.raag_names))
+        self.previous: Optional[Note] = None
+
+
+    def update(self, note: Note, weight: float = 1.0) -> None:
+        """
+        Updates the scores with the next note of the stream in O(1) time.
+
+        Args:
+            note (Note): The note.
+            weight (float, optional): The weight of the note, e.g. the confidence of a pitch tracker. Defaults to 1.0.
+        """
+        previous = self.previous
+        if previous is None:
+            row = self.first_scores[note.base_value]
+        else:
+            direction = 0 if note.note_value == previous.note_value else 1 if note.note_value > previous.note_value else 2
+            row = self.table[direction, previous.base_value, note.base_value]
+        if self.decay != 1.0:
+            self.scores *= self.decay
+        if weight == 1.0:
+            self.scores += row
+        else:
+            self.scores += weight * row
+        self.previous = note
+
+
+    def update_many(self, notes: Iterable[Note], weights: Optional[Iterable[float]] = None) -> None:
+        """
+        Updates the scores with a batch of notes in one vectorized pass (equivalent to calling `update` for each note).
+
+        Args:
+            notes (Iterable[Note]): The notes.
+            weights (Iterable[float], optional): The weight of every note. Defaults to None (all 1.0).
+        """
+        notes = list(notes)
+        if not notes:
+            return
+        values = np.array([note.note_value for note in notes])
+        base_values = values % len(Note.notes)
+        weights = np.ones(len(notes)) if weights is None else np.asarray(list(weights), dtype=np.float64)
+        rows = np.empty((len(notes), len(self.raag_names)))
+        if self.previous is None:
+            rows[0] = self.first_scores[base_values[0]]
+        else:
+            values = np.concatenate([[self.previous.note_value], values])
+            base_values = np.concatenate([[self.previous.base_value], base_values])
+        moves = np.sign(np.diff(values))
+        directions = np.where(moves == 0, 0, np.where(moves > 0, 1, 2))
+        rows[len(notes) - len(directions):] = self.table[directions, base_values[:-1], base_values[1:]]
+        decays = self.decay ** np.arange(len(notes) - 1, -1, -1)
+        self.scores = self.scores * self.decay ** len(notes) + (decays * weights) @ rows
+        self.previous = notes[-1]
+
+
+    def probabilities(self) -> np.ndarray:
+        """
+        Returns the posterior probability of every raag, assuming equal priors.
+
+        Returns:
+            np.ndarray: The (raags,) probabilities.
+        """
+        exp = np.exp(self.scores - self.scores.max())
+        return exp / exp.sum()
+
+
+    def ranking(self) -> List[Tuple[str, float]]:
+        """
+        Returns the raags ranked from most to least likely.
+
+        Returns:
+            List[Tuple[str, float]]: (raag name, probability) tuples.
+        """
+        probabilities = self.probabilities()
+        return [(self.raag_names[r], float(probabilities[r])) for r in np.argsort(-probabilities)]
+
+
+    def best(self) -> str:
+        """
+        Returns the name of the most likely raag.
+
+        Returns:
+            str: The name of the raag.
+        """
+        return self.raag_names[int(np.argmax(self.scores))]
+
+
+    def classify(self, notes: Iterable[Note]) -> List[Tuple[str, float]]:
+        """
+        Scores a whole note sequence from scratch.
+
+        Args:
+            notes (Iterable[Note]): The notes.
+
+        Returns:
+            List[Tuple[str, float]]: (raag name, probability) tuples ranked from most to least likely.
+        """
+        self.reset()
+        self.update_many(notes)
+        return self.ranking()
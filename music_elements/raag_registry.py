@@ -0,0 +1,285 @@
+import hashlib
+import os
+import pickle
+import yaml
+from .note import Note
+from .raag import Raag
+from collections.abc import Mapping
+from typing import Dict, Iterator
+
+# PyYAML's libyaml bindings are much faster than its pure-Python parser but are optional
+BaseLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+class UniqueKeyLoader(BaseLoader):
+    """
+    A safe YAML loader that rejects mappings with duplicate keys instead of silently keeping the last value.
+    """
+
+    def construct_mapping(self, node: yaml.MappingNode, deep: bool = False) -> dict:
+        """
+        Constructs a mapping, checking it for duplicate keys.
+
+        Args:
+            node (yaml.MappingNode): The mapping node.
+            deep (bool, optional): Whether to construct nested objects immediately. Defaults to False.
+
+        Raises:
+            ValueError: If the mapping contains a duplicate key.
+
+        Returns:
+            dict: The constructed mapping.
+        """
+        keys = set()
+        for key_node, _ in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key in keys:
+                raise ValueError(f"Duplicate key '{key}' at line {key_node.start_mark.line + 1}, column {key_node.start_mark.column + 1}.")
+            keys.add(key)
+        return super().construct_mapping(node, deep=deep)
+
+
+UniqueKeyLoader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, UniqueKeyLoader.construct_mapping)
+
+
+class RaagRegistry(Mapping):
+    """
+    Represents the raags of a raag configuration file, compiled into frozen Raag objects.
+
+    The configuration is validated once, and the compiled raags are cached in a pickled sidecar file keyed by
+    the modification time and content hash of the configuration. Raags are unpickled lazily on first access.
+
+    Attributes:
+        filepath (str): The filepath of the raag configuration YAML file.
+        cache_path (str): The filepath of the sidecar cache, or None if caching is disabled.
+    """
+
+    required_keys = {'notes', 'aroh', 'avroh', 'vadi', 'samvadi'}
+    optional_keys = {'aroh_varjit', 'avroh_varjit', 'info'}
+    info_keys = {'thaat', 'jati'}
+    version = 1
+
+    def __init__(self, filepath: str = 'configuration/raag_config.yaml', cache_path: str = None, use_cache: bool = True):
+        """
+        Initializes a RaagRegistry object from a raag configuration file.
+
+        Args:
+            filepath (str, optional): The filepath of the raag configuration YAML file. Defaults to 'configuration/raag_config.yaml'.
+            cache_path (str, optional): The filepath of the sidecar cache. Defaults to None ('.<name>.pickle' next to the configuration).
+            use_cache (bool, optional): Whether to read and write the sidecar cache. Defaults to True.
+
+        Raises:
+            ValueError: If the configuration is invalid.
+        """
+        self.filepath = filepath
+        if use_cache and cache_path is None:
+            directory, filename = os.path.split(filepath)
+            cache_path = os.path.join(directory, f'.{os.path.splitext(filename)[0]}.pickle')
+        self.cache_path = cache_path if use_cache else None
+        self.raags: Dict[str, Raag] = {}
+        self.pickled_raags: Dict[str, bytes] = self.load_cache() if self.cache_path else None
+        if self.pickled_raags is None:
+            self.pickled_raags = self.compile()
+
+
+    def load_cache(self) -> Dict[str, bytes]:
+        """
+        Loads the pickled raags from the sidecar cache if it matches the configuration file.
+        A cache with a stale modification time is still used (and refreshed) if the content hash matches.
+
+        Returns:
+            Dict[str, bytes]: A dictionary mapping raag names to pickled Raag objects, or None if the cache is missing or stale.
+        """
+        try:
+            with open(self.cache_path, 'rb') as file:
+                cache = pickle.load(file)
+            stat = os.stat(self.filepath)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if cache.get('version') != self.version:
+            return None
+        if cache['mtime_ns'] == stat.st_mtime_ns and cache['size'] == stat.st_size:
+            return cache['raags']
+        if cache['sha256'] == self.get_hash():
+            self.save_cache(cache['raags'], cache['sha256'])
+            return cache['raags']
+        return None
+
+
+    def save_cache(self, pickled_raags: Dict[str, bytes], sha256: str) -> None:
+        """
+        Saves the pickled raags to the sidecar cache. Failures to write the cache are ignored.
+
+        Args:
+            pickled_raags (Dict[str, bytes]): A dictionary mapping raag names to pickled Raag objects.
+            sha256 (str): The content hash of the configuration file.
+        """
+        stat = os.stat(self.filepath)
+        cache = {'version': self.version, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': sha256, 'raags': pickled_raags}
+        temp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump(cache, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+    def get_hash(self) -> str:
+        """
+        Computes the content hash of the configuration file.
+
+        Returns:
+            str: The sha256 hex digest of the configuration file.
+        """
+        with open(self.filepath, 'rb') as file:
+            return hashlib.sha256(file.read()).hexdigest()
+
+
+    def compile(self) -> Dict[str, bytes]:
+        """
+        Parses and validates the configuration file, compiles every raag and writes the sidecar cache.
+
+        Raises:
+            ValueError: If the configuration is invalid.
+
+        Returns:
+            Dict[str, bytes]: A dictionary mapping raag names to pickled Raag objects.
+        """
+        with open(self.filepath, 'rb') as file:
+            content = file.read()
+        config = self.parse(content)
+        self.validate(config)
+        for name, entry in config.items():
+            self.raags[name] = Raag(name=name, **entry).freeze()
+        pickled_raags = {name: pickle.dumps(raag, protocol=pickle.HIGHEST_PROTOCOL) for name, raag in self.raags.items()}
+        if self.cache_path:
+            self.save_cache(pickled_raags, hashlib.sha256(content).hexdigest())
+        return pickled_raags
+
+
+    @staticmethod
+    def parse(content: bytes) -> dict:
+        """
+        Parses a raag configuration with the fastest available safe YAML loader, rejecting duplicate keys.
+
+        Args:
+            content (bytes): The content of the configuration file.
+
+        Raises:
+            ValueError: If the configuration contains duplicate keys.
+
+        Returns:
+            dict: The parsed configuration.
+        """
+        return yaml.load(content, Loader=UniqueKeyLoader) or {}
+
+
+    @classmethod
+    def validate(cls, config: dict) -> None:
+        """
+        Validates a parsed raag configuration.
+
+        Args:
+            config (dict): The parsed configuration, mapping raag names to raag entries.
+
+        Raises:
+            ValueError: If any raag entry is invalid. The message lists every problem found.
+        """
+        if not isinstance(config, dict):
+            raise ValueError('The raag configuration must be a mapping of raag names to raag entries.')
+        problems = []
+        for name, entry in config.items():
+            if not isinstance(entry, dict):
+                problems.append(f"{name}: entry must be a mapping.")
+                continue
+            for key in sorted(cls.required_keys - set(entry)):
+                problems.append(f"{name}: missing required key '{key}'.")
+            for key in sorted(set(entry) - cls.required_keys - cls.optional_keys):
+                problems.append(f"{name}: unknown key '{key}'.")
+            for key in ('notes', 'aroh', 'avroh', 'aroh_varjit', 'avroh_varjit'):
+                if key in entry and not (isinstance(entry[key], list) and entry[key]):
+                    problems.append(f"{name}: '{key}' must be a non-empty list of notes.")
+                elif key in entry:
+                    problems.extend(f"{name}: invalid note '{note}' in '{key}'." for note in entry[key] if not cls.is_note(note))
+            for key in ('vadi', 'samvadi'):
+                if key not in entry:
+                    continue
+                if not cls.is_note(entry[key]):
+                    problems.append(f"{name}: invalid note '{entry[key]}' in '{key}'.")
+                elif isinstance(entry.get('notes'), list) and all(cls.is_note(note) for note in entry['notes']) and Note(entry[key]) not in [Note(note) for note in entry['notes']]:
+                    problems.append(f"{name}: '{key}' {entry[key]} is not one of the notes of the raag.")
+            if 'info' in entry:
+                if not isinstance(entry['info'], dict):
+                    problems.append(f"{name}: 'info' must be a mapping.")
+                else:
+                    problems.extend(f"{name}: unknown info key '{key}'." for key in sorted(set(entry['info']) - cls.info_keys))
+        if problems:
+            raise ValueError('Invalid raag configuration:\n' + '\n'.join(problems))
+
+
+    @staticmethod
+    def is_note(note) -> bool:
+        """
+        Checks if a configuration value is a valid note.
+
+        Args:
+            note: The configuration value.
+
+        Returns:
+            bool: True if the value is a valid note notation or note value, False otherwise.
+        """
+        try:
+            Note(note)
+        except (KeyError, ValueError):
+            return False
+        return True
+
+
+    def __getitem__(self, name: str) -> Raag:
+        """
+        Gets a compiled raag, unpickling it on first access.
+
+        Args:
+            name (str): The name of the raag.
+
+        Raises:
+            KeyError: If the raag is not in the configuration.
+
+        Returns:
+            Raag: The frozen Raag object.
+        """
+        raag = self.raags.get(name)
+        if raag is None:
+            raag = self.raags[name] = pickle.loads(self.pickled_raags[name])
+        return raag
+
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Returns an iterator over the raag names, in configuration order.
+
+        Returns:
+            Iterator[str]: An iterator of raag names.
+        """
+        return iter(self.pickled_raags)
+
+
+    def __len__(self) -> int:
+        """
+        Returns the number of raags in the configuration.
+
+        Returns:
+            int: The number of raags.
+        """
+        return len(self.pickled_raags)
+
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the RaagRegistry object.
+
+        Returns:
+            str: The string representation of the RaagRegistry object.
+        """
+        return f"RaagRegistry({self.filepath!r}, {list(self)})"
@@ -0,0 +1,378 @@
+import wave
+import numpy as np
+from .note import Note
+from .chord import Chord
+from typing import List, Optional, Sequence, Tuple, Union
+
+class HarmoniumVoice:
+    """
+    Represents a harmonium-like synthesizer voice built from a single-period wavetable of reed harmonics.
+
+    Attributes:
+        table (np.ndarray): One period of the waveform, as float32 samples.
+        detune_cents (float): The detuning of the second reed in cents (harmoniums beat slightly between reeds).
+        attack (float): The attack time in seconds.
+        release (float): The release time in seconds.
+        gain (float): The amplitude of a note played at full volume.
+    """
+
+    def __init__(self, harmonics: Sequence[float] = (1.0, 0.7, 0.55, 0.4, 0.3, 0.2, 0.15, 0.1), table_size: int = 2048, detune_cents: float = 4.0, attack: float = 0.03, release: float = 0.08, gain: float = 0.2):
+        """
+        Initializes a HarmoniumVoice object.
+
+        Args:
+            harmonics (Sequence[float], optional): The relative amplitudes of the harmonics, starting with the fundamental.
+            table_size (int, optional): The number of samples in the wavetable. Defaults to 2048.
+            detune_cents (float, optional): The detuning of the second reed in cents. Defaults to 4.0.
+            attack (float, optional): The attack time in seconds. Defaults to 0.03.
+            release (float, optional): The release time in seconds. Defaults to 0.08.
+            gain (float, optional): The amplitude of a note played at full volume. Defaults to 0.2.
+        """
+        phase = np.arange(table_size) / table_size
+        table = sum(amplitude * np.sin(2 * np.pi * (k + 1) * phase) for k, amplitude in enumerate(harmonics))
+        self.table = (table / np.max(np.abs(table))).astype(np.float32)
+        self.detune_cents = detune_cents
+        self.attack = attack
+        self.release = release
+        self.gain = gain
+
+
+    def synthesize(self, frequencies: Sequence[float], num_samples: int, sample_rate: int, volume: float = 1.0) -> np.ndarray:
+        """
+        Synthesizes notes of the given frequencies sounding together.
+
+        Args:
+            frequencies (Sequence[float]): The frequencies of the notes in Hz.
+            num_samples (int): The number of samples to synthesize.
+            sample_rate (int): The sample rate in Hz.
+            volume (float, optional): The volume of the notes between 0 and 1. Defaults to 1.0.
+
+        Returns:
+            np.ndarray: The synthesized float32 samples.
+        """
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        if num_samples <= 0 or frequencies.size == 0:
+            return np.zeros(max(num_samples, 0), dtype=np.float32)
+        reeds = np.concatenate([frequencies, frequencies * 2 ** (self.detune_cents / 1200)])
+        # phase of every reed at every sample, as a position in the wavetable
+        positions = np.outer(reeds / sample_rate, np.arange(num_samples)) % 1.0 * len(self.table)
+        lower = positions.astype(np.int64)
+        fraction = (positions - lower).astype(np.float32)
+        samples = self.table[lower] * (1 - fraction) + self.table[(lower + 1) % len(self.table)] * fraction
+        out = samples.sum(axis=0) * np.float32(self.gain * volume / 2)
+        return out * self.get_envelope(num_samples, sample_rate)
+
+
+    def get_envelope(self, num_samples: int, sample_rate: int) -> np.ndarray:
+        """
+        Computes the linear attack/release amplitude envelope of a note.
+
+        Args:
+            num_samples (int): The number of samples of the note.
+            sample_rate (int): The sample rate in Hz.
+
+        Returns:
+            np.ndarray: The float32 envelope.
+        """
+        envelope = np.ones(num_samples, dtype=np.float32)
+        attack = min(int(self.attack * sample_rate), num_samples // 2)
+        release = min(int(self.release * sample_rate), num_samples - attack)
+        if attack:
+            envelope[:attack] = np.linspace(0, 1, attack, endpoint=False)
+        if release:
+            envelope[num_samples - release:] = np.linspace(1, 0, release)
+        return envelope
+
+
+class OfflineInstrument:
+    """
+    Represents a musical instrument player that renders offline instead of playing in real time.
+
+    It mirrors the `Instrument` API: `play_note` and `play_chord` append events to a timeline instead of blocking,
+    and the timeline is then rendered to a NumPy buffer, a WAV file or a MIDI file faster than real time.
+
+    Attributes:
+        tempo (float): The tempo in beats per minute. Durations are given in beats, as with `Instrument`.
+        sa_midi_note (int): The MIDI note number of the 'sa' sur.
+        sample_rate (int): The sample rate in Hz.
+        voice (HarmoniumVoice): The synthesizer voice.
+        events (List[Tuple[float, float, Tuple[int, ...], float]]): The (start beat, duration, MIDI notes, volume) of every event.
+        beat (float): The beat at which the next event starts.
+        layers (List): The accompaniment layers mixed with the timeline (e.g. a Drone or Theka, see `add_layer`).
+    """
+
+    def __init__(self, tempo: float = 60, sa_midi_note: int = 61, sample_rate: int = 22050, voice: HarmoniumVoice = None):
+        """
+        Initializes a new offline instrument.
+
+        Args:
+            tempo (float, optional): The tempo in beats per minute (default is 60).
+            sa_midi_note (int, optional): The MIDI note number of the 'sa' sur (default is 61).
+            sample_rate (int, optional): The sample rate in Hz (default is 22050).
+            voice (HarmoniumVoice, optional): The synthesizer voice (default is a new HarmoniumVoice).
+        """
+        self.tempo = tempo
+        self.sa_midi_note = sa_midi_note
+        self.sample_rate = sample_rate
+        self.voice = voice if voice is not None else HarmoniumVoice()
+        self.events: List[Tuple[float, float, Tuple[int, ...], float]] = []
+        self.beat = 0.0
+        self.layers = []
+
+
+    def add_layer(self, layer) -> None:
+        """
+        Adds an accompaniment layer, mixed with the timeline from its start to its end when it is rendered.
+
+        Args:
+            layer: An object with a `mix(buffer, sample_rate, tempo, sa_midi_note)` method adding it to a float32 buffer,
+                e.g. a Drone or Theka from `music_elements.accompaniment`.
+        """
+        self.layers.append(layer)
+
+
+    def play_note(self, note: Optional[Note], volume: float = 1.0, duration: float = 1.0) -> None:
+        """
+        Appends a note to the timeline.
+
+        Args:
+            note (Note): The note to be played. If None, appends a rest for the duration.
+            volume (float, optional): The volume of the note. Defaults to 1.0.
+            duration (float, optional): The duration of the note in beats. Defaults to 1.0.
+        """
+        midi_notes = () if note is None else (self.sa_midi_note + note.note_value,)
+        self.events.append((self.beat, duration, midi_notes, volume))
+        self.beat += duration
+
+
+    def play_chord(self, chord: Chord, volume: float = 1.0, duration: float = 1.0) -> None:
+        """
+        Appends a chord to the timeline.
+
+        Args:
+            chord (Chord): The chord to be played.
+            volume (float, optional): The volume of the chord. Defaults to 1.0.
+            duration (float, optional): The duration of the chord in beats. Defaults to 1.0.
+        """
+        midi_notes = tuple(self.sa_midi_note + note.note_value for note in chord)
+        self.events.append((self.beat, duration, midi_notes, volume))
+        self.beat += duration
+
+
+    def play(self, sequence: Sequence[Tuple[Union[Note, Chord, None], float, float]]) -> None:
+        """
+        Appends a sequence of notes, chords and rests to the timeline.
+
+        Args:
+            sequence (Sequence[Tuple[Union[Note, Chord, None], float, float]]): (item, duration, volume) tuples, where None is a rest.
+        """
+        for item, duration, volume in sequence:
+            if isinstance(item, Chord):
+                self.play_chord(item, volume, duration)
+            else:
+                self.play_note(item, volume, duration)
+
+
+    def clear(self) -> None:
+        """
+        Removes all events from the timeline. The accompaniment layers are kept.
+        """
+        self.events = []
+        self.beat = 0.0
+
+
+    def get_seconds(self, beats: float) -> float:
+        """
+        Converts beats to seconds at the tempo of the instrument.
+
+        Args:
+            beats (float): The number of beats.
+
+        Returns:
+            float: The number of seconds.
+        """
+        return beats * 60.0 / self.tempo
+
+
+    def render(self) -> np.ndarray:
+        """
+        Renders the timeline to audio samples, mixed with the accompaniment layers.
+
+        Returns:
+            np.ndarray: The mono float32 samples, clipped to [-1, 1].
+        """
+        buffer = np.zeros(int(round(self.get_seconds(self.beat) * self.sample_rate)), dtype=np.float32)
+        for start, duration, midi_notes, volume in self.events:
+            if not midi_notes:
+                continue
+            offset = int(round(self.get_seconds(start) * self.sample_rate))
+            num_samples = min(int(round(self.get_seconds(duration) * self.sample_rate)), len(buffer) - offset)
+            frequencies = 440.0 * 2 ** ((np.asarray(midi_notes) - 69) / 12)
+            buffer[offset:offset + num_samples] += self.voice.synthesize(frequencies, num_samples, self.sample_rate, volume)
+        for layer in self.layers:
+            layer.mix(buffer, self.sample_rate, self.tempo, self.sa_midi_note)
+        return np.clip(buffer, -1.0, 1.0, out=buffer)
+
+
+    def write_wav(self, filepath: str) -> None:
+        """
+        Renders the timeline to a 16-bit mono WAV file.
+
+        Args:
+            filepath (str): The filepath of the WAV file.
+        """
+        write_wav(filepath, self.render(), self.sample_rate)
+
+
+    def write_midi(self, filepath: str, ticks_per_beat: int = 480) -> None:
+        """
+        Writes the timeline to a standard MIDI file (format 0).
+
+        Args:
+            filepath (str): The filepath of the MIDI file.
+            ticks_per_beat (int, optional): The MIDI time resolution. Defaults to 480.
+        """
+        messages = []
+        for start, duration, midi_notes, volume in self.events:
+            velocity = min(max(int(round(volume * 127)), 1), 127)
+            start_tick, end_tick = int(round(start * ticks_per_beat)), int(round((start + duration) * ticks_per_beat))
+            for midi_note in midi_notes:
+                # note offs sort before note ons at the same tick so repeated notes retrigger
+                messages.append((end_tick, 0, bytes([0x80, midi_note, 0])))
+                messages.append((start_tick, 1, bytes([0x90, midi_note, velocity])))
+        messages.sort(key=lambda message: message[:2])
+
+        microseconds_per_beat = int(round(60_000_000 / self.tempo))
+        track = bytearray(b'\x00\xff\x51\x03' + microseconds_per_beat.to_bytes(3, 'big'))
+        tick = 0
+        for message_tick, _, message in messages:
+            track += encode_variable_length(message_tick - tick) + message
+            tick = message_tick
+        track += b'\x00\xff\x2f\x00'
+        with open(filepath, 'wb') as file:
+            file.write(b'MThd' + (6).to_bytes(4, 'big') + (0).to_bytes(2, 'big') + (1).to_bytes(2, 'big') + ticks_per_beat.to_bytes(2, 'big'))
+            file.write(b'MTrk' + len(track).to_bytes(4, 'big') + bytes(track))
+
+
+def encode_variable_length(value: int) -> bytes:
+    """
+    Encodes an integer as a MIDI variable-length quantity.
+
+    Args:
+        value (int): The non-negative integer.
+
+    Returns:
+        bytes: The encoded quantity.
+    """
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def decode_variable_length(data: bytes, position: int) -> Tuple[int, int]:
+    """
+    Decodes a MIDI variable-length quantity.
+
+    Args:
+        data (bytes): The MIDI data.
+        position (int): The position of the first byte of the quantity.
+
+    Returns:
+        Tuple[int, int]: The decoded integer and the position after the quantity.
+    """
+    value = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            return value, position
+
+
+def write_wav(filepath: str, samples: np.ndarray, sample_rate: int) -> None:
+    """
+    Writes float samples in [-1, 1] to a 16-bit PCM WAV file.
+
+    Args:
+        filepath (str): The filepath of the WAV file.
+        samples (np.ndarray): The samples, of shape (frames,) for mono or (frames, channels).
+        sample_rate (int): The sample rate in Hz.
+    """
+    samples = np.asarray(samples, dtype=np.float32)
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2')
+    with wave.open(filepath, 'wb') as file:
+        file.setnchannels(channels)
+        file.setsampwidth(2)
+        file.setframerate(sample_rate)
+        file.writeframes(pcm.tobytes())
+
+
+def read_midi(filepath: str) -> List[Tuple[float, int, int]]:
+    """
+    Reads the note events of a standard MIDI file (format 0 or 1), merging all tracks and channels.
+
+    Args:
+        filepath (str): The filepath of the MIDI file.
+
+    Raises:
+        ValueError: If the file is not a standard MIDI file or uses SMPTE time division.
+
+    Returns:
+        List[Tuple[float, int, int]]: (time in seconds, MIDI note, velocity) events sorted by time, where a velocity of 0 is a note off.
+    """
+    with open(filepath, 'rb') as file:
+        data = file.read()
+    if data[:4] != b'MThd':
+        raise ValueError(f'{filepath} is not a standard MIDI file.')
+    header_length = int.from_bytes(data[4:8], 'big')
+    num_tracks = int.from_bytes(data[10:12], 'big')
+    ticks_per_beat = int.from_bytes(data[12:14], 'big')
+    if ticks_per_beat & 0x8000:
+        raise ValueError('SMPTE time division is not supported.')
+
+    events, tempos = [], [(0, 500_000)]
+    position = 8 + header_length
+    for _ in range(num_tracks):
+        track_end = position + 8 + int.from_bytes(data[position + 4:position + 8], 'big')
+        position, tick, status = position + 8, 0, 0
+        while position < track_end:
+            delta, position = decode_variable_length(data, position)
+            tick += delta
+            if data[position] & 0x80:
+                status = data[position]
+                position += 1
+            if status == 0xFF:
+                meta_type = data[position]
+                length, position = decode_variable_length(data, position + 1)
+                if meta_type == 0x51:
+                    tempos.append((tick, int.from_bytes(data[position:position + length], 'big')))
+                position += length
+                # meta and sysex events cancel running status, which only carries over between channel messages
+                status = 0
+            elif status in (0xF0, 0xF7):
+                length, position = decode_variable_length(data, position)
+                position += length
+                status = 0
+            else:
+                kind = status & 0xF0
+                size = 1 if kind in (0xC0, 0xD0) else 2
+                if kind in (0x80, 0x90):
+                    events.append((tick, data[position], data[position + 1] if kind == 0x90 else 0))
+                position += size
+        position = track_end
+
+    # convert ticks to seconds through the tempo map
+    tempos.sort(key=lambda tempo: tempo[0])
+    events.sort(key=lambda event: (event[0], event[2] > 0))
+    out, tempo_index, tempo_tick, tempo_seconds = [], 0, 0, 0.0
+    for tick, midi_note, velocity in events:
+        while tempo_index + 1 < len(tempos) and tempos[tempo_index + 1][0] <= tick:
+            next_tick = tempos[tempo_index + 1][0]
+            tempo_seconds += (next_tick - tempo_tick) * tempos[tempo_index][1] / 1e6 / ticks_per_beat
+            tempo_tick, tempo_index = next_tick, tempo_index + 1
+        out.append((tempo_seconds + (tick - tempo_tick) * tempos[tempo_index][1] / 1e6 / ticks_per_beat, midi_note, velocity))
+    return out
@@ -0,0 +1,301 @@
+import asyncio
+import heapq
+from .note import Note
+from .chord import Chord
+from .live_analysis import LatencyStats
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+class ScheduledEvent(NamedTuple):
+    """
+    Represents a timestamped note or chord of a part.
+
+    Attributes:
+        beat (float): The beat at which the event starts, from the start of playback.
+        part (str): The name of the part.
+        midi_notes (Tuple[int, ...]): The MIDI note numbers, empty for a rest.
+        volume (float): The volume.
+        duration (float): The duration in beats.
+    """
+    beat: float
+    part: str
+    midi_notes: Tuple[int, ...]
+    volume: float
+    duration: float
+
+
+class ScampBackend:
+    """
+    Represents a playback backend that starts and ends notes on the parts of a scamp Session without blocking.
+
+    Attributes:
+        session (Session): The scamp session.
+    """
+
+    def __init__(self, session=None):
+        """
+        Initializes a ScampBackend object.
+
+        Args:
+            session (Session, optional): The scamp session, e.g. `Instrument.session`. Defaults to None (a new Session).
+        """
+        if session is None:
+            from .instrument import Session
+            session = Session()
+        self.session = session
+
+
+    def add_part(self, name: str) -> Any:
+        """
+        Creates a part.
+
+        Args:
+            name (str): The name of the instrument.
+
+        Returns:
+            Any: The scamp part.
+        """
+        return self.session.new_part(name=name)
+
+
+    def start(self, part: Any, midi_notes: Tuple[int, ...], volume: float) -> Any:
+        """
+        Starts sounding notes.
+
+        Args:
+            part (Any): The scamp part.
+            midi_notes (Tuple[int, ...]): The MIDI note numbers.
+            volume (float): The volume.
+
+        Returns:
+            Any: The scamp note or chord handle.
+        """
+        if len(midi_notes) == 1:
+            return part.start_note(midi_notes[0], volume)
+        return part.start_chord(list(midi_notes), volume)
+
+
+    def stop(self, handle: Any) -> None:
+        """
+        Ends sounding notes.
+
+        Args:
+            handle (Any): The handle returned by `start`.
+        """
+        handle.end()
+
+
+class NullBackend:
+    """
+    Represents a silent playback backend that records what would have been played, for testing.
+
+    Attributes:
+        played (List[Tuple[float, str, Tuple[int, ...], float]]): The (start time, part, MIDI notes, volume) of every started event, with event loop times.
+        stopped (List[Tuple[float, int]]): The (stop time, index into played) of every ended event.
+    """
+
+    def __init__(self):
+        """
+        Initializes a NullBackend object.
+        """
+        self.played: List[Tuple[float, str, Tuple[int, ...], float]] = []
+        self.stopped: List[Tuple[float, int]] = []
+
+
+    def add_part(self, name: str) -> str:
+        """
+        Creates a part.
+
+        Args:
+            name (str): The name of the instrument.
+
+        Returns:
+            str: The name, standing in for the part.
+        """
+        return name
+
+
+    def start(self, part: str, midi_notes: Tuple[int, ...], volume: float) -> int:
+        """
+        Records the start of notes.
+
+        Args:
+            part (str): The part.
+            midi_notes (Tuple[int, ...]): The MIDI note numbers.
+            volume (float): The volume.
+
+        Returns:
+            int: The index of the record.
+        """
+        self.played.append((asyncio.get_running_loop().time(), part, midi_notes, volume))
+        return len(self.played) - 1
+
+
+    def stop(self, handle: int) -> None:
+        """
+        Records the end of notes.
+
+        Args:
+            handle (int): The index returned by `start`.
+        """
+        self.stopped.append((asyncio.get_running_loop().time(), handle))
+
+
+class PlaybackScheduler:
+    """
+    Represents a lookahead scheduler that plays timestamped events of several parts without blocking their producers.
+
+    Producers put events, stamped in beats from the start of playback, and may run up to `ahead` seconds ahead of
+    playback before `put` waits. The `run` coroutine keeps the events in a heap and, every `interval` seconds, hands
+    the events due within the next `lookahead` seconds to the event loop with `call_at`. Every start and end time is
+    computed from the start of playback and the beat of the event, never from the previous event, so timing errors
+    do not accumulate. The difference between the actual and the intended start of every event is recorded as jitter.
+
+    Timing is event-loop accurate, not sample accurate: notes start when the loop runs their `call_at` callbacks,
+    against `loop.time()` rather than an audio clock, and scamp starts them as soon as it is called. Callbacks run
+    late by the loop's timer resolution plus any callback or producer holding the loop, typically under a
+    millisecond at the median and a few to ~10 ms at the 99th percentile, so `jitter` reports the actual error.
+    Sample-accurate timing needs an offline render instead (see `OfflineInstrument`), or the synthesizer's own
+    audio clock, which scamp does not expose.
+
+    Attributes:
+        backend (Union[ScampBackend, NullBackend]): The playback backend.
+        tempo (float): The tempo in beats per minute.
+        sa_midi_note (int): The MIDI note number of the 'sa' sur.
+        lookahead (float): How far ahead of time events are handed to the event loop, in seconds.
+        interval (float): How often the scheduler wakes up, in seconds.
+        ahead (float): How far producers may run ahead of playback, in seconds.
+        parts (Dict[str, Any]): The backend parts, keyed by name.
+        heap (List[Tuple[float, int, ScheduledEvent]]): The (beat, order, event) of every event not yet handed to the event loop.
+        closed (bool): Whether `close` has been called.
+        jitter (LatencyStats): The differences between the actual and the intended start times.
+        start_time (float): The event loop time of beat 0, set when playback starts.
+    """
+
+    def __init__(self, backend: Union[ScampBackend, NullBackend] = None, tempo: float = 60, sa_midi_note: int = 61, lookahead: float = 0.1, interval: float = 0.025, ahead: float = 2.0):
+        """
+        Initializes a PlaybackScheduler object.
+
+        Args:
+            backend (Union[ScampBackend, NullBackend], optional): The playback backend. Defaults to None (a new ScampBackend).
+            tempo (float, optional): The tempo in beats per minute. Defaults to 60.
+            sa_midi_note (int, optional): The MIDI note number of the 'sa' sur. Defaults to 61.
+            lookahead (float, optional): How far ahead of time events are handed to the event loop, in seconds. Defaults to 0.1.
+            interval (float, optional): How often the scheduler wakes up, in seconds. Defaults to 0.025.
+            ahead (float, optional): How far producers may run ahead of playback, in seconds. Defaults to 2.0.
+
+        Raises:
+            ValueError: If the interval is not shorter than the lookahead, or the lookahead is longer than ahead.
+        """
+        if not 0 < interval < lookahead <= ahead:
+            raise ValueError(f'Expected 0 < interval ({interval}) < lookahead ({lookahead}) <= ahead ({ahead})')
+        self.backend = backend if backend is not None else ScampBackend()
+        self.tempo = tempo
+        self.sa_midi_note = sa_midi_note
+        self.lookahead = lookahead
+        self.interval = interval
+        self.ahead = ahead
+        self.parts: Dict[str, Any] = {}
+        self.heap: List[Tuple[float, int, ScheduledEvent]] = []
+        self.counter = 0
+        self.closed = False
+        self.jitter = LatencyStats()
+        self.start_time: Optional[float] = None
+
+
+    def add_part(self, name: str) -> None:
+        """
+        Adds a part, e.g. 'harmonium', 'drone' or 'melody'.
+
+        Args:
+            name (str): The name of the part and its instrument.
+        """
+        if name not in self.parts:
+            self.parts[name] = self.backend.add_part(name)
+
+
+    def get_seconds(self, beats: float) -> float:
+        """
+        Converts beats to seconds at the tempo of the scheduler.
+
+        Args:
+            beats (float): The number of beats.
+
+        Returns:
+            float: The number of seconds.
+        """
+        return beats * 60.0 / self.tempo
+
+
+    async def put(self, event: ScheduledEvent) -> None:
+        """
+        Queues an event, waiting while it is more than `ahead` seconds ahead of playback.
+
+        Args:
+            event (ScheduledEvent): The event.
+
+        Raises:
+            ValueError: If the part of the event has not been added, or the playback is closed.
+        """
+        if event.part not in self.parts:
+            raise ValueError(f'Unknown part: {event.part}')
+        if self.closed:
+            raise ValueError('The playback is closed')
+        if self.start_time is not None:
+            loop = asyncio.get_running_loop()
+            delay = self.start_time + self.get_seconds(event.beat) - self.ahead - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        heapq.heappush(self.heap, (event.beat, self.counter, event))
+        self.counter += 1
+
+
+    async def play(self, part: str, sequence: Sequence[Tuple[Union[Note, Chord, None], float, float]], beat: float = 0.0) -> float:
+        """
+        Queues a sequence of notes, chords and rests of a part, one after another.
+
+        Args:
+            part (str): The name of the part.
+            sequence (Sequence[Tuple[Union[Note, Chord, None], float, float]]): (item, duration, volume) tuples, where None is a rest.
+            beat (float, optional): The beat at which the sequence starts. Defaults to 0.0.
+
+        Returns:
+            float: The beat at which the sequence ends.
+        """
+        for item, duration, volume in sequence:
+            if item is not None:
+                notes = item if isinstance(item, Chord) else (item,)
+                midi_notes = tuple(self.sa_midi_note + note.note_value for note in notes)
+                await self.put(ScheduledEvent(beat, part, midi_notes, volume, duration))
+            beat += duration
+        return beat
+
+
+    def close(self) -> None:
+        """
+        Signals that no more events will be queued, so `run` returns once everything has been played.
+        """
+        self.closed = True
+
+
+    async def run(self) -> None:
+        """
+        Plays the queued events until `close` has been called and every event has ended.
+        """
+        loop = asyncio.get_running_loop()
+        self.start_time = loop.time() + self.lookahead
+        end_time = self.start_time
+
+        def start(event: ScheduledEvent, target: float) -> None:
+            self.jitter.record(loop.time() - target)
+            handle = self.backend.start(self.parts[event.part], event.midi_notes, event.volume)
+            loop.call_at(target + self.get_seconds(event.duration), self.backend.stop, handle)
+
+        while not self.closed or self.heap:
+            horizon = loop.time() + self.lookahead
+            while self.heap and self.start_time + self.get_seconds(self.heap[0][0]) <= horizon:
+                _, _, event = heapq.heappop(self.heap)
+                target = self.start_time + self.get_seconds(event.beat)
+                loop.call_at(target, start, event, target)
+                end_time = max(end_time, target + self.get_seconds(event.duration))
+            await asyncio.sleep(self.interval)
+        await asyncio.sleep(max(0.0, end_time - loop.time()) + self.interval)
@@ -0,0 +1,254 @@
+import numpy as np
+import yaml
+from .note import Note
+from .chord import Chord
+from .raag import Raag
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+# 5-limit just intonation ratios of the 12 notes, from s to n
+JUST_RATIOS = (1, 16 / 15, 9 / 8, 6 / 5, 5 / 4, 4 / 3, 45 / 32, 3 / 2, 8 / 5, 5 / 3, 9 / 5, 15 / 8)
+
+# the 22 shrutis as (ratio, note value of the note they belong to)
+SHRUTIS = (
+    (1, 0),
+    (256 / 243, 1), (16 / 15, 1), (10 / 9, 2), (9 / 8, 2),
+    (32 / 27, 3), (6 / 5, 3), (5 / 4, 4), (81 / 64, 4),
+    (4 / 3, 5), (27 / 20, 5), (45 / 32, 6), (729 / 512, 6),
+    (3 / 2, 7),
+    (128 / 81, 8), (8 / 5, 8), (5 / 3, 9), (27 / 16, 9),
+    (16 / 9, 10), (9 / 5, 10), (15 / 8, 11), (243 / 128, 11),
+)
+
+UNVOICED = np.iinfo(np.int32).min
+
+class Tuning:
+    """
+    Represents the intonation of the 12 notes relative to Sa, with cents-level precision, and a grid of pitches
+    (the notes themselves or the 22 shrutis) that pitch tracks are quantized to.
+
+    Notes keep their 12-note values, so a Tuning only changes how Note, Chord and Raag objects sound and how
+    frequencies are read back into them. All conversions accept NumPy arrays and are vectorized.
+
+    Attributes:
+        name (str): The name of the tuning.
+        note_cents (np.ndarray): The cents above Sa of each of the 12 notes of saptak 0.
+        grid_cents (np.ndarray): The increasing cents above Sa of the quantization grid within one saptak.
+        grid_note_values (np.ndarray): The note value (0-11) of every grid point.
+    """
+
+    def __init__(self, note_cents: Sequence[float], grid_cents: Optional[Sequence[float]] = None, grid_note_values: Optional[Sequence[int]] = None, name: str = None):
+        """
+        Initializes a Tuning object.
+
+        Args:
+            note_cents (Sequence[float]): The cents above Sa of each of the 12 notes of saptak 0.
+            grid_cents (Sequence[float], optional): The cents above Sa of the quantization grid. Defaults to None (the notes).
+            grid_note_values (Sequence[int], optional): The note value (0-11) of every grid point. Required with a grid.
+            name (str, optional): The name of the tuning. Defaults to None.
+
+        Raises:
+            ValueError: If there are not 12 note cents, or the grid is not increasing within [0, 1200) or has no note values.
+        """
+        num_notes = len(Note.notes)
+        self.name = name
+        self.note_cents = np.asarray(note_cents, dtype=np.float64)
+        if self.note_cents.shape != (num_notes,):
+            raise ValueError(f'Expected {num_notes} note cents, got {self.note_cents.shape}')
+        if grid_cents is None:
+            grid_cents, grid_note_values = self.note_cents, np.arange(num_notes)
+        elif grid_note_values is None:
+            raise ValueError('The note values of the grid are required with a grid')
+        self.grid_cents = np.asarray(grid_cents, dtype=np.float64)
+        self.grid_note_values = np.asarray(grid_note_values, dtype=np.int64)
+        if len(self.grid_cents) != len(self.grid_note_values) or not len(self.grid_cents):
+            raise ValueError('The grid must have one note value per grid point')
+        if self.grid_cents[0] < 0 or self.grid_cents[-1] >= 1200 or np.any(np.diff(self.grid_cents) <= 0):
+            raise ValueError(f'The grid cents must be increasing within [0, 1200), got {self.grid_cents.tolist()}')
+
+        # the grid extended by the nearest points of the neighbouring saptaks, so quantization never wraps
+        self.extended_cents = np.concatenate([[self.grid_cents[-1] - 1200], self.grid_cents, [self.grid_cents[0] + 1200]])
+        self.midpoints = (self.extended_cents[1:] + self.extended_cents[:-1]) / 2
+
+
+    def __repr__(self) -> str:
+        """
+        Returns a string representation of the Tuning object.
+
+        Returns:
+            str: The string representation of the Tuning object.
+        """
+        return f"Tuning({self.name or ''}{np.round(self.note_cents, 1).tolist()})"
+
+
+    @classmethod
+    def equal_tempered(cls) -> 'Tuning':
+        """
+        Creates the 12-tone equal temperament, where every note is 100 cents above the previous one.
+
+        Returns:
+            Tuning: The resulting Tuning object.
+        """
+        return cls(np.arange(len(Note.notes)) * 100.0, name='equal_tempered')
+
+
+    @classmethod
+    def just(cls) -> 'Tuning':
+        """
+        Creates 5-limit just intonation (see JUST_RATIOS).
+
+        Returns:
+            Tuning: The resulting Tuning object.
+        """
+        return cls(1200 * np.log2(JUST_RATIOS), name='just')
+
+
+    @classmethod
+    def shrutis(cls) -> 'Tuning':
+        """
+        Creates just intonation with the 22 shrutis (see SHRUTIS) as the quantization grid.
+
+        Returns:
+            Tuning: The resulting Tuning object.
+        """
+        ratios, note_values = zip(*SHRUTIS)
+        return cls(1200 * np.log2(JUST_RATIOS), 1200 * np.log2(ratios), note_values, name='shrutis')
+
+
+    @classmethod
+    def from_config(cls, filepath: str, raag: Union[str, Raag, None] = None) -> 'Tuning':
+        """
+        Loads the tuning of a raag from a tuning configuration YAML file, with a 'base' tuning ('equal_tempered',
+        'just' or 'shrutis') and per-raag 'raags' offsets in cents by note notation.
+
+        Args:
+            filepath (str): The filepath of the tuning configuration.
+            raag (Union[str, Raag], optional): The raag or its name. Defaults to None (the base tuning).
+
+        Raises:
+            ValueError: If the base tuning is unknown.
+
+        Returns:
+            Tuning: The resulting Tuning object.
+        """
+        with open(filepath, 'r') as file:
+            config = yaml.load(file, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader)) or {}
+        base = config.get('base', 'just')
+        if base not in ('equal_tempered', 'just', 'shrutis'):
+            raise ValueError(f"Base tuning must be one of 'equal_tempered', 'just' or 'shrutis', got '{base}'.")
+        tuning = getattr(cls, base)()
+        name = raag.name if isinstance(raag, Raag) else raag
+        offsets = (config.get('raags') or {}).get(name) or {}
+        return tuning.with_offsets(offsets, name=name) if name is not None else tuning
+
+
+    def with_offsets(self, offsets: Dict[Union[str, int, Note], float], name: str = None) -> 'Tuning':
+        """
+        Creates a copy of the tuning with some notes raised or lowered, e.g. {'r.': -22} for the lower komal re of bhairo.
+        When the notes are the quantization grid, the grid moves with them; a shruti grid stays fixed.
+
+        Args:
+            offsets (Dict[Union[str, int, Note], float]): The cents to add to notes, keyed by Note, notation or note value.
+            name (str, optional): The name of the new tuning. Defaults to None (the name of this tuning).
+
+        Returns:
+            Tuning: The resulting Tuning object.
+        """
+        note_cents = self.note_cents.copy()
+        for note, offset in offsets.items():
+            note_cents[(note if isinstance(note, Note) else Note(note)).base_value] += offset
+        notes_are_grid = len(self.grid_cents) == len(note_cents) and np.array_equal(self.grid_cents, self.note_cents)
+        if notes_are_grid:
+            return type(self)(note_cents, name=name or self.name)
+        return type(self)(note_cents, self.grid_cents, self.grid_note_values, name=name or self.name)
+
+
+    def get_cents(self, notes: Union[Note, Chord, Iterable[Note], np.ndarray, int]) -> Union[float, np.ndarray]:
+        """
+        Gets the cents above Sa (of saptak 0) of notes.
+
+        Args:
+            notes (Union[Note, Chord, Iterable[Note], np.ndarray, int]): A Note, a Chord or other iterable of notes, or note values.
+
+        Returns:
+            Union[float, np.ndarray]: The cents, a float for a single note and an array otherwise.
+        """
+        if isinstance(notes, Note):
+            return float(notes.saptak * 1200 + self.note_cents[notes.base_value])
+        if not isinstance(notes, (int, np.integer, np.ndarray)):
+            notes = [note.note_value for note in notes]
+        values = np.asarray(notes, dtype=np.int64)
+        saptaks, base_values = np.divmod(values, len(Note.notes))
+        cents = saptaks * 1200 + self.note_cents[base_values]
+        return float(cents) if cents.ndim == 0 else cents
+
+
+    def get_frequency(self, notes: Union[Note, Chord, Iterable[Note], np.ndarray, int], sa_hz: float) -> Union[float, np.ndarray]:
+        """
+        Gets the frequencies of notes.
+
+        Args:
+            notes (Union[Note, Chord, Iterable[Note], np.ndarray, int]): A Note, a Chord or other iterable of notes, or note values.
+            sa_hz (float): The frequency of Sa in Hz.
+
+        Returns:
+            Union[float, np.ndarray]: The frequencies in Hz, a float for a single note and an array otherwise.
+        """
+        frequencies = sa_hz * np.exp2(np.asarray(self.get_cents(notes)) / 1200)
+        return float(frequencies) if frequencies.ndim == 0 else frequencies
+
+
+    def quantize(self, f0: np.ndarray, sa_hz: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quantizes frequencies to the nearest grid point.
+
+        Args:
+            f0 (np.ndarray): The frequencies in Hz; NaN, zero or negative frames are unvoiced.
+            sa_hz (float): The frequency of Sa in Hz.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The int32 grid indices, counted across saptaks (saptak * grid size + grid
+            point; UNVOICED for unvoiced frames), and the deviations from the grid points in cents (NaN for unvoiced frames).
+        """
+        f0 = np.asarray(f0, dtype=np.float64)
+        voiced = f0 > 0  # False for NaN
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cents = 1200 * np.log2(f0 / sa_hz)
+            saptaks = np.floor(cents / 1200)
+            within = cents - saptaks * 1200
+        # index into the extended grid, where 0 and -1 are the neighbouring saptaks
+        nearest = np.searchsorted(self.midpoints, np.where(voiced, within, 0.0))
+        deviations = np.where(voiced, within - self.extended_cents[nearest], np.nan)
+        indices = np.where(voiced, saptaks * len(self.grid_cents) + nearest - 1, UNVOICED).astype(np.int32)
+        return indices, deviations
+
+
+    def get_note_values(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Converts grid indices returned by `quantize` to note values.
+
+        Args:
+            indices (np.ndarray): The grid indices.
+
+        Returns:
+            np.ndarray: The int32 note values (UNVOICED where the index is UNVOICED).
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        saptaks, points = np.divmod(indices, len(self.grid_cents))
+        values = saptaks * len(Note.notes) + self.grid_note_values[points]
+        return np.where(indices == UNVOICED, UNVOICED, values).astype(np.int32)
+
+
+    def quantize_notes(self, f0: np.ndarray, sa_hz: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quantizes frequencies to note values through the nearest grid point, e.g. to build Note objects from a pitch track.
+
+        Args:
+            f0 (np.ndarray): The frequencies in Hz; NaN, zero or negative frames are unvoiced.
+            sa_hz (float): The frequency of Sa in Hz.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The int32 note values (UNVOICED for unvoiced frames) and the deviations from
+            the grid points in cents (NaN for unvoiced frames).
+        """
+        indices, deviations = self.quantize(f0, sa_hz)
+        return self.get_note_values(indices), deviations
@@ -0,0 +1,187 @@
+import hashlib
+import os
+import numpy as np
+from .chord import Chord
+from .chord_set import ChordSet
+from typing import List, Optional, Tuple, Union
+
+class VoiceLeadingMatrix:
+    """
+    Represents the pairwise voice-leading distances between the chords of a chord space.
+
+    The distance from chord A to chord B is the smallest total movement of the voices of A (matched in sorted order)
+    onto any voicing of B reachable with `Chord.shift_saptak`, i.e. any inversion of B within `max_shift` steps.
+    Chords of different sizes are matched on their lowest voices only, like `zip` over the two chords, so the extra
+    voices of the larger chord do not move. The matrix is computed in vectorized row blocks for every pair of chord
+    sizes, stored on disk under the fingerprint of the chord space and memory-mapped, so processes working on the
+    same chord space share one copy.
+
+    Attributes:
+        chords (List[Chord]): The chords of the chord space.
+        values (np.ndarray): The (chords, voices) note values, with smaller chords padded by repeating their top note.
+        sizes (np.ndarray): The number of voices of every chord; the padded voices are ignored.
+        max_shift (int): The largest saptak shift of the voicings considered (defaults to the largest number of voices).
+        fingerprint (str): The hash of the chord space and settings.
+        distances (np.ndarray): The (chords, chords) int32 distance matrix, memory-mapped when cached.
+    """
+
+    version = 2
+
+    def __init__(self, chord_space: List[Chord], max_shift: Optional[int] = None, cache_dir: Optional[str] = os.path.join('~', '.cache', 'kirtan-net', 'voice_leading'), block_size: int = 256):
+        """
+        Initializes a VoiceLeadingMatrix object, loading the matrix from the cache or computing it.
+
+        Args:
+            chord_space (List[Chord]): The chords of the chord space.
+            max_shift (int, optional): The largest saptak shift of the voicings considered. Defaults to None (the largest number of voices).
+            cache_dir (str, optional): The directory of the matrix cache, or None to keep the matrix in memory. Defaults to '~/.cache/kirtan-net/voice_leading'.
+            block_size (int, optional): The number of rows computed at once, bounding memory use. Defaults to 256.
+        """
+        self.chords = list(chord_space)
+        self.values, self.sizes = self.get_values(self.chords)
+        self.max_shift = self.values.shape[1] if max_shift is None else max_shift
+        self.indices = {chord: index for index, chord in reversed(list(enumerate(self.chords)))}
+
+        digest = hashlib.sha256(self.values.tobytes())
+        digest.update(self.sizes.tobytes())
+        digest.update(f'{self.values.shape}-{self.max_shift}-{self.version}'.encode())
+        self.fingerprint = digest.hexdigest()
+
+        if cache_dir is None:
+            self.distances = self.compute(self.values, self.sizes, self.max_shift, block_size)
+            return
+        cache_dir = os.path.expanduser(cache_dir)
+        cache_path = os.path.join(cache_dir, f'{self.fingerprint}.npy')
+        if not os.path.exists(cache_path):
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f'{cache_path}.{os.getpid()}.tmp.npy'
+            np.save(temp_path, self.compute(self.values, self.sizes, self.max_shift, block_size))
+            os.replace(temp_path, cache_path)
+        self.distances = np.load(cache_path, mmap_mode='r')
+
+
+    @staticmethod
+    def get_values(chords: List[Chord]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the note values and sizes of chords of mixed sizes.
+
+        Args:
+            chords (List[Chord]): The chords.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: The (chords, voices) int16 note values, with smaller chords padded by
+            repeating their top note, and the int64 number of voices of every chord.
+        """
+        size = max((len(chord) for chord in chords), default=0)
+        values = np.array([[note.note_value for note in chord] + [chord[-1].note_value] * (size - len(chord)) for chord in chords], dtype=np.int16).reshape(len(chords), size)
+        return values, np.array([len(chord) for chord in chords], dtype=np.int64)
+
+
+    @staticmethod
+    def compute(values: np.ndarray, sizes: np.ndarray, max_shift: int, block_size: int = 256, max_leap: Optional[int] = None) -> np.ndarray:
+        """
+        Computes the voice-leading distance matrix of a chord space.
+
+        Args:
+            values (np.ndarray): The (chords, voices) sorted note values, padded after the voices of smaller chords.
+            sizes (np.ndarray): The number of voices of every chord.
+            max_shift (int): The largest saptak shift of the voicings considered.
+            block_size (int, optional): The number of rows computed at once. Defaults to 256.
+            max_leap (int, optional): The largest allowed move of any voice in semitones; voicings with a longer move are not considered. Defaults to None (no limit).
+
+        Returns:
+            np.ndarray: The (chords, chords) int32 distance matrix, with -1 where every voicing has a longer move than `max_leap`.
+        """
+        values = np.asarray(values)
+        sizes = np.asarray(sizes)
+        out = np.empty((len(values), len(values)), dtype=np.int32)
+        groups = {size: np.flatnonzero(sizes == size) for size in np.unique(sizes).tolist()}
+        for target_size, targets in groups.items():
+            chord_set = ChordSet(values[targets, :target_size])
+            # (targets, voicings, voices): every target chord in every voicing, each sorted like Chord.shift_saptak returns it
+            voicings = np.stack([chord_set.shift_saptak(n).values for n in range(-max_shift, max_shift + 1)], axis=1).astype(np.int32)
+            for source_size, sources in groups.items():
+                voices = min(source_size, target_size)
+                for start in range(0, len(sources), block_size):
+                    rows = sources[start:start + block_size]
+                    movements = np.abs(values[rows, None, None, :voices].astype(np.int32) - voicings[None, :, :, :voices])
+                    totals = movements.sum(axis=3)
+                    if max_leap is not None:
+                        totals[movements.max(axis=3, initial=0) > max_leap] = np.iinfo(np.int32).max
+                    distances = totals.min(axis=2)
+                    if max_leap is not None:
+                        distances[distances == np.iinfo(np.int32).max] = -1
+                    out[np.ix_(rows, targets)] = distances
+        return out
+
+
+    @classmethod
+    def get_costs(cls, chords: List[Chord], max_shift: Optional[int] = None, max_leap: Optional[int] = None) -> np.ndarray:
+        """
+        Computes the voice-leading distances of a chord space as transition costs, without caching them.
+
+        Args:
+            chords (List[Chord]): The chords.
+            max_shift (int, optional): The largest saptak shift of the voicings considered. Defaults to None (the largest number of voices).
+            max_leap (int, optional): The largest allowed move of any voice in semitones. Defaults to None (no limit).
+
+        Returns:
+            np.ndarray: The (chords, chords) float64 distances, infinite where every voicing has a longer move than `max_leap`.
+        """
+        values, sizes = cls.get_values(chords)
+        distances = cls.compute(values, sizes, values.shape[1] if max_shift is None else max_shift, max_leap=max_leap)
+        costs = distances.astype(np.float64)
+        costs[distances < 0] = np.inf
+        return costs
+
+
+    def get_index(self, chord: Union[Chord, int]) -> int:
+        """
+        Gets the index of a chord in the chord space.
+
+        Args:
+            chord (Union[Chord, int]): The Chord object or its index.
+
+        Raises:
+            KeyError: If the chord is not in the chord space.
+
+        Returns:
+            int: The index of the chord.
+        """
+        return chord if isinstance(chord, (int, np.integer)) else self.indices[chord]
+
+
+    def distance(self, a: Union[Chord, int], b: Union[Chord, int]) -> int:
+        """
+        Gets the voice-leading distance from one chord to another.
+
+        Args:
+            a (Union[Chord, int]): The first Chord object or its index.
+            b (Union[Chord, int]): The second Chord object or its index.
+
+        Returns:
+            int: The distance in semitones of total voice movement.
+        """
+        return int(self.distances[self.get_index(a), self.get_index(b)])
+
+
+    def nearest(self, chord: Union[Chord, int], k: int = 5, exclude_self: bool = True) -> List[Tuple[Chord, int]]:
+        """
+        Gets the k chords with the smoothest voice leading from a chord.
+
+        Args:
+            chord (Union[Chord, int]): The Chord object or its index.
+            k (int, optional): The number of chords. Defaults to 5.
+            exclude_self (bool, optional): Whether to leave out the chord itself and its other voicings (distance 0). Defaults to True.
+
+        Returns:
+            List[Tuple[Chord, int]]: (chord, distance) tuples, from smoothest to least smooth.
+        """
+        row = np.array(self.distances[self.get_index(chord)], dtype=np.int64)
+        candidates = np.flatnonzero(row > 0) if exclude_self else np.arange(len(row))
+        k = min(k, len(candidates))
+        if k == 0:
+            return []
+        top = candidates[np.argpartition(row[candidates], k - 1)[:k]]
+        top = top[np.argsort(row[top], kind='stable')]
+        return [(self.chords[index], int(row[index])) for index in top]
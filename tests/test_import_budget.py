@@ -0,0 +1,13 @@
+import subprocess
+import sys
+from benchmarks.bench_import import DEFAULT_BUDGET_MS, DEFAULT_PACKAGES, REPO_ROOT, check_budget
+
+
+def test_import_budget():
+    check_budget(DEFAULT_PACKAGES, DEFAULT_BUDGET_MS, runs=5)
+
+
+def test_package_import_is_lazy():
+    probe = "import sys, music_elements; print(' '.join(name for name in ('numpy', 'yaml', 'asyncio', 'scamp') if name in sys.modules))"
+    loaded = subprocess.check_output([sys.executable, '-c', probe], cwd=REPO_ROOT, text=True).split()
+    assert loaded == []
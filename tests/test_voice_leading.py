@@ -0,0 +1,47 @@
+import os
+import numpy as np
+from music_elements.note import Note
+from music_elements.chord import Chord
+from music_elements.raag_registry import RaagRegistry
+from music_elements.progression import get_chords_in_raag, get_chord_space
+from music_elements.voice_leading import VoiceLeadingMatrix
+from utils import load_yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def get_distance(a: Chord, b: Chord, max_shift: int) -> int:
+    """
+    Computes the voice-leading distance of two chords by brute force over the voicings of `Chord.shift_saptak`.
+    """
+    return min(sum(abs(x.note_value - y.note_value) for x, y in zip(a, b.shift_saptak(n))) for n in range(-max_shift, max_shift + 1))
+
+
+def get_bilaval_space():
+    raags = RaagRegistry(os.path.join(REPO_ROOT, 'configuration', 'raag_config.yaml'), use_cache=False)
+    chord_types = load_yaml(os.path.join(REPO_ROOT, 'configuration', 'chord_config.yaml'))
+    return get_chord_space(get_chords_in_raag(raags['bilaval'], chord_types))
+
+
+def test_mixed_sizes_match_brute_force():
+    chords = get_bilaval_space()
+    assert len({len(chord) for chord in chords}) > 1
+    matrix = VoiceLeadingMatrix(chords, cache_dir=None, block_size=7)
+    expected = np.array([[get_distance(a, b, matrix.max_shift) for b in chords] for a in chords])
+    np.testing.assert_array_equal(matrix.distances, expected)
+
+
+def test_top_voice_counted_once():
+    a, b = Chord([Note('p-'), Note('s'), Note('r')]), Chord([Note('p-'), Note('s'), Note('g')])
+    seventh = Chord(Note('s'), [0, 4, 7, 11])
+    matrix = VoiceLeadingMatrix([a, b, seventh], cache_dir=None)
+    assert matrix.distance(a, b) == 2
+
+
+def test_max_leap_costs():
+    chords = get_bilaval_space()
+    costs = VoiceLeadingMatrix.get_costs(chords, max_leap=2)
+    distances = VoiceLeadingMatrix(chords, cache_dir=None).distances
+    finite = np.isfinite(costs)
+    assert finite.any() and not finite.all()
+    assert (costs[finite] >= distances[finite]).all()
@@ -1,3 +1,6 @@
+import hashlib
+import json
+import os
 import yaml
 from munch import munchify
 
@@ -12,6 +15,46 @@ def load_yaml(filepath):
         out (dict): A dictionary of dictionaries representing the contents of the YAML file.
     """
     with open(filepath, 'r') as file:
-        out = yaml.safe_load(file)
+        out = yaml.load(file, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
         out = munchify(out)
-    return out
\ No newline at end of file
+    return out
+
+
+def load_chord_index(raag_config_path='configuration/raag_config.yaml', chord_types=None, cache_path=None):
+    """
+    Loads the chord-in-raag index, rebuilding and caching it only when the raag configuration or the chord types change.
+    
+    Args:
+        raag_config_path (str, optional): The filepath of the raag configuration YAML file. Defaults to 'configuration/raag_config.yaml'.
+        chord_types (dict, optional): A dictionary mapping chord type names to chord intervals. Defaults to None (loads 'chord_config.yaml' next to the raag configuration).
+        cache_path (str, optional): The filepath of the cached index. Defaults to None ('.chord_index.npz' next to the raag configuration).
+    
+    Returns:
+        out (ChordIndex): The chord-in-raag index.
+    """
+    from music_elements import ChordIndex, RaagRegistry
+    
+    config_dir = os.path.dirname(raag_config_path)
+    if chord_types is None:
+        chord_types = dict(load_yaml(os.path.join(config_dir, 'chord_config.yaml')))
+    if cache_path is None:
+        cache_path = os.path.join(config_dir, '.chord_index.npz')
+    
+    with open(raag_config_path, 'rb') as file:
+        digest = hashlib.sha256(file.read())
+    digest.update(json.dumps({name: list(intervals) for name, intervals in chord_types.items()}).encode())
+    digest.update(str(ChordIndex.version).encode())
+    fingerprint = digest.hexdigest()
+    
+    if os.path.exists(cache_path):
+        try:
+            out = ChordIndex.load(cache_path)
+            if out.fingerprint == fingerprint:
+                return out
+        except Exception:
+            # a corrupt or unreadable cache (e.g. zipfile.BadZipFile, EOFError) is rebuilt like a stale one
+            pass
+    
+    out = ChordIndex.build(dict(RaagRegistry(raag_config_path)), chord_types, fingerprint)
+    out.save(cache_path)
+    return out